@@ -1,4 +1,5 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -8,7 +9,11 @@ import logging
 from pathlib import Path
 from datetime import date
 
-from loaders.article_loader import load_articles_df, enrich_with_dates, enrich_with_locations
+from loaders.article_loader import load_articles_df, enrich_with_dates, enrich_with_locations, enrich_with_platform, enrich_with_delay
+from helpers.topic_model import topic_label
+from helpers.timeseries_cube import PUBLISHED_AXIS, RELEVANT_AXIS
+from helpers.province_map import build_bubble_map, build_choropleth_map, join_province_coords
+from helpers.province_geo import MAP_DETAIL_LODS
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -45,33 +50,88 @@ if 'hoax_system' not in st.session_state:
     st.session_state.last_hoax_result = None
     st.session_state.hoax_init_attempted = False
 
+@st.cache_resource(show_spinner=False)
+def get_hoax_system():
+    """
+    DeepHoaxID bersama antar sesi (satu per proses), sehingga hanya ada satu
+    index maintenance + satu refresh background yang menulis INDEX_STORE_DIR
+    """
+    system = DeepHoaxIDSystem()
+    if not system.initialize():
+        # Exception tidak di-cache: sesi berikutnya mencoba inisialisasi lagi
+        raise RuntimeError("DeepHoaxID initialization failed")
+    return system
+
 # Auto-initialize DeepHoaxID jika tersedia (silent initialization)
 if DEEPHOAXID_AVAILABLE and not st.session_state.hoax_initialized and not st.session_state.hoax_init_attempted:
     st.session_state.hoax_init_attempted = True
     try:
-        system = DeepHoaxIDSystem()
-        if system.initialize():
-            st.session_state.hoax_system = system
-            st.session_state.hoax_initialized = True
-        else:
-            st.session_state.hoax_initialized = False
+        st.session_state.hoax_system = get_hoax_system()
+        st.session_state.hoax_initialized = True
     except Exception as e:
         st.session_state.hoax_initialized = False
         logger.error(f"Failed to auto-initialize DeepHoaxID: {e}")
 
+# Update incremental similarity index di background jika sudah basi (satu thread per proses)
+if st.session_state.hoax_initialized and st.session_state.hoax_system is not None:
+    st.session_state.hoax_system.refresh_index_if_stale()
+
 @st.cache_data(show_spinner=True)
 def get_data():
     df = load_articles_df()
     df = enrich_with_dates(df)
     df = enrich_with_locations(df)
+    df = enrich_with_platform(df)
     if "relevant_date" in df.columns:
         df["relevant_date"] = pd.to_datetime(df["relevant_date"], errors="coerce")
     # Konversi published_at ke datetime jika ada
     if "published_at" in df.columns:
         df["published_at"] = pd.to_datetime(df["published_at"], errors="coerce")
+    df = enrich_with_delay(df)
     return df
 
-df = get_data()
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_topic_data(topic_version, _topic_model):
+    """
+    Snapshot ter-enrich + kolom topic_cluster, dibangun sekali per versi assignment
+    topik dan dibagi antar sesi (jangan diubah in-place)
+    """
+    data = get_data()
+    if _topic_model is not None:
+        # Artikel di-assign ke centroid model tersimpan (tanpa clustering ulang)
+        data["topic_cluster"] = _topic_model.assign_ids(data["id"].tolist())
+    return data
+
+# Versi dibaca sebelum label: re-fit yang selesai di tengah jalan tidak tercatat di versi lama
+topic_model = getattr(st.session_state.hoax_system, 'topic_model', None) if st.session_state.hoax_initialized else None
+topic_version = topic_model.assignment_version if topic_model is not None else None
+df = get_topic_data(topic_version, topic_model)
+
+@st.cache_resource(show_spinner=False)
+def get_term_index():
+    """Matriks artikel x term untuk seluruh korpus, dibangun sekali per proses"""
+    from helpers.term_index import TermDocumentIndex
+    return TermDocumentIndex.build(get_data(), text_column='content')
+
+@st.cache_resource(show_spinner=False)
+def get_wordcloud_index():
+    """Matriks artikel x term word cloud (title + content, stopwords dibuang sekali)"""
+    from helpers.term_index import build_wordcloud_index
+    return build_wordcloud_index(get_data())
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_filter_engine(data_version, _df):
+    """Filter engine (bitmap baris + agregat per state filter) bersama antar sesi per versi data"""
+    from helpers.filter_engine import FilterEngine
+    return FilterEngine(_df, max_allowed_ts=date(2025, 12, 31))
+
+filter_engine = get_filter_engine(topic_version, df)
+
+@st.cache_resource(show_spinner=False)
+def get_wordcloud_cache():
+    """Cache PNG word cloud bersama antar sesi, dipersist di models/wordcloud_cache"""
+    from helpers.wordcloud_cache import WordCloudRenderCache
+    return WordCloudRenderCache(maxsize=64, cache_dir=dashboard_root / "models" / "wordcloud_cache")
 
 st.markdown(
     "<h1 style='text-align:center; margin-bottom:0.5rem;'>Analisis Segmentasi Konten Hoaks di Indonesia</h1>",
@@ -110,16 +170,10 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
     start_ts = pd.to_datetime(start_date)
     end_ts = pd.to_datetime(end_date) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
     
-    # Filter out future dates (beyond end of 2025)
-    max_allowed_ts = pd.to_datetime(date(2025, 12, 31))
-    filtered_with_date = df[
-        df["relevant_date"].between(start_ts, end_ts) & 
-        (pd.to_datetime(df["relevant_date"]) <= max_allowed_ts)
-    ]
-
-    filtered_no_date = df[df["relevant_date"].isna()]
-
-    shown_df = pd.concat([filtered_with_date, filtered_no_date], ignore_index=True)
+    # Artikel dalam rentang tanggal (tanggal setelah akhir 2025 dibuang) + artikel tanpa tanggal,
+    # bitmap baris di-cache per rentang tanggal oleh filter engine
+    date_selection = filter_engine.select_dates(start_ts, end_ts)
+    shown_df = filter_engine.frame(date_selection)
 
     def count_hoax_rows(df_):
         return len(df_)
@@ -152,12 +206,23 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
             return len([p for p in s.split(",") if p.strip()])
         return int(df_["references"].apply(cnt_refs).sum())
 
-    k_with_publication = len(filtered_with_date)
-    k_without_publication = len(filtered_no_date)
+    def compute_kpis():
+        with_date = shown_df[shown_df["relevant_date"].notna()]
+        return {
+            'with_publication': len(with_date),
+            'without_publication': len(shown_df) - len(with_date),
+            'unique_sources': count_unique_sources(shown_df),
+            'avg_per_day': avg_per_day(with_date),
+            'total_refs': total_references(shown_df)
+        }
+
+    kpis = filter_engine.aggregate(date_selection, 'kpis', compute_kpis)
+    k_with_publication = kpis['with_publication']
+    k_without_publication = kpis['without_publication']
     k_total_hoax = k_with_publication + k_without_publication
-    k_unique_sources = count_unique_sources(shown_df)
-    k_avg_per_day = avg_per_day(filtered_with_date)
-    k_total_refs = total_references(shown_df)
+    k_unique_sources = kpis['unique_sources']
+    k_avg_per_day = kpis['avg_per_day']
+    k_total_refs = kpis['total_refs']
 
     st.markdown(
         """
@@ -312,39 +377,6 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
     
     st.markdown("---")
     
-    # Helper function untuk extract platform
-    def extract_platform(url):
-        if pd.isna(url) or url == "":
-            return "Unknown"
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(str(url))
-            domain = parsed.netloc.replace('www.', '').lower()
-            
-            # Kategorisasi platform
-            if any(x in domain for x in ['facebook', 'fb.com']):
-                return "Facebook"
-            elif any(x in domain for x in ['twitter', 'x.com']):
-                return "Twitter/X"
-            elif any(x in domain for x in ['instagram']):
-                return "Instagram"
-            elif any(x in domain for x in ['youtube', 'youtu.be']):
-                return "YouTube"
-            elif any(x in domain for x in ['whatsapp', 'wa.me']):
-                return "WhatsApp"
-            elif any(x in domain for x in ['telegram', 't.me']):
-                return "Telegram"
-            elif any(x in domain for x in ['tiktok']):
-                return "TikTok"
-            elif any(x in domain for x in ['blogspot', 'blog']):
-                return "Blog"
-            elif any(x in domain for x in ['.co.id', '.id']):
-                return "Media Indonesia"
-            else:
-                return "Website Lain"
-        except:
-            return "Unknown"
-    
     # Initialize filter state (mirip dengan contoh.py - filter sekali, semua visualisasi pakai data yang sama)
     if 'active_filters' not in st.session_state:
         st.session_state.active_filters = {
@@ -352,6 +384,7 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
             'classifications': [],
             'locations': [],
             'platforms': [],
+            'topics': [],
             'date_range': None,
             'hoax_category': None  # Kategori dari hasil analisis DeepHoaxID
         }
@@ -374,7 +407,8 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
         'location_chart': ('locations', 'y'),
         'location_pie_chart': ('locations', 'label'),
         'platform_chart': ('platforms', 'x'),
-        'platform_pie_chart': ('platforms', 'label')
+        'platform_pie_chart': ('platforms', 'label'),
+        'topic_chart': ('topics', 'x')
     }
     
     for chart_key, (filter_type, data_key) in chart_keys.items():
@@ -416,44 +450,18 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                                 st.rerun()
     
     # Apply filters to dataframe (SAMA SEPERTI contoh.py: main_df = all_data[(filter conditions)])
-    # Semua visualisasi akan menggunakan filtered_df yang sama ini
-    filtered_df = shown_df.copy()
-    
-    # Filter berdasarkan kategori dari hasil analisis DeepHoaxID
-    hoax_category = st.session_state.active_filters.get('hoax_category')
-    if hoax_category:
-        # Map kategori DeepHoaxID ke truth_category di database
-        category_mapping = {
-            'HOAX': ['HOAX', 'FALSE', 'MISLEADING'],
-            'SUSPICIOUS': ['SUSPICIOUS', 'UNVERIFIED'],
-            'CLEAN': ['TRUE', 'VERIFIED', 'CLEAN'],
-            'UNKNOWN': ['UNKNOWN', None]
-        }
-        
-        # Cari kategori yang sesuai
-        target_categories = category_mapping.get(hoax_category, [hoax_category])
-        if "truth_category" in filtered_df.columns:
-            filtered_df = filtered_df[
-                filtered_df["truth_category"].fillna("UNKNOWN").isin(target_categories)
-            ]
-    
-    if st.session_state.active_filters.get('categories'):
-        filtered_df = filtered_df[filtered_df["categories"].fillna("(unknown)").isin(st.session_state.active_filters['categories'])]
+    # Semua visualisasi akan menggunakan filtered_df yang sama ini. State filter dikanonikkan
+    # menjadi key; bitmap baris dan agregat per key di-cache (LRU) oleh filter engine
+    filter_selection = filter_engine.select(date_selection, st.session_state.active_filters)
+    filtered_df = filter_engine.frame(date_selection, filter_selection)
     
-    if st.session_state.active_filters.get('classifications'):
-        filtered_df = filtered_df[filtered_df["classifications"].fillna("(unknown)").isin(st.session_state.active_filters['classifications'])]
-    
-    if st.session_state.active_filters.get('locations'):
-        # Filter bisa menggunakan relevant_location atau relevant_province
-        if "relevant_province" in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df["relevant_province"].isin(st.session_state.active_filters['locations'])]
-        elif "relevant_location" in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df["relevant_location"].isin(st.session_state.active_filters['locations'])]
-    
-    if st.session_state.active_filters.get('platforms'):
-        if "platform" not in filtered_df.columns and "source_url" in filtered_df.columns:
-            filtered_df["platform"] = filtered_df["source_url"].apply(extract_platform)
-        filtered_df = filtered_df[filtered_df["platform"].isin(st.session_state.active_filters['platforms'])]
+    def cached_counts(column, label):
+        """Jumlah artikel terfilter per nilai kolom (popcount bitmap index), sekali per state filter"""
+        return filter_engine.aggregate(
+            filter_selection,
+            f"counts:{column}",
+            lambda: filter_engine.value_counts(date_selection, filter_selection, column, label)
+        ).copy()
     
     # Show filter summary and clear button
     active_count = sum([
@@ -461,6 +469,7 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
         len(st.session_state.active_filters.get('classifications', [])),
         len(st.session_state.active_filters.get('locations', [])),
         len(st.session_state.active_filters.get('platforms', [])),
+        len(st.session_state.active_filters.get('topics', [])),
         1 if st.session_state.active_filters.get('hoax_category') else 0
     ])
     
@@ -489,6 +498,8 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                 filter_details.append(f"Lokasi: {len(st.session_state.active_filters['locations'])}")
             if st.session_state.active_filters.get('platforms'):
                 filter_details.append(f"Platform: {len(st.session_state.active_filters['platforms'])}")
+            if st.session_state.active_filters.get('topics'):
+                filter_details.append(f"Topik: {len(st.session_state.active_filters['topics'])}")
             
             filter_text = " | ".join(filter_details) if filter_details else f"Filter aktif: {active_count}"
             st.info(f"📊 Menampilkan {len(filtered_df):,} dari {len(shown_df):,} artikel ({filter_text})")
@@ -499,6 +510,7 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                     'classifications': [],
                     'locations': [],
                     'platforms': [],
+                    'topics': [],
                     'date_range': None,
                     'hoax_category': None
                 }
@@ -518,8 +530,7 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
         
         # Segmentasi berdasarkan Categories
         if "categories" in filtered_df.columns:
-            cat_counts = filtered_df["categories"].fillna("(unknown)").value_counts().reset_index()
-            cat_counts.columns = ["categories", "count"]
+            cat_counts = cached_counts("categories", "categories")
             
             col1, col2 = st.columns(2)
             
@@ -604,8 +615,7 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
         # Segmentasi berdasarkan Classifications jika ada
         if "classifications" in filtered_df.columns:
             st.markdown("#### Segmentasi berdasarkan Klasifikasi")
-            class_counts = filtered_df["classifications"].fillna("(unknown)").value_counts().reset_index()
-            class_counts.columns = ["classifications", "count"]
+            class_counts = cached_counts("classifications", "classifications")
             
             fig_class = px.bar(
                 class_counts.head(10),
@@ -650,176 +660,93 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                             st.session_state.active_filters['classifications'] = selected_classes
                             st.rerun()
         
+        # Segmentasi berdasarkan cluster topik (model tersimpan)
+        if "topic_cluster" in filtered_df.columns:
+            st.markdown("#### Segmentasi berdasarkan Cluster Topik")
+            def compute_topic_counts():
+                counts = filtered_df["topic_cluster"].value_counts().sort_index().reset_index()
+                counts.columns = ["topic_cluster", "count"]
+                counts = counts[counts["topic_cluster"] >= 0].copy()
+                counts["topic"] = counts["topic_cluster"].map(topic_label)
+                
+                # Kata kunci per topik dari term index global (c-TF-IDF)
+                try:
+                    term_index = get_term_index()
+                    topic_keywords = term_index.cluster_keywords(
+                        term_index.rows_for(filtered_df["id"].tolist()),
+                        filtered_df["topic_cluster"].to_numpy(),
+                        top_n=5
+                    )
+                except Exception as e:
+                    logger.warning(f"Kata kunci topik gagal dihitung: {e}")
+                    topic_keywords = {}
+                counts["keywords"] = counts["topic_cluster"].map(
+                    lambda c: ", ".join(topic_keywords.get(int(c), []))
+                )
+                return counts
+            
+            topic_counts = filter_engine.aggregate(filter_selection, "topic_counts", compute_topic_counts)
+            
+            fig_topic = px.bar(
+                topic_counts,
+                x="topic",
+                y="count",
+                text="count",
+                hover_data={"keywords": True, "topic": False},
+                title="Artikel per Cluster Topik (Klik untuk filter)",
+                color_discrete_sequence=px.colors.qualitative.Safe,
+            )
+            fig_topic.update_layout(
+                showlegend=False,
+                xaxis_title="",
+                yaxis_title="Jumlah",
+                margin=dict(t=40, l=20, r=20, b=20),
+                clickmode='event+select',
+                dragmode='select'
+            )
+            fig_topic.update_traces(
+                textposition="outside",
+                selected=dict(marker=dict(color='red', opacity=0.8)),
+                unselected=dict(marker=dict(opacity=0.6))
+            )
+            selected_data = st.plotly_chart(fig_topic, use_container_width=True, on_select="rerun", key="topic_chart")
+            
+            if selected_data and "selection" in selected_data:
+                points = selected_data["selection"].get("points", [])
+                selected_topics = [p.get("x") for p in points if p.get("x")]
+                if selected_topics and selected_topics != st.session_state.active_filters.get('topics', []):
+                    st.session_state.active_filters['topics'] = selected_topics
+                    st.rerun()
+        
         # Word Cloud
         st.markdown("---")
         st.markdown("#### Word Cloud - Kata Kunci Paling Sering Muncul")
         
         try:
-            from wordcloud import WordCloud
-            import matplotlib.pyplot as plt
-            from collections import Counter
-            import re
-            
-            # Extract text dari title dan content dari filtered data
-            all_text = ""
-            if "title" in filtered_df.columns:
-                all_text += " ".join(filtered_df["title"].fillna("").astype(str))
-            if "content" in filtered_df.columns:
-                all_text += " " + " ".join(filtered_df["content"].fillna("").astype(str))
-            
-            # Clean text
-            all_text = all_text.lower()
-            # Remove URLs
-            all_text = re.sub(r'http\S+|www\S+', '', all_text)
-            # Remove email addresses
-            all_text = re.sub(r'\S+@\S+', '', all_text)
-            # Remove special characters, keep only words
-            all_text = re.sub(r'[^\w\s]', ' ', all_text)
-            # Remove numbers
-            all_text = re.sub(r'\d+', '', all_text)
-            # Remove single characters and very short words
-            all_text = re.sub(r'\b\w{1,2}\b', '', all_text)
-            
-            # Comprehensive Indonesian stopwords
-            stopwords = {
-                # Prepositions and conjunctions
-                'yang', 'di', 'ke', 'dari', 'dan', 'atau', 'untuk', 'pada', 'dengan', 'dalam',
-                'adalah', 'ini', 'itu', 'tidak', 'akan', 'sudah', 'telah', 'juga', 'dapat', 'bisa',
-                'ada', 'nya', 'oleh', 'kepada', 'terhadap', 'antara', 'karena', 'jika',
-                'sebagai', 'seperti', 'bahwa', 'serta', 'namun', 'tetapi',
-                'apabila', 'ketika', 'saat', 'setelah', 'sebelum', 'selama', 'hingga',
-                'sampai', 'sementara', 'meskipun', 'walaupun', 'sebab',
-                'maka', 'sehingga', 'agar', 'supaya', 'guna', 'demi',
-                'menuju', 'tentang', 'mengenai', 'atas', 'bawah', 'depan', 'belakang', 'samping',
-                # Common verbs
-                'adalah', 'merupakan', 'menjadi', 'ada', 'terdapat', 'terdiri', 'mengenai',
-                'mengatakan', 'menyatakan', 'menjelaskan', 'menyebutkan', 'mengungkapkan',
-                'menunjukkan', 'mengindikasikan', 'menandakan', 'menyiratkan',
-                # Common nouns (not relevant to hoax)
-                'hal', 'halnya', 'masalah', 'permasalahan', 'keadaan', 'kondisi', 'situasi',
-                'tempat', 'waktu', 'tanggal', 'hari', 'bulan', 'tahun', 'jam', 'menit',
-                'orang', 'seseorang', 'seseorang', 'mereka', 'kami', 'kita', 'kamu', 'anda',
-                'saya', 'dia', 'ia', 'beliau', 'nya', 'kita', 'kami',
-                # Common adjectives/adverbs
-                'sangat', 'amat', 'sekali', 'terlalu', 'cukup', 'agak', 'sedikit', 'banyak',
-                'semua', 'seluruh', 'setiap', 'masing', 'beberapa', 'sebagian',
-                'baru', 'lama', 'lama', 'sebelumnya', 'kemudian', 'selanjutnya',
-                'pertama', 'kedua', 'ketiga', 'terakhir', 'akhirnya',
-                # Common phrases
-                'dapat', 'bisa', 'mampu', 'mungkin', 'kemungkinan', 'boleh', 'perlu',
-                'harus', 'wajib', 'sebaiknya', 'seharusnya', 'sepatutnya',
-                # Common words without meaning to hoax
-                'tersebut', 'tadi', 'ini', 'itu', 'tersebut', 'demikian', 'begitu',
-                'begini', 'begitu', 'demikian', 'seperti', 'sama', 'serupa',
-                'lain', 'lainnya', 'lainnya', 'lainnya', 'lainnya',
-                'saja', 'sahaja', 'hanya', 'cuma', 'semata',
-                'juga', 'pula', 'lagi', 'kembali', 'sekali',
-                'sudah', 'telah', 'pernah', 'belum', 'akan', 'mau',
-                'bukan', 'tidak', 'tak', 'tiada', 'tanpa',
-                # Common filler words
-                'nah', 'oh', 'eh', 'ah', 'wah', 'aduh', 'astaga',
-                'ya', 'iya', 'yap', 'ok', 'oke', 'baik', 'benar',
-                # Common technical words (not relevant)
-                'link', 'url', 'http', 'https', 'www', 'com', 'id', 'co',
-                'click', 'klik', 'share', 'bagikan', 'like', 'suka',
-                'comment', 'komentar', 'reply', 'balas', 'post', 'posting',
-                # Common words that don't add meaning
-                'sih', 'dong', 'deh', 'nih', 'tuh', 'kok', 'kan', 'dong',
-                'dah', 'udah', 'udah', 'udah', 'udah',
-                # Common media words (not relevant to hoax content)
-                'foto', 'gambar', 'video', 'audio', 'file', 'dokumen',
-                'sumber', 'referensi', 'link', 'tautan', 'url',
-                # Common action words (not relevant)
-                'lihat', 'baca', 'tonton', 'dengar', 'simak', 'perhatikan',
-                'bagikan', 'share', 'kirim', 'send', 'post', 'upload',
-                # Common location words (too generic)
-                'disini', 'disana', 'disitu', 'dimana', 'kemana', 'darimana',
-                # Common time words (too generic)
-                'sekarang', 'nanti', 'besok', 'kemarin', 'lusa', 'hari',
-                'minggu', 'bulan', 'tahun', 'jam', 'menit', 'detik',
-                # Common quantity words
-                'satu', 'dua', 'tiga', 'empat', 'lima', 'enam', 'tujuh', 'delapan', 'sembilan', 'sepuluh',
-                'pertama', 'kedua', 'ketiga', 'keempat', 'kelima',
-                # Common question words
-                'apa', 'siapa', 'dimana', 'kemana', 'darimana', 'kapan', 'kenapa', 'mengapa', 'bagaimana',
-                # Common pronouns
-                'saya', 'aku', 'gue', 'gw', 'dia', 'ia', 'beliau', 'kamu', 'anda', 'kalian',
-                'kami', 'kita', 'mereka', 'kita', 'kami',
-                # Common possessive
-                'ku', 'mu', 'nya', 'kita', 'kami', 'mereka',
-            }
-            
-            # Words that are not meaningful for hoax analysis (common words without context)
-            meaningless_words = {
-                'tersebut', 'tadi', 'demikian', 'begitu', 'begini', 'saja', 'juga', 'pula',
-                'sudah', 'telah', 'akan', 'belum', 'pernah', 'mau', 'ingin',
-                'bisa', 'dapat', 'mampu', 'mungkin', 'kemungkinan',
-                'sangat', 'amat', 'sekali', 'terlalu', 'cukup', 'agak',
-                'semua', 'seluruh', 'setiap', 'beberapa', 'sebagian',
-                'baru', 'lama', 'sebelumnya', 'kemudian', 'selanjutnya',
-                'pertama', 'kedua', 'terakhir', 'akhirnya',
-                'lihat', 'baca', 'tonton', 'dengar', 'simak',
-                'bagikan', 'share', 'kirim', 'post', 'upload',
-                'foto', 'gambar', 'video', 'audio', 'file',
-                'link', 'url', 'tautan', 'sumber', 'referensi',
-                'click', 'klik', 'like', 'suka', 'comment', 'komentar',
-                'sekarang', 'nanti', 'besok', 'kemarin',
-                'disini', 'disana', 'disitu', 'dimana',
-            }
-            
-            # Split into words and filter
-            words = all_text.split()
-            # Filter: minimum 4 characters, not in stopwords, not in meaningless words, contains at least one vowel
-            words = [
-                w for w in words 
-                if len(w) >= 4  # Minimum 4 characters
-                and w not in stopwords
-                and w not in meaningless_words
-                and re.search(r'[aeiou]', w)  # Must contain at least one vowel
-                and not w.isdigit()  # Not just numbers
-                and not re.match(r'^[a-z]{1,3}$', w)  # Not just 1-3 letter words
-                and not re.match(r'^[a-z]+[0-9]+$', w)  # Not alphanumeric codes
-                and not re.match(r'^[0-9]+[a-z]+$', w)  # Not numeric codes with letters
-            ]
+            # Frekuensi kata = jumlah kolom matriks artikel x term untuk baris terfilter
+            wordcloud_index = get_wordcloud_index()
+            word_freq = wordcloud_index.term_frequencies(
+                wordcloud_index.rows_for(filtered_df["id"].tolist()),
+                top_n=100
+            )
             
-            if words:
-                # Count word frequency
-                word_freq = Counter(words)
-                top_words = dict(word_freq.most_common(100))
+            if word_freq:
+                # PNG dari cache render (render ulang hanya jika frekuensi/ukuran berubah)
+                st.image(get_wordcloud_cache().get_png(word_freq), use_container_width=True)
                 
-                if top_words:
-                    # Create word cloud
-                    wordcloud = WordCloud(
-                        width=800,
-                        height=400,
-                        background_color='white',
-                        max_words=100,
-                        colormap='viridis',
-                        relative_scaling=0.5,
-                        min_font_size=10
-                    ).generate_from_frequencies(top_words)
-                    
-                    # Display word cloud
-                    fig_wc, ax = plt.subplots(figsize=(12, 6))
-                    ax.imshow(wordcloud, interpolation='bilinear')
-                    ax.axis('off')
-                    st.pyplot(fig_wc)
-                    
-                    # Show top words table
-                    st.markdown("#### Top 30 Kata Kunci")
-                    top_words_df = pd.DataFrame(
-                        list(word_freq.most_common(30)),
-                        columns=['Kata', 'Frekuensi']
-                    )
-                    st.dataframe(top_words_df, use_container_width=True, hide_index=True)
-                else:
-                    st.info("Tidak ada kata yang cukup untuk membuat word cloud.")
+                # Show top words table
+                st.markdown("#### Top 30 Kata Kunci")
+                top_words_df = pd.DataFrame(
+                    list(word_freq.items())[:30],
+                    columns=['Kata', 'Frekuensi']
+                )
+                st.dataframe(top_words_df, use_container_width=True, hide_index=True)
             else:
-                st.info("Tidak ada teks yang dapat diproses untuk word cloud.")
+                st.info("Tidak ada kata yang cukup untuk membuat word cloud.")
                 
         except ImportError:
-            st.warning("Library wordcloud belum terinstall. Install dengan: pip install wordcloud matplotlib")
-            st.code("pip install wordcloud matplotlib")
+            st.warning("Library wordcloud belum terinstall. Install dengan: pip install wordcloud")
+            st.code("pip install wordcloud")
         except Exception as e:
             st.error(f"Error membuat word cloud: {str(e)}")
     
@@ -828,147 +755,39 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
         
         # Gunakan data provinsi yang diekstrak dari content
         if "relevant_province" in filtered_df.columns:
-            province_df = filtered_df[filtered_df["relevant_province"].notna()].copy()
+            province_counts = cached_counts("relevant_province", "province")
             
-            if not province_df.empty:
-                province_counts = province_df["relevant_province"].value_counts().reset_index()
-                province_counts.columns = ["province", "count"]
-                
-                # Koordinat provinsi Indonesia (lat, lon untuk bubble map)
-                PROVINCE_COORDS = {
-                    "Aceh": (4.6951, 96.7494),
-                    "Sumatera Utara": (2.1157, 99.5451),
-                    "Sumatera Barat": (-0.9492, 100.8000),
-                    "Riau": (0.2933, 101.7068),
-                    "Kepulauan Riau": (0.9167, 104.4500),
-                    "Jambi": (-1.6101, 103.6131),
-                    "Sumatera Selatan": (-2.9761, 104.7754),
-                    "Bangka Belitung": (-2.1333, 106.1333),
-                    "Bengkulu": (-3.7928, 102.2603),
-                    "Lampung": (-5.4500, 105.2667),
-                    "DKI Jakarta": (-6.2088, 106.8456),
-                    "Jawa Barat": (-6.9175, 107.6191),
-                    "Jawa Tengah": (-7.2050, 110.4100),
-                    "DI Yogyakarta": (-7.7956, 110.3695),
-                    "Jawa Timur": (-7.2504, 112.7688),
-                    "Banten": (-6.4058, 106.0640),
-                    "Bali": (-8.4095, 115.1889),
-                    "Nusa Tenggara Barat": (-8.5833, 116.1167),
-                    "Nusa Tenggara Timur": (-10.1718, 123.6075),
-                    "Kalimantan Barat": (0.0236, 109.3414),
-                    "Kalimantan Tengah": (-2.2100, 113.9200),
-                    "Kalimantan Selatan": (-3.3194, 114.5908),
-                    "Kalimantan Timur": (-0.5021, 117.1536),
-                    "Kalimantan Utara": (3.3167, 117.6000),
-                    "Sulawesi Utara": (1.4748, 124.8421),
-                    "Sulawesi Tengah": (-0.9000, 119.8833),
-                    "Sulawesi Selatan": (-5.1477, 119.4327),
-                    "Sulawesi Tenggara": (-3.9984, 122.5129),
-                    "Gorontalo": (0.5333, 123.0667),
-                    "Sulawesi Barat": (-2.6688, 118.8622),
-                    "Maluku": (-3.6561, 128.1667),
-                    "Maluku Utara": (0.7833, 127.3667),
-                    "Papua Barat": (-0.8667, 134.0833),
-                    "Papua": (-2.5333, 140.7167)
-                }
-                
-                # Tambahkan koordinat ke dataframe
-                province_counts["lat"] = province_counts["province"].map(lambda x: PROVINCE_COORDS.get(x, (None, None))[0])
-                province_counts["lon"] = province_counts["province"].map(lambda x: PROVINCE_COORDS.get(x, (None, None))[1])
-                
-                # Filter hanya provinsi yang punya koordinat
-                province_counts = province_counts[province_counts["lat"].notna()].copy()
+            if not province_counts.empty:
+                # Koordinat + warna dari index provinsi statis (helpers.province_map)
+                province_counts = join_province_coords(province_counts)
                 
                 if not province_counts.empty:
-                    # Peta dengan grouping seperti contoh Plotly docs
                     st.markdown("#### Peta Persebaran Hoaks per Provinsi")
                     
+                    map_col1, map_col2 = st.columns(2)
+                    with map_col1:
+                        map_mode = st.radio("Mode peta", ["Bubble", "Choropleth"], horizontal=True, key="map_mode")
+                    if map_mode == "Choropleth":
+                        with map_col2:
+                            map_detail = st.select_slider(
+                                "Detail batas provinsi",
+                                options=list(MAP_DETAIL_LODS),
+                                value="Rendah",
+                                key="map_detail",
+                                help="Detail rendah paling ringan untuk tampilan seluruh Indonesia"
+                            )
+                    
                     try:
-                        logger.info("Mencoba membuat peta dengan go.Scattergeo (grouped bubbles)...")
-                        logger.info(f"Data provinsi: {len(province_counts)} provinsi")
-                        
-                        # Pastikan kolom lat dan lon ada dan tidak null
-                        if "lat" not in province_counts.columns or "lon" not in province_counts.columns:
-                            raise ValueError("Kolom lat atau lon tidak ditemukan")
-                        
-                        if province_counts["lat"].isna().any() or province_counts["lon"].isna().any():
-                            logger.warning("Ada nilai null di kolom lat/lon, menghapus...")
-                            province_counts = province_counts.dropna(subset=["lat", "lon"])
-                        
-                        logger.info(f"Data setelah cleaning: {len(province_counts)} provinsi")
-                        
-                        # Buat text untuk hover
-                        province_counts = province_counts.copy()
-                        province_counts['text'] = province_counts['province'] + '<br>Jumlah Hoaks: ' + province_counts['count'].astype(str)
-                        
-                        # Untuk memperbesar bubble: gunakan multiplier yang lebih besar
-                        # Formula: size = count * multiplier (semakin besar multiplier, semakin besar bubble)
-                        multiplier = 15.0  # Multiplier untuk memperbesar ukuran bubble
-                        
-                        # Buat color map untuk setiap provinsi (setiap provinsi dapat warna berbeda)
-                        # Gunakan color palette yang cukup banyak untuk membedakan provinsi
-                        import plotly.express as px
-                        num_provinces = len(province_counts)
-                        color_palette = px.colors.qualitative.Set3 + px.colors.qualitative.Pastel + px.colors.qualitative.Dark2 + px.colors.qualitative.Set1
-                        # Buat mapping provinsi ke warna
-                        province_color_map = {}
-                        for idx, province in enumerate(province_counts['province']):
-                            province_color_map[province] = color_palette[idx % len(color_palette)]
-                        
-                        # Buat figure dengan go.Figure (sudah di-import di atas)
-                        fig_map = go.Figure()
-                        
-                        # Tambahkan trace untuk setiap provinsi (setiap provinsi dapat warna berbeda)
-                        for idx, row in province_counts.iterrows():
-                            province = row['province']
-                            fig_map.add_trace(go.Scattergeo(
-                                lon=[row['lon']],
-                                lat=[row['lat']],
-                                text=[row['text']],
-                                marker=dict(
-                                    size=[row['count'] * multiplier],
-                                    color=province_color_map[province],
-                                    line_color='rgb(40,40,40)',
-                                    line_width=0.5,
-                                    sizemode='area',
-                                    opacity=0.7
-                                ),
-                                name=province,  # Nama trace adalah nama provinsi
-                                hovertemplate='<b>%{text}</b><extra></extra>',
-                                showlegend=True
-                            ))
-                        
-                        # Update layout
-                        fig_map.update_layout(
-                            title_text='Persebaran Hoaks per Provinsi di Indonesia<br>(Klik legend untuk toggle provinsi)',
-                            showlegend=True,
-                            height=600,
-                            margin=dict(l=0, r=0, t=60, b=0),
-                            legend=dict(
-                                title="Provinsi",
-                                itemsizing="constant",
-                                font=dict(size=9),
-                                bgcolor="rgba(255,255,255,0.8)",
-                                bordercolor="rgba(0,0,0,0.2)",
-                                borderwidth=1
-                            ),
-                            geo=dict(
-                                scope='asia',
-                                center=dict(lat=-2.5, lon=118),
-                                projection_scale=3.5,
-                                lonaxis_range=[95, 141],
-                                lataxis_range=[-11, 6],
-                                showland=True,
-                                landcolor='rgb(217, 217, 217)',
-                                showocean=True,
-                                oceancolor='rgb(230, 245, 255)',
-                                showcountries=True,
-                                countrycolor='rgb(102, 102, 102)',
-                                bgcolor='white'
+                        if map_mode == "Choropleth":
+                            # GeoJSON dibundel di static/geo; dengan static serving hanya URL + nilai yang dikirim
+                            fig_map = build_choropleth_map(
+                                province_counts,
+                                lod=MAP_DETAIL_LODS[map_detail],
+                                use_url=bool(st.get_option("server.enableStaticServing"))
                             )
-                        )
-                        
-                        logger.info("Peta go.Scattergeo berhasil dibuat")
+                        else:
+                            # Satu trace Scattergeo dengan array per titik (bukan satu trace per provinsi)
+                            fig_map = build_bubble_map(province_counts)
                         st.plotly_chart(fig_map, use_container_width=True)
                         
                         # Info untuk upgrade ke Mapbox (opsional)
@@ -1163,13 +982,9 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
     with tab3:
         st.markdown("### Platform dan Media")
         
-        if "source_url" in filtered_df.columns:
-            # Ensure platform column exists
-            if "platform" not in filtered_df.columns:
-                filtered_df["platform"] = filtered_df["source_url"].apply(extract_platform)
-            
-            platform_counts = filtered_df["platform"].value_counts().reset_index()
-            platform_counts.columns = ["platform", "count"]
+        if "platform" in filtered_df.columns:
+            # Platform sudah diklasifikasikan saat load (kolom categorical)
+            platform_counts = cached_counts("platform", "platform")
             
             col1, col2 = st.columns(2)
             
@@ -1255,56 +1070,32 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
     with tab4:
         st.markdown("### Pola dan Timeline")
         
+        # Deret waktu diambil dari time series cube (dibangun sekali saat load):
+        # mask sel untuk state filter aktif lalu bincount, tanpa groupby per rerun
+        timeline_cube = filter_engine.timeseries()
+        timeline_cells = filter_engine.timeline_cells(date_selection, filter_selection)
+        
         # Perbandingan Timeline: published_at vs relevant_date
-        if "relevant_date" in filtered_df.columns and "published_at" in filtered_df.columns:
-            # Konversi published_at ke datetime jika belum
-            if filtered_df["published_at"].dtype == 'object':
-                filtered_df["published_at"] = pd.to_datetime(filtered_df["published_at"], errors='coerce')
-            
-            # Filter: relevant_date < published_at dan kedua kolom tidak null
-            max_allowed_date = date(2025, 12, 31)
-            max_allowed_ts = pd.to_datetime(max_allowed_date)
-            
-            comparison_df = filtered_df[
-                (filtered_df["relevant_date"].notna()) & 
-                (filtered_df["published_at"].notna())
-            ].copy()
-            
-            # Filter out future dates
-            comparison_df = comparison_df[
-                (pd.to_datetime(comparison_df["relevant_date"]) <= max_allowed_ts) &
-                (pd.to_datetime(comparison_df["published_at"]) <= max_allowed_ts)
-            ].copy()
-            
-            if not comparison_df.empty:
-                # Filter dengan kondisi relevant_date < published_at
-                comparison_df = comparison_df[
-                    pd.to_datetime(comparison_df["relevant_date"]) < pd.to_datetime(comparison_df["published_at"])
-                ].copy()
+        if timeline_cube is not None and "published_at" in filtered_df.columns:
+            # Hanya artikel dengan relevant_date dan published_at <= akhir 2025
+            if timeline_cube.total(timeline_cells, published=True) > 0:
+                # Kondisi relevant_date < published_at
+                comparison_total = timeline_cube.total(timeline_cells, comparable=True)
                 
-                if not comparison_df.empty:
+                if comparison_total > 0:
                     st.markdown("#### Perbandingan Timeline: Tanggal Publish vs Tanggal Relevan Hoax")
                     st.caption("📊 Menampilkan data dimana relevant_date < published_at (tanggal hoax terjadi sebelum artikel dipublish)")
                     
                     # Timeline berdasarkan published_at
-                    comparison_df["published_date"] = pd.to_datetime(comparison_df["published_at"]).dt.date
-                    published_daily = comparison_df.groupby("published_date").size().reset_index()
-                    published_daily.columns = ["date", "count"]
-                    published_daily = published_daily.sort_values("date")
+                    published_daily = timeline_cube.daily(timeline_cells, PUBLISHED_AXIS)
                     published_daily["type"] = "Tanggal Publish"
                     
                     # Timeline berdasarkan relevant_date
-                    comparison_df["relevant_date_only"] = pd.to_datetime(comparison_df["relevant_date"]).dt.date
-                    relevant_daily = comparison_df.groupby("relevant_date_only").size().reset_index()
-                    relevant_daily.columns = ["date", "count"]
-                    relevant_daily = relevant_daily.sort_values("date")
+                    relevant_daily = timeline_cube.daily(timeline_cells, RELEVANT_AXIS, comparable=True)
                     relevant_daily["type"] = "Tanggal Relevan Hoax"
                     
                     # Gabungkan untuk chart
-                    combined_timeline = pd.concat([
-                        published_daily[["date", "count", "type"]],
-                        relevant_daily[["date", "count", "type"]]
-                    ], ignore_index=True)
+                    combined_timeline = pd.concat([published_daily, relevant_daily], ignore_index=True)
                     
                     col1, col2 = st.columns(2)
                     
@@ -1342,49 +1133,50 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                         # Statistik perbandingan
                         st.markdown("#### Statistik Perbandingan")
                         
-                        avg_delay = (pd.to_datetime(comparison_df["published_at"]) - pd.to_datetime(comparison_df["relevant_date"])).dt.days
-                        
-                        col_stat1, col_stat2 = st.columns(2)
-                        with col_stat1:
-                            st.metric(
-                                "Rata-rata Delay",
-                                f"{avg_delay.mean():.1f} hari",
-                                help="Rata-rata selisih hari antara tanggal relevan hoax dan tanggal publish artikel"
-                            )
-                            st.metric(
-                                "Total Artikel",
-                                len(comparison_df),
-                                help="Jumlah artikel yang memenuhi kondisi relevant_date < published_at"
-                            )
-                        
-                        with col_stat2:
-                            st.metric(
-                                "Median Delay",
-                                f"{avg_delay.median():.0f} hari",
-                                help="Median selisih hari antara tanggal relevan hoax dan tanggal publish artikel"
-                            )
-                            st.metric(
-                                "Maks Delay",
-                                f"{avg_delay.max():.0f} hari",
-                                help="Maksimum selisih hari antara tanggal relevan hoax dan tanggal publish artikel"
-                            )
+                        # Delay dari kolom delay_days (dihitung saat load), tanpa salinan DataFrame
+                        delay_stats = filter_engine.delay_metrics(date_selection, filter_selection)
                         
-                        # Distribusi delay
-                        st.markdown("#### Distribusi Delay (Hari)")
-                        delay_df = pd.DataFrame({
-                            'delay_days': avg_delay.values
-                        })
-                        delay_df = delay_df[delay_df['delay_days'] >= 0]  # Hanya delay positif
-                        
-                        if not delay_df.empty:
-                            fig_delay = px.histogram(
-                                delay_df,
-                                x="delay_days",
-                                nbins=30,
-                                title="Distribusi Delay Publish",
-                                labels={"delay_days": "Delay (Hari)", "count": "Jumlah Artikel"}
-                            )
+                        if delay_stats is not None:
+                            col_stat1, col_stat2 = st.columns(2)
+                            with col_stat1:
+                                st.metric(
+                                    "Rata-rata Delay",
+                                    f"{delay_stats['mean']:.1f} hari",
+                                    help="Rata-rata selisih hari antara tanggal relevan hoax dan tanggal publish artikel"
+                                )
+                                st.metric(
+                                    "Total Artikel",
+                                    comparison_total,
+                                    help="Jumlah artikel yang memenuhi kondisi relevant_date < published_at"
+                                )
+                            
+                            with col_stat2:
+                                st.metric(
+                                    "Median Delay",
+                                    f"{delay_stats['median']:.0f} hari",
+                                    help="Median selisih hari antara tanggal relevan hoax dan tanggal publish artikel"
+                                )
+                                st.metric(
+                                    "Maks Delay",
+                                    f"{delay_stats['max']:.0f} hari",
+                                    help="Maksimum selisih hari antara tanggal relevan hoax dan tanggal publish artikel"
+                                )
+                            
+                            # Distribusi delay (bin histogram sudah dihitung NumPy)
+                            st.markdown("#### Distribusi Delay (Hari)")
+                            histogram = delay_stats['histogram']
+                            fig_delay = go.Figure(go.Bar(
+                                x=histogram['centers'],
+                                y=histogram['counts'],
+                                width=histogram['widths'],
+                                marker_color=px.colors.qualitative.Plotly[0],
+                                hovertemplate="Delay: %{x:.0f} hari<br>Jumlah Artikel: %{y}<extra></extra>"
+                            ))
                             fig_delay.update_layout(
+                                title="Distribusi Delay Publish",
+                                xaxis_title="Delay (Hari)",
+                                yaxis_title="Jumlah Artikel",
+                                bargap=0,
                                 showlegend=False,
                                 margin=dict(t=40, l=20, r=20, b=20)
                             )
@@ -1394,21 +1186,13 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                     st.markdown("---")
                     st.markdown("#### Perbandingan Bulanan")
                     
-                    comparison_df["published_month"] = pd.to_datetime(comparison_df["published_at"]).dt.to_period('M').astype(str)
-                    comparison_df["relevant_month"] = pd.to_datetime(comparison_df["relevant_date"]).dt.to_period('M').astype(str)
-                    
-                    published_monthly = comparison_df.groupby("published_month").size().reset_index()
-                    published_monthly.columns = ["month", "count"]
+                    published_monthly = timeline_cube.monthly(timeline_cells, PUBLISHED_AXIS)
                     published_monthly["type"] = "Tanggal Publish"
                     
-                    relevant_monthly = comparison_df.groupby("relevant_month").size().reset_index()
-                    relevant_monthly.columns = ["month", "count"]
+                    relevant_monthly = timeline_cube.monthly(timeline_cells, RELEVANT_AXIS, comparable=True)
                     relevant_monthly["type"] = "Tanggal Relevan Hoax"
                     
-                    combined_monthly = pd.concat([
-                        published_monthly[["month", "count", "type"]],
-                        relevant_monthly[["month", "count", "type"]]
-                    ], ignore_index=True)
+                    combined_monthly = pd.concat([published_monthly, relevant_monthly], ignore_index=True)
                     
                     fig_monthly_comparison = px.bar(
                         combined_monthly,
@@ -1443,21 +1227,12 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                 st.warning("Tidak ada data dengan both relevant_date dan published_at yang tersedia.")
         
         # Timeline berdasarkan relevant_date (untuk semua data, tidak hanya yang memenuhi kondisi)
-        if "relevant_date" in filtered_df.columns:
+        if timeline_cube is not None:
             st.markdown("---")
             st.markdown("#### Timeline Berdasarkan Tanggal Relevan Hoax (Semua Data)")
             
-            max_allowed_date = date(2025, 12, 31)
-            
-            date_df = filtered_df[filtered_df["relevant_date"].notna()].copy()
-            # Filter out future dates
-            date_df = date_df[pd.to_datetime(date_df["relevant_date"]).dt.date <= max_allowed_date]
-            
-            if not date_df.empty:
-                date_df["date"] = pd.to_datetime(date_df["relevant_date"]).dt.date
-                daily_counts = date_df.groupby("date").size().reset_index()
-                daily_counts.columns = ["date", "count"]
-                daily_counts = daily_counts.sort_values("date")
+            if timeline_cube.total(timeline_cells) > 0:
+                daily_counts = timeline_cube.daily(timeline_cells)
                 
                 col1, col2 = st.columns(2)
                 
@@ -1474,9 +1249,7 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                 
                 with col2:
                     # Pola bulanan
-                    date_df["month"] = pd.to_datetime(date_df["relevant_date"]).dt.to_period('M').astype(str)
-                    monthly_counts = date_df.groupby("month").size().reset_index()
-                    monthly_counts.columns = ["month", "count"]
+                    monthly_counts = timeline_cube.monthly(timeline_cells)
                     
                     fig_monthly = px.bar(
                         monthly_counts,
@@ -1493,16 +1266,13 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                     st.plotly_chart(fig_monthly, use_container_width=True)
                 
                 # Pola harian (hari dalam minggu)
-                date_df["day_of_week"] = pd.to_datetime(date_df["relevant_date"]).dt.day_name()
-                day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                day_counts = date_df["day_of_week"].value_counts().reindex(day_order, fill_value=0).reset_index()
-                day_counts.columns = ["day", "count"]
+                day_counts = timeline_cube.weekday(timeline_cells)
                 
                 fig_day = px.bar(
                     day_counts,
                     x="day",
-        y="count",
-        text="count",
+                    y="count",
+                    text="count",
                     title="Pola Harian (Hari dalam Minggu)",
                     color="count",
                     color_continuous_scale=px.colors.sequential.Reds,
@@ -1523,10 +1293,7 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
         # Import clustering helper
         try:
             from helpers.content_clustering import (
-                get_embeddings_for_articles,
-                perform_clustering,
-                reduce_dimensions,
-                calculate_optimal_clusters,
+                run_clustering,
                 get_cluster_statistics,
                 get_cluster_keywords
             )
@@ -1545,18 +1312,15 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                 if similarity_engine is None:
                     st.warning("Similarity Engine tidak tersedia. Pastikan DeepHoaxID sudah terinisialisasi dengan benar.")
                 else:
-                    # Filter data untuk clustering (maksimal 1000 artikel untuk performa)
-                    clustering_df = filtered_df.copy()
-                    
-                    if len(clustering_df) > 1000:
-                        st.info(f"Menggunakan sample 1000 artikel untuk performa.")
-                        clustering_df = clustering_df.sample(n=1000, random_state=42).reset_index(drop=True)
+                    # Embeddings diambil dari similarity index per article id,
+                    # sehingga clustering bisa memakai seluruh artikel terfilter
+                    clustering_df = filtered_df.reset_index(drop=True)
                     
                     if "content" not in clustering_df.columns:
                         st.error("Kolom 'content' tidak ditemukan. Tidak dapat melakukan clustering.")
                     else:
                         # Parameters
-                        col_param1, col_param2, col_param3 = st.columns(3)
+                        col_param1, col_param2, col_param3, col_param4 = st.columns(4)
                         
                         with col_param1:
                             n_clusters = st.slider(
@@ -1571,7 +1335,7 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                             use_optimal = st.checkbox(
                                 "Gunakan Jumlah Optimal",
                                 value=False,
-                                help="Hitung jumlah cluster optimal menggunakan Elbow Method"
+                                help="Hitung jumlah cluster optimal menggunakan silhouette score (sampel, early stopping)"
                             )
                         
                         with col_param3:
@@ -1582,59 +1346,58 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                                 help="PCA lebih cepat, t-SNE lebih baik untuk visualisasi"
                             )
                         
+                        with col_param4:
+                            clustering_method = st.selectbox(
+                                "Metode Clustering",
+                                options=['auto', 'kmeans', 'minibatch', 'faiss'],
+                                index=0,
+                                help="auto: KMeans untuk data kecil, MiniBatchKMeans untuk korpus besar; faiss paling cepat untuk ratusan ribu artikel"
+                            )
+                        
                         # Button untuk clustering
                         if st.button("Jalankan Clustering", type="primary", use_container_width=True):
-                            with st.spinner("Mendapatkan embeddings dari Sentence-BERT..."):
-                                embeddings = get_embeddings_for_articles(
+                            hoax_system = st.session_state.hoax_system
+                            with st.spinner("Menjalankan clustering (embeddings, cluster, koordinat 2D)..."):
+                                # Hasil dibagi antar sesi lewat cache (key: set artikel, parameter, versi index)
+                                clustering_run = run_clustering(
                                     clustering_df,
                                     similarity_engine,
-                                    text_column='content'
+                                    n_clusters=n_clusters,
+                                    method=clustering_method,
+                                    reduction_method=reduction_method,
+                                    use_optimal=use_optimal,
+                                    embedding_version=getattr(hoax_system, 'index_version', 0),
+                                    embedding_store=getattr(hoax_system, 'embedding_store', None),
+                                    projection_service=getattr(hoax_system, 'projection_service', None)
                                 )
                             
-                            if embeddings is not None:
-                                # Calculate optimal clusters if requested
+                            if clustering_run is not None:
                                 if use_optimal:
-                                    with st.spinner("Menghitung jumlah cluster optimal..."):
-                                        n_clusters = calculate_optimal_clusters(embeddings, max_clusters=20)
-                                        st.success(f"Jumlah cluster optimal: {n_clusters}")
-                                
-                                # Perform clustering
-                                with st.spinner(f"Melakukan clustering ke {n_clusters} cluster..."):
-                                    cluster_labels, kmeans_model = perform_clustering(
-                                        embeddings,
-                                        n_clusters=n_clusters
-                                    )
+                                    st.success(f"Jumlah cluster optimal: {clustering_run['n_clusters']}")
                                 
-                                # Reduce dimensions for visualization
-                                with st.spinner(f"Mengurangi dimensi menggunakan {reduction_method.upper()}..."):
-                                    reduced_embeddings = reduce_dimensions(
-                                        embeddings,
-                                        method=reduction_method,
-                                        n_components=2
-                                    )
+                                # Session hanya menyimpan payload ringkas (id, label, koordinat)
+                                st.session_state.clustering_result = clustering_run
                                 
-                                # Add cluster labels to dataframe
-                                clustering_df['cluster'] = cluster_labels
-                                
-                                # Store in session state
-                                st.session_state.clustering_result = {
-                                    'df': clustering_df,
-                                    'embeddings': embeddings,
-                                    'reduced_embeddings': reduced_embeddings,
-                                    'cluster_labels': cluster_labels,
-                                    'kmeans_model': kmeans_model,
-                                    'n_clusters': n_clusters
-                                }
-                                
-                                st.success(f"Clustering selesai! {n_clusters} cluster dibuat dari {len(clustering_df)} artikel.")
+                                cache_note = " (dari cache)" if clustering_run['cache_hit'] else ""
+                                st.success(f"Clustering selesai{cache_note}! {clustering_run['n_clusters']} cluster dibuat dari {len(clustering_df)} artikel.")
                         
                         # Display results if available
                         if 'clustering_result' in st.session_state:
                             result = st.session_state.clustering_result
-                            clustering_df = result['df']
-                            reduced_embeddings = result['reduced_embeddings']
-                            cluster_labels = result['cluster_labels']
+                            source_df = filtered_df
+                            row_positions = pd.Index(source_df['id']).get_indexer(result['article_ids'])
+                            if (row_positions < 0).any():
+                                # Filter berubah sejak clustering dijalankan: ambil artikel dari data lengkap
+                                source_df = df
+                                row_positions = pd.Index(source_df['id']).get_indexer(result['article_ids'])
+                            # Artikel yang sudah tidak ada di data (-1) dibuang, bukan diambil sebagai baris terakhir
+                            found = row_positions >= 0
+                            clustering_df = source_df.iloc[row_positions[found]].reset_index(drop=True)
+                            reduced_embeddings = np.asarray(result['coords'])[found]
+                            cluster_labels = np.asarray(result['labels'])[found]
+                            clustering_df['cluster'] = cluster_labels
                             n_clusters = result['n_clusters']
+                            reduction_method = result['reduction_method']
                             
                             st.markdown("---")
                             
@@ -1714,7 +1477,12 @@ if "relevant_date" in df.columns and not df["relevant_date"].dropna().empty:
                             st.markdown("---")
                             st.markdown("#### Kata Kunci per Cluster")
                             
-                            cluster_keywords = get_cluster_keywords(clustering_df, cluster_labels, top_n=10)
+                            cluster_keywords = get_cluster_keywords(
+                                clustering_df,
+                                cluster_labels,
+                                top_n=10,
+                                term_index=get_term_index()
+                            )
                             
                             cols_keywords = st.columns(min(3, n_clusters))
                             for idx, cluster_id in enumerate(sorted(cluster_keywords.keys())):
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+ANN Index Helper
+Membangun FAISS index (Flat, IVF-Flat, HNSW, IVF-PQ) yang mendukung id artikel,
+plus benchmark latency, build time, memori dan recall@k terhadap exact search
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ('flat', 'ivf_flat', 'hnsw', 'ivf_pq')
+
+DEFAULT_NPROBE = 16
+DEFAULT_HNSW_M = 32
+DEFAULT_EF_SEARCH = 64
+DEFAULT_EF_CONSTRUCTION = 80
+# IVF-PQ butuh minimal 256 vektor training (2^8 centroid per sub-quantizer)
+IVF_PQ_MIN_TRAIN = 256
+
+
+def resolve_index_type(index_type: str, n_vectors: int) -> str:
+    """Tipe index yang benar-benar dibangun untuk n_vectors (ivf_pq -> ivf_flat jika data training kurang)"""
+    if index_type == 'ivf_pq' and n_vectors < IVF_PQ_MIN_TRAIN:
+        return 'ivf_flat'
+    return index_type
+
+
+def default_nlist(n_vectors: int) -> int:
+    """Jumlah inverted list: ~4*sqrt(n), minimal 39 vektor training per centroid"""
+    nlist = int(4 * np.sqrt(max(n_vectors, 1)))
+    return int(max(1, min(nlist, n_vectors // 39)))
+
+
+def default_pq_m(dim: int) -> int:
+    """Jumlah sub-quantizer PQ: 8 dimensi per sub-vektor (384 -> 48)"""
+    for m in range(max(dim // 8, 1), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def index_factory_string(
+    index_type: str,
+    n_vectors: int,
+    dim: int,
+    nlist: Optional[int] = None,
+    hnsw_m: int = DEFAULT_HNSW_M,
+    pq_m: Optional[int] = None
+) -> str:
+    """Terjemahkan index_type ke string faiss.index_factory"""
+    if index_type == 'flat':
+        return 'Flat'
+    if index_type == 'hnsw':
+        return f"HNSW{hnsw_m}"
+    if index_type == 'ivf_flat':
+        return f"IVF{nlist or default_nlist(n_vectors)},Flat"
+    if index_type == 'ivf_pq':
+        return f"IVF{nlist or default_nlist(n_vectors)},PQ{pq_m or default_pq_m(dim)}"
+    raise ValueError(f"Index type tidak dikenal: {index_type} (pilihan: {', '.join(INDEX_TYPES)})")
+
+
+def detect_index_type(index) -> Optional[str]:
+    """Deteksi index_type dari FAISS index (termasuk yang dibungkus IndexIDMap2)"""
+    import faiss
+
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(base, faiss.IndexIVFPQ):
+        return 'ivf_pq'
+    if isinstance(base, faiss.IndexIVFFlat):
+        return 'ivf_flat'
+    if isinstance(base, faiss.IndexHNSW):
+        return 'hnsw'
+    if isinstance(base, faiss.IndexFlat):
+        return 'flat'
+    return None
+
+
+def supports_ids(index) -> bool:
+    """True jika index bisa add/remove/reconstruct berdasarkan id artikel"""
+    import faiss
+
+    if isinstance(index, faiss.IndexIDMap2):
+        return True
+    if isinstance(index, faiss.IndexIVF):
+        return index.direct_map.type == faiss.DirectMap.Hashtable
+    return False
+
+
+def configure_search(index, nprobe: int = DEFAULT_NPROBE, ef_search: int = DEFAULT_EF_SEARCH) -> None:
+    """Set parameter pencarian (nprobe untuk IVF, efSearch untuk HNSW)"""
+    import faiss
+
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(base, faiss.IndexIVF):
+        base.nprobe = min(nprobe, base.nlist)
+    elif isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = ef_search
+
+
+def build_ann_index(
+    vectors: np.ndarray,
+    index_type: str = 'flat',
+    ids: Optional[np.ndarray] = None,
+    metric_type: Optional[int] = None,
+    nlist: Optional[int] = None,
+    nprobe: int = DEFAULT_NPROBE,
+    hnsw_m: int = DEFAULT_HNSW_M,
+    ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+    ef_search: int = DEFAULT_EF_SEARCH,
+    pq_m: Optional[int] = None
+):
+    """
+    Membangun FAISS index dengan id artikel
+
+    Flat/HNSW dibungkus IndexIDMap2, IVF memakai id native dengan direct map
+    Hashtable sehingga semua tipe mendukung add_with_ids, remove_ids dan reconstruct(id)
+
+    Args:
+        vectors: Array embeddings (n, dim)
+        index_type: 'flat', 'ivf_flat', 'hnsw' atau 'ivf_pq'
+        ids: Id untuk setiap vektor (default 0..n-1)
+        metric_type: faiss.METRIC_* (default inner product)
+        nlist, nprobe: Parameter IVF
+        hnsw_m, ef_construction, ef_search: Parameter HNSW
+        pq_m: Jumlah sub-quantizer IVF-PQ
+
+    Returns:
+        FAISS index yang sudah berisi vectors
+    """
+    import faiss
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n_vectors, dim = vectors.shape
+    if ids is None:
+        ids = np.arange(n_vectors, dtype=np.int64)
+    ids = np.asarray(ids, dtype=np.int64)
+    if metric_type is None:
+        metric_type = faiss.METRIC_INNER_PRODUCT
+
+    built_type = resolve_index_type(index_type, n_vectors)
+    if built_type != index_type:
+        logger.warning(f"IVF-PQ butuh minimal {IVF_PQ_MIN_TRAIN} vektor training ({n_vectors} tersedia), memakai {built_type}")
+        index_type = built_type
+
+    factory = index_factory_string(index_type, n_vectors, dim, nlist=nlist, hnsw_m=hnsw_m, pq_m=pq_m)
+    base = faiss.index_factory(dim, factory, metric_type)
+
+    if isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efConstruction = ef_construction
+
+    if isinstance(base, faiss.IndexIVF):
+        base.train(vectors)
+        base.set_direct_map_type(faiss.DirectMap.Hashtable)
+        index = base
+    else:
+        index = faiss.IndexIDMap2(base)
+
+    if n_vectors:
+        index.add_with_ids(vectors, ids)
+    configure_search(index, nprobe=nprobe, ef_search=ef_search)
+
+    logger.info(f"ANN index '{factory}' dibangun: {index.ntotal} vektor")
+    return index
+
+
+def export_vectors(index, ids: Optional[Sequence[int]] = None):
+    """
+    Ambil (ids, vectors) dari index untuk rebuild ke tipe lain
+
+    Args:
+        index: FAISS index
+        ids: Id yang diketahui (wajib untuk IVF; untuk index polos default 0..ntotal-1)
+    """
+    import faiss
+
+    if isinstance(index, faiss.IndexIDMap):
+        all_ids = faiss.vector_to_array(index.id_map).astype(np.int64)
+        vectors = faiss.downcast_index(index.index).reconstruct_n(0, index.ntotal)
+        if ids is None:
+            return all_ids, vectors
+        wanted = np.isin(all_ids, np.asarray(ids, dtype=np.int64))
+        return all_ids[wanted], vectors[wanted]
+
+    if ids is None:
+        if isinstance(index, faiss.IndexIVF):
+            raise ValueError("IVF index memerlukan daftar id untuk export")
+        return np.arange(index.ntotal, dtype=np.int64), index.reconstruct_n(0, index.ntotal)
+
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(ids) == 0:
+        return ids, np.empty((0, index.d), dtype=np.float32)
+    return ids, np.vstack([index.reconstruct(int(i)) for i in ids]).astype(np.float32)
+
+
+def remove_ids(index, ids: Sequence[int], rebuild_params: Optional[Dict] = None):
+    """
+    Hapus vektor berdasarkan id. HNSW tidak mendukung remove, sehingga index
+    dibangun ulang dari vektor yang tersisa.
+
+    Returns:
+        Index setelah penghapusan (bisa objek baru)
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(ids) == 0:
+        return index
+
+    if detect_index_type(index) != 'hnsw':
+        index.remove_ids(ids)
+        return index
+
+    logger.info(f"HNSW tidak mendukung remove_ids, rebuild tanpa {len(ids)} vektor...")
+    all_ids, vectors = export_vectors(index)
+    keep = ~np.isin(all_ids, ids)
+    return build_ann_index(
+        vectors[keep],
+        index_type='hnsw',
+        ids=all_ids[keep],
+        metric_type=index.metric_type,
+        **(rebuild_params or {})
+    )
+
+
+def read_index(path, index_type: Optional[str] = None, mmap: bool = True):
+    """
+    Baca FAISS index dari file, dengan memory-mapping jika memungkinkan
+
+    IVF memakai IO_FLAG_MMAP (inverted lists on-disk), Flat/HNSW memakai
+    IO_FLAG_MMAP_IFC (codes dibaca langsung dari file) bila tersedia di versi
+    faiss yang terpasang. Index hasil mmap bersifat read-only.
+
+    Returns:
+        Tuple (index, mmapped)
+    """
+    import faiss
+
+    if mmap:
+        if index_type in ('ivf_flat', 'ivf_pq'):
+            flags = faiss.IO_FLAG_MMAP
+        else:
+            flags = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP)
+        try:
+            return faiss.read_index(str(path), flags), True
+        except RuntimeError as e:
+            logger.warning(f"Memory-mapped read gagal ({e}), membaca index ke memori")
+    return faiss.read_index(str(path)), False
+
+
+def index_memory_bytes(index) -> int:
+    """Ukuran index dalam bytes (ukuran serialisasi)"""
+    import faiss
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def load_benchmark_vectors(path: str, scale: Optional[int] = None, seed: int = 42) -> np.ndarray:
+    """
+    Load embeddings cache (.npy) untuk benchmark, opsional diperbesar sampai `scale`
+    vektor dengan menambahkan noise kecil pada sampel (simulasi korpus yang tumbuh)
+    """
+    vectors = np.load(path).astype(np.float32)
+    if scale and scale > len(vectors):
+        rng = np.random.default_rng(seed)
+        extra = vectors[rng.integers(0, len(vectors), scale - len(vectors))]
+        extra = extra + rng.normal(0, 0.05, extra.shape).astype(np.float32)
+        vectors = np.vstack([vectors, extra])
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+def benchmark_index_types(
+    vectors: np.ndarray,
+    index_types: Sequence[str] = INDEX_TYPES,
+    k: int = 10,
+    n_queries: int = 500,
+    seed: int = 42,
+    **index_params
+) -> List[Dict]:
+    """
+    Benchmark tipe index terhadap exact flat baseline
+
+    Args:
+        vectors: Embeddings ter-normalisasi (n, dim)
+        index_types: Tipe index yang dibandingkan
+        k: Top-k untuk recall@k
+        n_queries: Jumlah query (diambil dari korpus + noise)
+        seed: Random seed
+        **index_params: Diteruskan ke build_ann_index (nlist, nprobe, hnsw_m, ...)
+
+    Returns:
+        List[Dict]: build_time_s, memory_mb, latency p50/p95 (ms per query), recall@k
+    """
+    import faiss
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), n_queries)]
+    queries = queries + rng.normal(0, 0.02, queries.shape).astype(np.float32)
+    faiss.normalize_L2(queries)
+
+    exact = faiss.IndexFlatIP(vectors.shape[1])
+    exact.add(vectors)
+    _, ground_truth = exact.search(queries, k)
+
+    results = []
+    for index_type in index_types:
+        start = time.perf_counter()
+        index = build_ann_index(vectors, index_type=index_type, **index_params)
+        build_time = time.perf_counter() - start
+
+        latencies = np.empty(n_queries)
+        found = np.empty((n_queries, k), dtype=np.int64)
+        for i in range(n_queries):
+            start = time.perf_counter()
+            _, found[i] = index.search(queries[i:i + 1], k)
+            latencies[i] = (time.perf_counter() - start) * 1000
+
+        recall = np.mean([
+            len(np.intersect1d(found[i], ground_truth[i])) / k
+            for i in range(n_queries)
+        ])
+        results.append({
+            'index_type': index_type,
+            'n_vectors': len(vectors),
+            'build_time_s': build_time,
+            'memory_mb': index_memory_bytes(index) / 1e6,
+            'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+            f'recall@{k}': float(recall)
+        })
+        logger.info(f"Benchmark {index_type}: {results[-1]}")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark tipe FAISS index pada embeddings cache")
+    parser.add_argument("embeddings", help="Path .npy embeddings cache (n x 384)")
+    parser.add_argument("--scale", type=int, default=None, help="Perbesar korpus sampai N vektor (mis. 1000000)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--types", default=",".join(INDEX_TYPES))
+    parser.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE)
+    parser.add_argument("--ef-search", type=int, default=DEFAULT_EF_SEARCH)
+    args = parser.parse_args()
+
+    bench_vectors = load_benchmark_vectors(args.embeddings, scale=args.scale)
+    print(f"Benchmark {len(bench_vectors)} vektor x {bench_vectors.shape[1]} dim, k={args.k}")
+    rows = benchmark_index_types(
+        bench_vectors,
+        index_types=args.types.split(","),
+        k=args.k,
+        n_queries=args.queries,
+        nprobe=args.nprobe,
+        ef_search=args.ef_search
+    )
+    for row in rows:
+        print(
+            f"  - {row['index_type']:<9} build {row['build_time_s']:7.2f}s | "
+            f"mem {row['memory_mb']:8.1f} MB | p50 {row['latency_p50_ms']:6.2f} ms | "
+            f"p95 {row['latency_p95_ms']:6.2f} ms | recall@{args.k} {row[f'recall@{args.k}']:.3f}"
+        )
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+Chunked Embeddings Helper
+Artikel panjang dipecah menjadi window kata yang overlap, semua window di-encode
+dalam batch besar, lalu di-pool menjadi satu vektor artikel. Vektor per chunk
+(opsional) disimpan di ChunkStore untuk pencarian best-matching chunk.
+"""
+
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from helpers.embedding_batcher import DEFAULT_MAX_SEQ_LENGTH, bucketed_encode
+from helpers.result_cache import CachedEncoder
+
+logger = logging.getLogger(__name__)
+
+# ~1.3 subword per kata untuk teks Indonesia pada tokenizer multilingual
+TOKENS_PER_WORD = 1.3
+DEFAULT_OVERLAP_WORDS = 16
+DEFAULT_MAX_CHUNKS = 4
+DEFAULT_CHUNK_BATCH_SIZE = 64
+
+
+def default_window_words(max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH) -> int:
+    """Jumlah kata per window agar muat di max_seq_length (dikurangi token spesial)"""
+    return max(int((max_seq_length - 2) / TOKENS_PER_WORD), 8)
+
+
+def validate_chunk_params(window_words: Optional[int] = None, overlap_words: int = DEFAULT_OVERLAP_WORDS) -> None:
+    """Pastikan 0 <= overlap_words < window_words (window default jika None)"""
+    window_words = window_words or default_window_words()
+    if not 0 <= overlap_words < window_words:
+        raise ValueError(
+            f"overlap_words harus >= 0 dan < window_words (overlap_words={overlap_words}, window_words={window_words})"
+        )
+
+
+def split_into_windows(
+    text: str,
+    window_words: int,
+    overlap_words: int = DEFAULT_OVERLAP_WORDS,
+    max_chunks: int = DEFAULT_MAX_CHUNKS
+) -> List[Tuple[int, str]]:
+    """
+    Pecah teks menjadi window kata yang overlap
+
+    Jika artikel butuh lebih dari max_chunks window, dipilih max_chunks window
+    yang tersebar merata (awal, tengah, akhir) sehingga biaya encode per artikel
+    tetap terbatas.
+
+    Returns:
+        List (offset kata awal, teks window)
+    """
+    words = str(text).split()
+    if len(words) <= window_words:
+        return [(0, " ".join(words))]
+
+    step = max(window_words - overlap_words, 1)
+    starts = list(range(0, len(words) - overlap_words, step)) or [0]
+    if starts[-1] + window_words < len(words):
+        starts.append(len(words) - window_words)
+    if len(starts) > max_chunks:
+        picks = np.linspace(0, len(starts) - 1, max_chunks).round().astype(int)
+        starts = [starts[i] for i in picks]
+
+    return [(start, " ".join(words[start:start + window_words])) for start in starts]
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+def encode_chunked(
+    encoder,
+    texts: Sequence[str],
+    window_words: Optional[int] = None,
+    overlap_words: int = DEFAULT_OVERLAP_WORDS,
+    max_chunks: int = DEFAULT_MAX_CHUNKS,
+    batch_size: int = DEFAULT_CHUNK_BATCH_SIZE
+) -> Tuple[np.ndarray, Dict[str, np.ndarray], Dict[str, float]]:
+    """
+    Encode teks per chunk lalu pool menjadi vektor artikel
+
+    Vektor chunk di-L2-normalize lalu dirata-rata dengan bobot jumlah kata chunk,
+    sehingga artikel pendek (satu chunk) menghasilkan vektor yang sama arahnya
+    dengan encode biasa.
+
+    Returns:
+        Tuple (article_vectors (n, dim), chunks, report) dengan chunks berisi
+        'owner' (indeks teks), 'offset' (kata awal) dan 'vectors' (ter-normalisasi)
+    """
+    if len(texts) == 0:
+        empty = {'owner': np.empty(0, dtype=np.int64), 'offset': np.empty(0, dtype=np.int32),
+                 'vectors': np.empty((0, 0), dtype=np.float32)}
+        return np.empty((0, 0), dtype=np.float32), empty, {'texts': 0}
+
+    base = encoder.model if isinstance(encoder, CachedEncoder) else encoder
+    max_seq_length = getattr(base, 'max_seq_length', None) or DEFAULT_MAX_SEQ_LENGTH
+    window_words = window_words or default_window_words(max_seq_length)
+    validate_chunk_params(window_words, overlap_words)
+    start_time = time.perf_counter()
+
+    owners, offsets, chunk_texts, chunk_words = [], [], [], []
+    for i, text in enumerate(texts):
+        for offset, chunk in split_into_windows(text, window_words, overlap_words, max_chunks):
+            owners.append(i)
+            offsets.append(offset)
+            chunk_texts.append(chunk)
+            chunk_words.append(max(len(chunk.split()), 1))
+
+    owner = np.asarray(owners, dtype=np.int64)
+    chunk_vectors, batch_report = bucketed_encode(encoder, chunk_texts, batch_size=batch_size)
+    chunk_vectors = _l2_normalize(chunk_vectors)
+
+    weights = np.asarray(chunk_words, dtype=np.float32)
+    pooled = np.zeros((len(texts), chunk_vectors.shape[1]), dtype=np.float32)
+    np.add.at(pooled, owner, chunk_vectors * weights[:, None])
+    pooled = _l2_normalize(pooled)
+
+    chunks_per_text = np.bincount(owner, minlength=len(texts))
+    report = {
+        'texts': len(texts),
+        'chunks': len(chunk_texts),
+        'chunks_per_text': float(chunks_per_text.mean()),
+        'multi_chunk_texts': int((chunks_per_text > 1).sum()),
+        # Biaya encode relatif terhadap satu window per artikel
+        'compute_ratio': len(chunk_texts) / len(texts),
+        'tokens_per_s': batch_report.get('tokens_per_s', 0.0),
+        'duration_s': time.perf_counter() - start_time
+    }
+    logger.info(
+        f"Chunked encode: {len(texts)} teks -> {len(chunk_texts)} chunk "
+        f"({report['compute_ratio']:.2f}x), {report['duration_s']:.1f}s"
+    )
+    chunks = {'owner': owner, 'offset': np.asarray(offsets, dtype=np.int32), 'vectors': chunk_vectors}
+    return pooled, chunks, report
+
+
+class ChunkStore:
+    """
+    Vektor per chunk dengan posisi artikel pemiliknya (posisi = id di similarity
+    index / posisi metadata), untuk mencari chunk yang paling cocok dengan query
+    """
+
+    def __init__(
+        self,
+        positions: Optional[np.ndarray] = None,
+        offsets: Optional[np.ndarray] = None,
+        vectors: Optional[np.ndarray] = None
+    ):
+        self.positions = positions if positions is not None else np.empty(0, dtype=np.int64)
+        self.offsets = offsets if offsets is not None else np.empty(0, dtype=np.int32)
+        self.vectors = vectors if vectors is not None else np.empty((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def remove_positions(self, positions: Sequence[int]) -> None:
+        """Buang semua chunk milik artikel di posisi tertentu"""
+        if not len(self) or not len(positions):
+            return
+        keep = ~np.isin(self.positions, np.asarray(positions, dtype=np.int64))
+        self.positions = np.asarray(self.positions[keep])
+        self.offsets = np.asarray(self.offsets[keep])
+        self.vectors = np.asarray(self.vectors[keep])
+
+    def add(self, positions: np.ndarray, offsets: np.ndarray, vectors: np.ndarray) -> None:
+        if not len(positions):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(self):
+            self.positions = np.concatenate([self.positions, positions])
+            self.offsets = np.concatenate([self.offsets, offsets])
+            self.vectors = np.vstack([self.vectors, vectors])
+        else:
+            self.positions, self.offsets, self.vectors = positions, offsets, vectors
+
+    def _search_top(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Inner product brute-force langsung di atas array vektor (memmap tetap
+        memmap: tidak dibangun IndexFlatIP yang menyalin semua vektor ke heap)
+        """
+        import faiss
+
+        vectors = self.vectors
+        if vectors.dtype != np.float32 or not vectors.flags['C_CONTIGUOUS']:
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        return faiss.knn(query, vectors, k, metric=faiss.METRIC_INNER_PRODUCT)
+
+    def search(self, query_vector: np.ndarray, top_k: int = 5, oversample: int = 4) -> List[Dict]:
+        """
+        Cari artikel dengan chunk paling mirip query (skor artikel = skor chunk terbaik)
+
+        Returns:
+            List dict: position, chunk_offset, similarity (urut menurun)
+        """
+        if not len(self):
+            return []
+        query = _l2_normalize(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))
+        k = min(len(self), top_k * oversample)
+        scores, rows = self._search_top(query, k)
+
+        results, seen = [], set()
+        for score, row in zip(scores[0], rows[0]):
+            if row < 0:
+                continue
+            position = int(self.positions[row])
+            if position in seen:
+                continue
+            seen.add(position)
+            results.append({
+                'position': position,
+                'chunk_offset': int(self.offsets[row]),
+                'similarity': float(score)
+            })
+            if len(results) == top_k:
+                break
+        return results
+
+    def save(self, directory) -> None:
+        """Simpan ke direktori (positions/offsets/vectors .npy), via direktori sementara"""
+        directory = Path(directory)
+        tmp_dir = directory.with_name(f".{directory.name}.{os.getpid()}.tmp")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+        np.save(tmp_dir / 'positions.npy', np.asarray(self.positions, dtype=np.int64))
+        np.save(tmp_dir / 'offsets.npy', np.asarray(self.offsets, dtype=np.int32))
+        np.save(tmp_dir / 'vectors.npy', np.asarray(self.vectors, dtype=np.float32))
+        if directory.exists():
+            shutil.rmtree(directory)
+        os.replace(tmp_dir, directory)
+
+    @classmethod
+    def load(cls, directory, mmap: bool = True) -> 'ChunkStore':
+        directory = Path(directory)
+        mode = 'r' if mmap else None
+        return cls(
+            np.load(directory / 'positions.npy', mmap_mode=mode),
+            np.load(directory / 'offsets.npy', mmap_mode=mode),
+            np.load(directory / 'vectors.npy', mmap_mode=mode)
+        )
+
+
+def benchmark_chunking(
+    encoder,
+    texts: Sequence[str],
+    n_queries: int = 200,
+    query_words: int = 40,
+    top_k: int = 5,
+    seed: int = 42,
+    **chunk_params
+) -> Dict[str, float]:
+    """
+    Bandingkan encode satu window (truncate) vs chunked pada teks panjang
+
+    Query diambil dari potongan teks setelah window pertama (bagian yang tidak
+    pernah dilihat encoder pada mode truncate); recall@k dihitung untuk vektor
+    truncate, vektor pooled dan best-chunk search.
+    """
+    base = encoder.model if isinstance(encoder, CachedEncoder) else encoder
+    window_words = chunk_params.get('window_words') or default_window_words(
+        getattr(base, 'max_seq_length', None) or DEFAULT_MAX_SEQ_LENGTH
+    )
+    texts = [str(t) for t in texts]
+    rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    truncated, _ = bucketed_encode(encoder, texts, batch_size=DEFAULT_CHUNK_BATCH_SIZE)
+    truncate_s = time.perf_counter() - start
+    pooled, chunks, report = encode_chunked(encoder, texts, window_words=window_words, **chunk_params)
+
+    long_ids = [i for i, t in enumerate(texts) if len(t.split()) > window_words + query_words]
+    if not long_ids:
+        return {'truncate_s': truncate_s, 'chunked_s': report['duration_s'], **report}
+    targets = rng.choice(long_ids, size=min(n_queries, len(long_ids)), replace=False)
+    queries = []
+    for i in targets:
+        words = texts[i].split()
+        start_word = int(rng.integers(window_words, len(words) - query_words + 1))
+        queries.append(" ".join(words[start_word:start_word + query_words]))
+    query_vectors = _l2_normalize(np.asarray(encoder.encode(queries, convert_to_numpy=True), dtype=np.float32))
+
+    def recall(matrix: np.ndarray) -> float:
+        top = np.argsort(-(query_vectors @ _l2_normalize(matrix).T), axis=1)[:, :top_k]
+        return float(np.mean([t in row for t, row in zip(targets, top)]))
+
+    store = ChunkStore(chunks['owner'], chunks['offset'], chunks['vectors'])
+    chunk_hits = [
+        t in {r['position'] for r in store.search(q, top_k=top_k)}
+        for t, q in zip(targets, query_vectors)
+    ]
+    return {
+        'texts': len(texts),
+        'long_texts': len(long_ids),
+        'truncate_s': truncate_s,
+        'chunked_s': report['duration_s'],
+        'compute_ratio': report['compute_ratio'],
+        f'recall@{top_k}_truncate': recall(truncated),
+        f'recall@{top_k}_pooled': recall(pooled),
+        f'recall@{top_k}_best_chunk': float(np.mean(chunk_hits))
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    from helpers.encoder_backends import ENCODER_BACKENDS, load_benchmark_texts, load_encoder
+
+    parser = argparse.ArgumentParser(description="Benchmark chunked embeddings vs truncate pada artikel panjang")
+    parser.add_argument("--texts", default=None, help="File teks (satu per baris); default ambil content artikel dari DB")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--backend", default='torch', choices=ENCODER_BACKENDS)
+    parser.add_argument("--max-chunks", type=int, default=DEFAULT_MAX_CHUNKS)
+    parser.add_argument("--overlap-words", type=int, default=DEFAULT_OVERLAP_WORDS)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    bench = benchmark_chunking(
+        load_encoder(args.backend),
+        load_benchmark_texts(args.texts, args.limit),
+        top_k=args.k,
+        max_chunks=args.max_chunks,
+        overlap_words=args.overlap_words
+    )
+    for name, value in bench.items():
+        print(f"  - {name:<24} {value:.3f}" if isinstance(value, float) else f"  - {name:<24} {value}")
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar Metadata Helper
+Metadata artikel similarity index disimpan per kolom (.npy) sehingga bisa di-memory-map
+dan dibagi antar proses lewat page cache OS, menggantikan list of dict yang di-pickle
+"""
+
+import json
+import os
+import shutil
+from collections import abc
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_FILE = 'schema.json'
+
+
+def _collect_fields(metadata: Sequence[Optional[Dict]]) -> List[str]:
+    fields = []
+    seen = {'id'}
+    for item in metadata:
+        if not isinstance(item, dict):
+            continue
+        for key in item:
+            if key not in seen:
+                seen.add(key)
+                fields.append(key)
+    return fields
+
+
+def write_columnar_metadata(metadata: Sequence[Optional[Dict]], directory) -> None:
+    """
+    Tulis metadata (list of dict, None = tombstone) ke direktori kolom.
+
+    Kolom 'id' disimpan sebagai int64, kolom lain sebagai string UTF-8
+    (blob + offsets) dengan null mask. Ditulis ke direktori sementara lalu
+    di-rename agar pembaca tidak pernah melihat direktori setengah jadi.
+    """
+    directory = Path(directory)
+    tmp_dir = directory.with_name(f".{directory.name}.{os.getpid()}.tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    n_rows = len(metadata)
+    fields = _collect_fields(metadata)
+    valid = np.fromiter((isinstance(m, dict) for m in metadata), dtype=bool, count=n_rows)
+    ids = np.full(n_rows, -1, dtype=np.int64)
+    for pos in np.flatnonzero(valid):
+        article_id = metadata[pos].get('id')
+        if article_id is not None:
+            ids[pos] = int(article_id)
+
+    np.save(tmp_dir / 'valid.npy', valid)
+    np.save(tmp_dir / 'id.npy', ids)
+
+    for field in fields:
+        values = [m.get(field) if isinstance(m, dict) else None for m in metadata]
+        nulls = np.fromiter((v is None for v in values), dtype=bool, count=n_rows)
+        encoded = [b'' if v is None else str(v).encode('utf-8') for v in values]
+        offsets = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        np.save(tmp_dir / f"{field}.null.npy", nulls)
+        np.save(tmp_dir / f"{field}.offsets.npy", offsets)
+        np.save(tmp_dir / f"{field}.data.npy", np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    with open(tmp_dir / SCHEMA_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'rows': n_rows, 'fields': fields}, f)
+
+    if directory.exists():
+        shutil.rmtree(directory)
+    os.replace(tmp_dir, directory)
+
+
+class ColumnarMetadata(abc.Sequence):
+    """
+    Pembaca metadata kolom; metadata[pos] mengembalikan dict (atau None untuk
+    tombstone) seperti list of dict yang dipakai SimilarityEngine
+    """
+
+    def __init__(self, directory, mmap: bool = True):
+        self.directory = Path(directory)
+        mode = 'r' if mmap else None
+        with open(self.directory / SCHEMA_FILE, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+
+        self.fields = schema['fields']
+        self._rows = schema['rows']
+        self.valid = np.load(self.directory / 'valid.npy', mmap_mode=mode)
+        self.ids = np.load(self.directory / 'id.npy', mmap_mode=mode)
+        self._columns = {
+            field: (
+                np.load(self.directory / f"{field}.null.npy", mmap_mode=mode),
+                np.load(self.directory / f"{field}.offsets.npy", mmap_mode=mode),
+                np.load(self.directory / f"{field}.data.npy", mmap_mode=mode)
+            )
+            for field in self.fields
+        }
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def value(self, field: str, pos: int):
+        """Ambil satu nilai kolom tanpa membangun dict"""
+        if field == 'id':
+            return int(self.ids[pos]) if self.ids[pos] >= 0 else None
+        nulls, offsets, data = self._columns[field]
+        if nulls[pos]:
+            return None
+        return bytes(data[offsets[pos]:offsets[pos + 1]]).decode('utf-8')
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(self._rows))]
+        if pos < 0:
+            pos += self._rows
+        if not 0 <= pos < self._rows:
+            raise IndexError(pos)
+        if not self.valid[pos]:
+            return None
+        item = {'id': self.value('id', pos)}
+        for field in self.fields:
+            # Field null dilewati agar metadata.get(field, default) tetap memberi default
+            nulls = self._columns[field][0]
+            if not nulls[pos]:
+                item[field] = self.value(field, pos)
+        return item
+
+    def positions_by_id(self) -> Dict[int, int]:
+        """Mapping article id -> posisi untuk baris yang valid"""
+        positions = np.flatnonzero(np.asarray(self.valid) & (np.asarray(self.ids) >= 0))
+        return dict(zip(np.asarray(self.ids)[positions].tolist(), positions.tolist()))
+
+    def touch(self) -> int:
+        """
+        Baca semua kolom sekali (seperti worker yang sudah melayani query), sehingga
+        halaman mmap ikut terhitung di RSS
+
+        Returns:
+            int: Jumlah bytes yang dibaca
+        """
+        arrays = [self.valid, self.ids]
+        for column in self._columns.values():
+            arrays.extend(column)
+        total = 0
+        for array in arrays:
+            np.asarray(array).view(np.uint8).sum(dtype=np.uint64)
+            total += int(array.nbytes)
+        return total
@@ -4,55 +4,86 @@ Content Clustering Helper
 Menggunakan embeddings dari Sentence-BERT untuk clustering artikel
 """
 
+import hashlib
 import numpy as np
 import pandas as pd
 from typing import Tuple, Optional, Dict, List
 import logging
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.decomposition import PCA
 from sklearn.manifold import TSNE
 from sklearn.preprocessing import StandardScaler
 import warnings
 warnings.filterwarnings('ignore')
 
+from helpers.embedding_store import EmbeddingStore
+from helpers.result_cache import TTLLRUCache
+from helpers.term_index import TermDocumentIndex
+
 logger = logging.getLogger(__name__)
 
+# Cache jumlah cluster optimal per (state filter, versi embeddings), dibagi antar sesi
+_optimal_k_cache = TTLLRUCache(maxsize=128)
+# Cache hasil clustering ringkas (labels + koordinat 2D), dibagi antar sesi
+CLUSTERING_CACHE_SIZE = 32
+_clustering_cache = TTLLRUCache(maxsize=CLUSTERING_CACHE_SIZE)
+
 
 def get_embeddings_for_articles(
     df: pd.DataFrame,
     similarity_engine,
     text_column: str = 'content',
-    batch_size: int = 32
+    batch_size: int = 32,
+    id_column: str = 'id',
+    embedding_store: Optional[EmbeddingStore] = None,
+    encoder=None
 ) -> Optional[np.ndarray]:
     """
-    Mendapatkan embeddings untuk artikel menggunakan similarity engine
-    
+    Mendapatkan embeddings untuk artikel menggunakan similarity engine.
+    Vektor yang sudah ada di similarity index diambil berdasarkan article id,
+    hanya artikel yang belum ter-index yang di-encode ulang.
+
     Args:
         df: DataFrame dengan artikel
         similarity_engine: SimilarityEngine dari DeepHoaxID
-        text_column: Kolom yang berisi teks artikel
+        text_column: Kolom yang berisi teks artikel (dipakai jika embedding_store tanpa text_fn)
         batch_size: Ukuran batch untuk encoding
-    
+        id_column: Kolom article id untuk lookup ke index
+        embedding_store: EmbeddingStore yang sudah ada (dibuat baru jika None)
+        encoder: Encoder pengganti sbert_model (mis. hasil encoder_backends.load_encoder)
+
     Returns:
         numpy array dengan embeddings atau None jika error
     """
     if similarity_engine is None or not hasattr(similarity_engine, 'sbert_model'):
         logger.error("Similarity engine tidak tersedia atau belum diinisialisasi")
         return None
-    
+
     try:
-        # Ambil teks dari dataframe
-        texts = df[text_column].fillna("").astype(str).tolist()
-        
-        # Encode menggunakan Sentence-BERT
-        embeddings = similarity_engine.sbert_model.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress_bar=False,
-            convert_to_numpy=True
-        )
-        
-        logger.info(f"Berhasil mendapatkan embeddings untuk {len(texts)} artikel")
+        if embedding_store is None:
+            embedding_store = EmbeddingStore(similarity_engine)
+
+        # Teks dibentuk seperti teks index (text_fn store) jika ada, selain itu kolom mentah
+        if embedding_store.text_fn is not None:
+            texts = None
+        else:
+            texts = df[text_column].fillna("").astype(str).tolist()
+
+        if id_column in df.columns:
+            # Ambil dari index, encode hanya yang miss
+            embeddings = embedding_store.get_embeddings(
+                df[id_column].tolist(),
+                texts,
+                batch_size=batch_size,
+                encoder=encoder,
+                articles=df
+            )
+        else:
+            if texts is None:
+                texts = embedding_store.article_texts(df)
+            embeddings = embedding_store.encode(texts, batch_size=batch_size, encoder=encoder)
+
+        logger.info(f"Berhasil mendapatkan embeddings untuk {len(df)} artikel")
         return embeddings
     
     except Exception as e:
@@ -60,11 +91,76 @@ def get_embeddings_for_articles(
         return None
 
 
+CLUSTERING_METHODS = ('auto', 'kmeans', 'minibatch', 'faiss')
+# Di atas jumlah ini mode 'auto' memakai MiniBatchKMeans
+AUTO_MINIBATCH_THRESHOLD = 5000
+MINIBATCH_SIZE = 4096
+
+
+class FaissKMeansModel:
+    """
+    Hasil FAISS k-means dengan atribut mirip sklearn (cluster_centers_, labels_,
+    inertia_) plus predict() dan partial_fit() untuk artikel baru
+    """
+
+    def __init__(self, centroids: np.ndarray, counts: np.ndarray, inertia: float, labels: np.ndarray):
+        import faiss
+
+        self.cluster_centers_ = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.counts_ = counts.astype(np.int64)
+        self.inertia_ = inertia
+        self.labels_ = labels
+        self.n_clusters = len(centroids)
+        self._index = faiss.IndexFlatL2(self.cluster_centers_.shape[1])
+        self._index.add(self.cluster_centers_)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        _, labels = self._index.search(np.ascontiguousarray(X, dtype=np.float32), 1)
+        return labels[:, 0]
+
+    def partial_fit(self, X: np.ndarray) -> 'FaissKMeansModel':
+        """Update centroid dengan rata-rata berjalan (seperti mini-batch k-means)"""
+        labels = self.predict(X)
+        for cluster_id in np.unique(labels):
+            members = X[labels == cluster_id]
+            total = self.counts_[cluster_id] + len(members)
+            self.cluster_centers_[cluster_id] += (members.sum(axis=0) - len(members) * self.cluster_centers_[cluster_id]) / total
+            self.counts_[cluster_id] = total
+        self._index.reset()
+        self._index.add(self.cluster_centers_)
+        return self
+
+
+def _fit_faiss_kmeans(embeddings_scaled: np.ndarray, n_clusters: int, random_state: int) -> FaissKMeansModel:
+    import faiss
+
+    X = np.ascontiguousarray(embeddings_scaled, dtype=np.float32)
+    kmeans = faiss.Kmeans(
+        X.shape[1],
+        n_clusters,
+        niter=25,
+        nredo=1,
+        seed=random_state,
+        max_points_per_centroid=512,
+        verbose=False
+    )
+    kmeans.train(X)
+    distances, labels = kmeans.index.search(X, 1)
+    labels = labels[:, 0]
+    return FaissKMeansModel(
+        kmeans.centroids,
+        np.bincount(labels, minlength=n_clusters),
+        float(distances.sum()),
+        labels
+    )
+
+
 def perform_clustering(
     embeddings: np.ndarray,
     n_clusters: int = 5,
-    random_state: int = 42
-) -> Tuple[np.ndarray, KMeans]:
+    random_state: int = 42,
+    method: str = 'kmeans'
+) -> Tuple[np.ndarray, object]:
     """
     Melakukan clustering menggunakan KMeans
     
@@ -72,25 +168,48 @@ def perform_clustering(
         embeddings: Array embeddings
         n_clusters: Jumlah cluster
         random_state: Random state untuk reproducibility
+        method: 'kmeans' (full batch), 'minibatch' (MiniBatchKMeans), 'faiss'
+            (FAISS k-means) atau 'auto' (minibatch untuk korpus besar)
     
     Returns:
-        Tuple (cluster_labels, kmeans_model)
+        Tuple (cluster_labels, kmeans_model); scaler yang dipakai tersimpan di
+        kmeans_model.scaler_ untuk assign artikel baru
     """
     try:
+        if method not in CLUSTERING_METHODS:
+            raise ValueError(f"Method clustering tidak dikenal: {method}")
+        if method == 'auto':
+            method = 'minibatch' if len(embeddings) > AUTO_MINIBATCH_THRESHOLD else 'kmeans'
+        
         # Standardize embeddings
         scaler = StandardScaler()
-        embeddings_scaled = scaler.fit_transform(embeddings)
+        embeddings_scaled = scaler.fit_transform(embeddings).astype(np.float32)
         
-        # KMeans clustering
-        kmeans = KMeans(
-            n_clusters=n_clusters,
-            random_state=random_state,
-            n_init=10,
-            max_iter=300
-        )
-        cluster_labels = kmeans.fit_predict(embeddings_scaled)
+        if method == 'faiss':
+            kmeans = _fit_faiss_kmeans(embeddings_scaled, n_clusters, random_state)
+            cluster_labels = kmeans.labels_
+        elif method == 'minibatch':
+            kmeans = MiniBatchKMeans(
+                n_clusters=n_clusters,
+                random_state=random_state,
+                batch_size=MINIBATCH_SIZE,
+                n_init=3,
+                max_iter=100,
+                reassignment_ratio=0.01
+            )
+            cluster_labels = kmeans.fit_predict(embeddings_scaled)
+        else:
+            # KMeans clustering
+            kmeans = KMeans(
+                n_clusters=n_clusters,
+                random_state=random_state,
+                n_init=10,
+                max_iter=300
+            )
+            cluster_labels = kmeans.fit_predict(embeddings_scaled)
+        kmeans.scaler_ = scaler
         
-        logger.info(f"Clustering selesai: {n_clusters} cluster, {len(cluster_labels)} artikel")
+        logger.info(f"Clustering selesai ({method}): {n_clusters} cluster, {len(cluster_labels)} artikel")
         return cluster_labels, kmeans
     
     except Exception as e:
@@ -98,6 +217,64 @@ def perform_clustering(
         raise
 
 
+def partial_fit_clustering(kmeans_model, new_embeddings: np.ndarray) -> np.ndarray:
+    """
+    Tambahkan artikel baru ke model clustering yang sudah ada
+    
+    MiniBatchKMeans dan FAISS k-means meng-update centroid secara streaming;
+    KMeans full batch hanya meng-assign ke centroid terdekat.
+    
+    Args:
+        kmeans_model: Model hasil perform_clustering
+        new_embeddings: Embeddings artikel baru
+    
+    Returns:
+        Label cluster artikel baru
+    """
+    X = kmeans_model.scaler_.transform(new_embeddings).astype(np.float32)
+    if hasattr(kmeans_model, 'partial_fit'):
+        kmeans_model.partial_fit(X)
+    return kmeans_model.predict(X)
+
+
+def benchmark_clustering(
+    embeddings: np.ndarray,
+    n_clusters: int = 10,
+    methods: Tuple[str, ...] = ('kmeans', 'minibatch', 'faiss'),
+    random_state: int = 42
+) -> List[Dict]:
+    """
+    Bandingkan waktu fit, inertia dan kesamaan label (ARI terhadap method pertama)
+    
+    Returns:
+        List[Dict]: method, n_vectors, fit_time_s, inertia_ratio, ari_vs_first
+    """
+    import time
+    from sklearn.metrics import adjusted_rand_score
+    
+    scaled = StandardScaler().fit_transform(embeddings).astype(np.float32)
+    results = []
+    reference_labels, reference_inertia = None, None
+    for method in methods:
+        start = time.perf_counter()
+        labels, model = perform_clustering(embeddings, n_clusters=n_clusters, random_state=random_state, method=method)
+        fit_time = time.perf_counter() - start
+        
+        centers = np.asarray(model.cluster_centers_, dtype=np.float32)
+        inertia = float(((scaled - centers[labels]) ** 2).sum())
+        if reference_labels is None:
+            reference_labels, reference_inertia = labels, inertia
+        results.append({
+            'method': method,
+            'n_vectors': len(embeddings),
+            'fit_time_s': fit_time,
+            'inertia_ratio': inertia / reference_inertia,
+            'ari_vs_first': float(adjusted_rand_score(reference_labels, labels))
+        })
+        logger.info(f"Benchmark clustering {method}: {results[-1]}")
+    return results
+
+
 def reduce_dimensions(
     embeddings: np.ndarray,
     method: str = 'pca',
@@ -129,7 +306,9 @@ def reduce_dimensions(
                 n_components=n_components,
                 random_state=random_state,
                 perplexity=min(30, len(embeddings) - 1),
-                n_iter=1000
+                init='pca',
+                learning_rate='auto',
+                max_iter=1000
             )
             reduced = reducer.fit_transform(embeddings)
             logger.info("t-SNE selesai")
@@ -143,28 +322,81 @@ def reduce_dimensions(
         raise
 
 
+def article_set_key(article_ids) -> str:
+    """Hash SHA-1 dari set article id terurut (mewakili state filter)"""
+    ids = sorted(str(a) for a in article_ids)
+    return hashlib.sha1(",".join(ids).encode('utf-8')).hexdigest()
+
+
+def _warm_start_centers(X: np.ndarray, centers: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Init k+1 centroid: centroid k sebelumnya + titik terjauh dari centroid-nya"""
+    distances = ((X - centers[labels]) ** 2).sum(axis=1)
+    return np.vstack([centers, X[np.argmax(distances)]])
+
+
+def _fit_and_score(X: np.ndarray, k: int, sample_size: int, random_state: int, init=None):
+    """Fit MiniBatchKMeans untuk satu k lalu hitung silhouette tersampel"""
+    from sklearn.metrics import silhouette_score
+
+    kmeans = MiniBatchKMeans(
+        n_clusters=k,
+        init=init if init is not None else 'k-means++',
+        n_init=1 if init is not None else 3,
+        random_state=random_state,
+        batch_size=MINIBATCH_SIZE,
+        max_iter=100
+    )
+    labels = kmeans.fit_predict(X)
+    if len(np.unique(labels)) < 2:
+        return k, -1.0, kmeans.cluster_centers_, labels
+    score = silhouette_score(X, labels, sample_size=min(sample_size, len(X)), random_state=random_state)
+    return k, float(score), kmeans.cluster_centers_, labels
+
+
 def calculate_optimal_clusters(
     embeddings: np.ndarray,
     max_clusters: int = 10,
-    random_state: int = 42
+    random_state: int = 42,
+    sample_size: int = 2000,
+    fit_sample_size: int = 20000,
+    patience: int = 3,
+    n_jobs: int = 1,
+    cache_key: Optional[Tuple] = None
 ) -> int:
     """
-    Menghitung jumlah cluster optimal menggunakan Elbow Method
+    Menghitung jumlah cluster optimal berdasarkan silhouette score
+    
+    Silhouette dihitung pada sampel (sample_size) bukan O(n^2) penuh, fit memakai
+    MiniBatchKMeans pada maksimal fit_sample_size artikel. Mode default (n_jobs=1)
+    mencoba k berurutan dengan warm start dari centroid k-1 dan berhenti jika
+    silhouette tidak membaik selama `patience` k berturut-turut; n_jobs > 1
+    mencoba semua k paralel di process pool.
     
     Args:
         embeddings: Array embeddings
         max_clusters: Maksimum jumlah cluster untuk dicoba
         random_state: Random state
+        sample_size: Jumlah sampel untuk silhouette score
+        fit_sample_size: Jumlah artikel maksimum untuk fit per k
+        patience: Early stopping (mode berurutan)
+        n_jobs: Jumlah proses untuk fit paralel
+        cache_key: Key cache, mis. (article_set_key(ids), versi embeddings);
+            hasil untuk key yang sama dikembalikan langsung
     
     Returns:
         Jumlah cluster optimal
     """
+    if cache_key is not None:
+        full_key = (cache_key, max_clusters, random_state, sample_size)
+        cached = _optimal_k_cache.get(full_key)
+        if cached is not None:
+            logger.info(f"Optimal clusters dari cache: {cached}")
+            return cached
+    
     try:
-        from sklearn.metrics import silhouette_score
-        
         # Standardize
         scaler = StandardScaler()
-        embeddings_scaled = scaler.fit_transform(embeddings)
+        embeddings_scaled = scaler.fit_transform(embeddings).astype(np.float32)
         
         # Coba berbagai jumlah cluster
         n_samples = len(embeddings)
@@ -173,26 +405,43 @@ def calculate_optimal_clusters(
         if max_k < 2:
             return 2
         
-        inertias = []
-        silhouette_scores = []
-        k_range = range(2, max_k + 1)
+        X = embeddings_scaled
+        if n_samples > fit_sample_size:
+            rng = np.random.default_rng(random_state)
+            X = X[rng.choice(n_samples, fit_sample_size, replace=False)]
         
-        for k in k_range:
-            kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=10)
-            labels = kmeans.fit_predict(embeddings_scaled)
-            inertias.append(kmeans.inertia_)
-            
-            if k > 1:  # Silhouette score butuh minimal 2 cluster
-                sil_score = silhouette_score(embeddings_scaled, labels)
-                silhouette_scores.append(sil_score)
-            else:
-                silhouette_scores.append(0)
+        silhouette_scores = {}
+        if n_jobs and n_jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = [
+                    executor.submit(_fit_and_score, X, k, sample_size, random_state)
+                    for k in range(2, max_k + 1)
+                ]
+                for future in futures:
+                    k, score, _, _ = future.result()
+                    silhouette_scores[k] = score
+        else:
+            best_score, since_best = -np.inf, 0
+            init = None
+            for k in range(2, max_k + 1):
+                _, score, centers, labels = _fit_and_score(X, k, sample_size, random_state, init=init)
+                silhouette_scores[k] = score
+                if score > best_score:
+                    best_score, since_best = score, 0
+                else:
+                    since_best += 1
+                    if since_best >= patience:
+                        logger.info(f"Early stopping di k={k}")
+                        break
+                init = _warm_start_centers(X, centers, labels)
         
         # Pilih k dengan silhouette score tertinggi
-        best_k_idx = np.argmax(silhouette_scores)
-        optimal_k = k_range[best_k_idx]
+        optimal_k = max(silhouette_scores, key=silhouette_scores.get)
         
-        logger.info(f"Optimal clusters: {optimal_k} (silhouette score: {silhouette_scores[best_k_idx]:.3f})")
+        logger.info(f"Optimal clusters: {optimal_k} (silhouette score: {silhouette_scores[optimal_k]:.3f}, {len(silhouette_scores)} k dicoba)")
+        if cache_key is not None:
+            _optimal_k_cache.set(full_key, optimal_k)
         return optimal_k
     
     except Exception as e:
@@ -200,6 +449,104 @@ def calculate_optimal_clusters(
         return 5
 
 
+def clustering_cache_key(
+    article_ids,
+    n_clusters,
+    method: str,
+    reduction_method: str,
+    embedding_version: int
+) -> Tuple:
+    """Key cache clustering: (hash set article id, n_clusters, method, reduksi, versi embeddings)"""
+    return (article_set_key(article_ids), n_clusters, method, reduction_method, embedding_version)
+
+
+def _align_result(result: Dict, article_ids: List) -> Dict:
+    """Susun ulang labels/coords hasil cache sesuai urutan article_ids pemanggil"""
+    order = pd.Index(result['article_ids']).get_indexer(article_ids)
+    return dict(
+        result,
+        article_ids=np.asarray(article_ids),
+        labels=result['labels'][order],
+        coords=result['coords'][order]
+    )
+
+
+def run_clustering(
+    df: pd.DataFrame,
+    similarity_engine,
+    n_clusters: int = 5,
+    method: str = 'auto',
+    reduction_method: str = 'pca',
+    use_optimal: bool = False,
+    embedding_version: int = 0,
+    embedding_store: Optional[EmbeddingStore] = None,
+    projection_service=None,
+    text_column: str = 'content',
+    id_column: str = 'id'
+) -> Optional[Dict]:
+    """
+    Jalankan clustering lengkap (embeddings, k optimal, KMeans, koordinat 2D)
+    dengan cache bersama antar sesi
+    
+    Hasil disimpan ringkas (article_ids, labels int16, coords float32) di LRU
+    berukuran terbatas dengan key clustering_cache_key; run identik dari sesi
+    lain atau setelah refresh langsung memakai hasil cache.
+    
+    Returns:
+        Dict: article_ids, labels, coords, n_clusters, method, reduction_method,
+        embedding_version, cache_hit; None jika embeddings gagal didapat
+    """
+    article_ids = df[id_column].tolist()
+    key = clustering_cache_key(
+        article_ids, 'optimal' if use_optimal else n_clusters, method, reduction_method, embedding_version
+    )
+    cached = _clustering_cache.get(key)
+    if cached is not None:
+        logger.info(f"Clustering dari cache: {cached['n_clusters']} cluster, {len(article_ids)} artikel")
+        return dict(_align_result(cached, article_ids), cache_hit=True)
+    
+    embeddings = get_embeddings_for_articles(
+        df, similarity_engine, text_column=text_column, id_column=id_column, embedding_store=embedding_store
+    )
+    if embeddings is None:
+        return None
+    
+    if use_optimal:
+        n_clusters = calculate_optimal_clusters(embeddings, max_clusters=20, cache_key=(key[0], embedding_version))
+    
+    cluster_labels, _ = perform_clustering(embeddings, n_clusters=n_clusters, method=method)
+    
+    if projection_service is not None:
+        coords = projection_service.coordinates(article_ids, method=reduction_method, embeddings=embeddings)
+    else:
+        coords = reduce_dimensions(embeddings, method=reduction_method, n_components=2)
+    
+    result = {
+        'article_ids': np.asarray(article_ids),
+        'labels': np.asarray(cluster_labels, dtype=np.int16),
+        'coords': np.asarray(coords, dtype=np.float32),
+        'n_clusters': n_clusters,
+        'method': method,
+        'reduction_method': reduction_method,
+        'embedding_version': embedding_version
+    }
+    _clustering_cache.set(key, result)
+    return dict(result, cache_hit=False)
+
+
+def _top_value_per_cluster(cluster: pd.Series, values: pd.Series) -> pd.DataFrame:
+    """Nilai terbanyak (dan jumlahnya) per cluster dalam satu groupby"""
+    counts = (
+        pd.DataFrame({'cluster': cluster.to_numpy(), 'value': values.to_numpy()})
+        .groupby(['cluster', 'value'], sort=False)
+        .size()
+        .reset_index(name='count')
+    )
+    # Urut jumlah menurun; seri dipecah sama seperti value_counts (urutan kemunculan)
+    counts = counts.sort_values(['cluster', 'count'], ascending=[True, False], kind='stable')
+    return counts.drop_duplicates('cluster').set_index('cluster')
+
+
 def get_cluster_statistics(
     df: pd.DataFrame,
     cluster_labels: np.ndarray
@@ -215,42 +562,29 @@ def get_cluster_statistics(
         DataFrame dengan statistik per cluster
     """
     try:
-        df_clustered = df.copy()
-        df_clustered['cluster'] = cluster_labels
+        cluster = pd.Series(np.asarray(cluster_labels), index=df.index, name='cluster')
+        
+        sizes = cluster.value_counts().sort_index()
+        stats_df = pd.DataFrame({
+            'cluster': sizes.index,
+            'jumlah_artikel': sizes.to_numpy(),
+            'persentase': sizes.to_numpy() / len(cluster) * 100
+        })
         
-        # Statistik per cluster
-        stats = []
-        for cluster_id in sorted(df_clustered['cluster'].unique()):
-            cluster_df = df_clustered[df_clustered['cluster'] == cluster_id]
-            
-            stat = {
-                'cluster': cluster_id,
-                'jumlah_artikel': len(cluster_df),
-                'persentase': len(cluster_df) / len(df_clustered) * 100
-            }
-            
-            # Statistik kategori jika ada
-            if 'categories' in cluster_df.columns:
-                top_category = cluster_df['categories'].value_counts().head(1)
-                if not top_category.empty:
-                    stat['kategori_teratas'] = top_category.index[0]
-                    stat['jumlah_kategori_teratas'] = top_category.values[0]
-            
-            # Statistik lokasi jika ada
-            if 'relevant_province' in cluster_df.columns:
-                top_province = cluster_df['relevant_province'].value_counts().head(1)
-                if not top_province.empty:
-                    stat['provinsi_teratas'] = top_province.index[0]
-            
-            # Statistik platform jika ada
-            if 'platform' in cluster_df.columns:
-                top_platform = cluster_df['platform'].value_counts().head(1)
-                if not top_platform.empty:
-                    stat['platform_teratas'] = top_platform.index[0]
-            
-            stats.append(stat)
+        # Nilai teratas per cluster untuk kategori, provinsi dan platform
+        top_columns = {
+            'categories': ('kategori_teratas', 'jumlah_kategori_teratas'),
+            'relevant_province': ('provinsi_teratas', None),
+            'platform': ('platform_teratas', None)
+        }
+        for column, (name_column, count_column) in top_columns.items():
+            if column not in df.columns:
+                continue
+            top = _top_value_per_cluster(cluster, df[column])
+            stats_df[name_column] = stats_df['cluster'].map(top['value'])
+            if count_column:
+                stats_df[count_column] = stats_df['cluster'].map(top['count'])
         
-        stats_df = pd.DataFrame(stats)
         return stats_df
     
     except Exception as e:
@@ -262,59 +596,77 @@ def get_cluster_keywords(
     df: pd.DataFrame,
     cluster_labels: np.ndarray,
     text_column: str = 'content',
-    top_n: int = 10
+    top_n: int = 10,
+    term_index: Optional[TermDocumentIndex] = None,
+    id_column: str = 'id'
 ) -> Dict[int, List[str]]:
     """
-    Mendapatkan kata kunci untuk setiap cluster
+    Mendapatkan kata kunci untuk setiap cluster dengan c-TF-IDF
     
     Args:
         df: DataFrame dengan artikel
         cluster_labels: Label cluster
         text_column: Kolom teks
         top_n: Jumlah kata kunci teratas
+        term_index: TermDocumentIndex yang sudah dibangun (mis. untuk seluruh
+            korpus); baris dicari lewat id_column. Dibangun dari df jika None.
+        id_column: Kolom article id
     
     Returns:
         Dictionary {cluster_id: [keywords]}
     """
     try:
-        from collections import Counter
-        import re
-        
-        df_clustered = df.copy()
-        df_clustered['cluster'] = cluster_labels
-        
-        cluster_keywords = {}
-        
-        for cluster_id in sorted(df_clustered['cluster'].unique()):
-            cluster_df = df_clustered[df_clustered['cluster'] == cluster_id]
-            
-            # Gabungkan semua teks
-            all_text = " ".join(cluster_df[text_column].fillna("").astype(str))
-            
-            # Clean dan split
-            all_text = all_text.lower()
-            all_text = re.sub(r'[^\w\s]', ' ', all_text)
-            words = all_text.split()
-            
-            # Filter stopwords sederhana
-            stopwords = {
-                'yang', 'di', 'ke', 'dari', 'dan', 'atau', 'untuk', 'pada', 'dengan', 'dalam',
-                'adalah', 'ini', 'itu', 'tidak', 'akan', 'sudah', 'telah', 'juga', 'dapat', 'bisa',
-                'ada', 'nya', 'oleh', 'kepada', 'terhadap', 'antara', 'karena', 'jika',
-                'tersebut', 'tadi', 'demikian', 'begitu', 'saja', 'juga', 'pula'
-            }
-            
-            words = [w for w in words if len(w) >= 4 and w not in stopwords]
-            
-            # Count dan ambil top N
-            word_counts = Counter(words)
-            top_words = [word for word, count in word_counts.most_common(top_n)]
-            
-            cluster_keywords[cluster_id] = top_words
+        if term_index is not None and term_index.ids is not None and id_column in df.columns:
+            rows = term_index.rows_for(df[id_column].tolist())
+        else:
+            term_index = TermDocumentIndex.build(df, text_column=text_column, id_column=id_column, min_df=1)
+            rows = np.arange(len(df))
         
-        return cluster_keywords
+        return term_index.cluster_keywords(rows, np.asarray(cluster_labels), top_n=top_n)
     
     except Exception as e:
         logger.error(f"Error saat mendapatkan kata kunci cluster: {e}")
         return {}
 
+
+def benchmark_cluster_summaries(df: pd.DataFrame, n_clusters: int = 10, text_column: str = 'content', seed: int = 42) -> Dict[str, float]:
+    """
+    Ukur waktu statistik + kata kunci cluster: build term index (sekali),
+    lalu per run clustering (statistik groupby + c-TF-IDF)
+    """
+    import time
+    
+    labels = np.random.default_rng(seed).integers(0, n_clusters, len(df))
+    
+    start = time.perf_counter()
+    term_index = TermDocumentIndex.build(df, text_column=text_column)
+    build_s = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    get_cluster_statistics(df, labels)
+    stats_s = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    get_cluster_keywords(df, labels, text_column=text_column, term_index=term_index)
+    keywords_s = time.perf_counter() - start
+    
+    return {'articles': len(df), 'term_index_build_s': build_s, 'statistics_s': stats_s, 'keywords_s': keywords_s}
+
+if __name__ == "__main__":
+    import argparse
+    from helpers.ann_index import load_benchmark_vectors
+
+    parser = argparse.ArgumentParser(description="Benchmark metode clustering pada embeddings cache")
+    parser.add_argument("embeddings", help="Path .npy embeddings cache (n x 384)")
+    parser.add_argument("--scale", type=int, default=None, help="Perbesar korpus sampai N vektor (mis. 1000000)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--methods", default="kmeans,minibatch,faiss")
+    args = parser.parse_args()
+
+    bench_vectors = load_benchmark_vectors(args.embeddings, scale=args.scale)
+    print(f"Benchmark clustering {len(bench_vectors)} vektor x {bench_vectors.shape[1]} dim, k={args.k}")
+    for row in benchmark_clustering(bench_vectors, n_clusters=args.k, methods=tuple(args.methods.split(","))):
+        print(
+            f"  - {row['method']:<9} fit {row['fit_time_s']:7.2f}s | inertia x{row['inertia_ratio']:.3f} | "
+            f"ARI vs {args.methods.split(',')[0]} {row['ari_vs_first']:.3f}"
+        )
@@ -6,6 +6,7 @@ Wrapper untuk menggantikan Firebase dengan PostgreSQL
 
 import sys
 import time
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -41,6 +42,20 @@ try:
         MODELS_DIR = getattr(config_module, 'MODELS_DIR', 'models')
         FAISS_INDEX_PATH = getattr(config_module, 'FAISS_INDEX_PATH', None)
         FAISS_METADATA_PATH = getattr(config_module, 'FAISS_METADATA_PATH', None)
+        INDEX_STORE_DIR = getattr(config_module, 'INDEX_STORE_DIR', dashboard_root / 'models' / 'index_store')
+        INDEX_REFRESH_INTERVAL = getattr(config_module, 'INDEX_REFRESH_INTERVAL', 300)
+        ANN_INDEX_TYPE = getattr(config_module, 'ANN_INDEX_TYPE', 'flat')
+        ANN_INDEX_PARAMS = getattr(config_module, 'ANN_INDEX_PARAMS', {})
+        RESULT_CACHE_SIZE = getattr(config_module, 'RESULT_CACHE_SIZE', 512)
+        RESULT_CACHE_TTL = getattr(config_module, 'RESULT_CACHE_TTL', 3600)
+        EMBEDDING_CACHE_SIZE = getattr(config_module, 'EMBEDDING_CACHE_SIZE', 2048)
+        LATENCY_WINDOW = getattr(config_module, 'LATENCY_WINDOW', 1000)
+        METRICS_PORT = getattr(config_module, 'METRICS_PORT', None)
+        ENCODER_BACKEND = getattr(config_module, 'ENCODER_BACKEND', 'torch')
+        ENCODER_ONNX_DIR = getattr(config_module, 'ENCODER_ONNX_DIR', dashboard_root / 'models' / 'onnx')
+        CHUNKED_EMBEDDINGS = getattr(config_module, 'CHUNKED_EMBEDDINGS', False)
+        CHUNK_PARAMS = getattr(config_module, 'CHUNK_PARAMS', {})
+        TOPIC_MODEL_PARAMS = getattr(config_module, 'TOPIC_MODEL_PARAMS', {})
     else:
         # Fallback values
         SYSTEM_VERSION = '1.0.0'
@@ -53,6 +68,20 @@ try:
         MODELS_DIR = 'models'
         FAISS_INDEX_PATH = None
         FAISS_METADATA_PATH = None
+        INDEX_STORE_DIR = dashboard_root / 'models' / 'index_store'
+        INDEX_REFRESH_INTERVAL = 300
+        ANN_INDEX_TYPE = 'flat'
+        ANN_INDEX_PARAMS = {}
+        RESULT_CACHE_SIZE = 512
+        RESULT_CACHE_TTL = 3600
+        EMBEDDING_CACHE_SIZE = 2048
+        LATENCY_WINDOW = 1000
+        METRICS_PORT = None
+        ENCODER_BACKEND = 'torch'
+        ENCODER_ONNX_DIR = dashboard_root / 'models' / 'onnx'
+        CHUNKED_EMBEDDINGS = False
+        CHUNK_PARAMS = {}
+        TOPIC_MODEL_PARAMS = {}
 except Exception as e:
     logger.warning(f"Could not load config: {e}, using defaults")
     SYSTEM_VERSION = '1.0.0'
@@ -65,8 +94,29 @@ except Exception as e:
     MODELS_DIR = 'models'
     FAISS_INDEX_PATH = None
     FAISS_METADATA_PATH = None
+    INDEX_STORE_DIR = dashboard_root / 'models' / 'index_store'
+    INDEX_REFRESH_INTERVAL = 300
+    ANN_INDEX_TYPE = 'flat'
+    ANN_INDEX_PARAMS = {}
+    RESULT_CACHE_SIZE = 512
+    RESULT_CACHE_TTL = 3600
+    EMBEDDING_CACHE_SIZE = 2048
+    LATENCY_WINDOW = 1000
+    METRICS_PORT = None
+    ENCODER_BACKEND = 'torch'
+    ENCODER_ONNX_DIR = dashboard_root / 'models' / 'onnx'
+    CHUNKED_EMBEDDINGS = False
+    CHUNK_PARAMS = {}
+    TOPIC_MODEL_PARAMS = {}
 
 from helpers.postgres_db_adapter import PostgreSQLDatabaseAdapter
+from helpers.embedding_store import EmbeddingStore, get_engine_metadata
+from helpers.index_maintenance import IndexMaintenanceService, process_memory_mb
+from helpers.result_cache import TTLLRUCache, CachedEncoder, text_cache_key
+from helpers.latency_metrics import StageTimer, LatencyHistogram, start_metrics_server
+from helpers.encoder_backends import PARITY_TEXTS, PARITY_THRESHOLD, load_encoder, parity_check
+from helpers.projection_service import ProjectionService
+from helpers.topic_model import TopicModelService
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -82,8 +132,20 @@ class DeepHoaxIDPostgreSQLWrapper:
     menggantikan Firebase DatabaseManager
     """
     
-    def __init__(self):
-        """Initialize sistem"""
+    def __init__(
+        self,
+        index_type: str = ANN_INDEX_TYPE,
+        index_params: Optional[Dict] = None,
+        encoder_backend: str = ENCODER_BACKEND
+    ):
+        """
+        Initialize sistem
+        
+        Args:
+            index_type: Tipe FAISS index ('flat', 'ivf_flat', 'hnsw', 'ivf_pq')
+            index_params: Parameter index (nlist, nprobe, hnsw_m, ef_search, pq_m)
+            encoder_backend: Backend encoder SBERT ('torch', 'torch_int8', 'onnx', 'onnx_int8')
+        """
         
         self.system_info = {
             'name': 'DeepHoaxID',
@@ -105,6 +167,26 @@ class DeepHoaxIDPostgreSQLWrapper:
         self.similarity_engine = None
         self.chat_filter = None
         self.response_generator = None
+        self.embedding_store = None
+        self.index_maintenance = None
+        self.projection_service = None
+        self.topic_model = None
+        self.index_lock = threading.RLock()
+        self._refresh_thread = None
+        self._refresh_lock = threading.Lock()
+        self.index_type = index_type
+        self.index_params = dict(ANN_INDEX_PARAMS, **(index_params or {}))
+        self.encoder_backend = encoder_backend
+        
+        # Cache hasil analisis (key: hash teks preprocess) dan embeddings query
+        self.result_cache = TTLLRUCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+        self.embedding_cache = TTLLRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+        self._result_cache_version = None
+        
+        # Latency per tahap (rolling p50/p95/p99) dan endpoint Prometheus opsional
+        self.latency = LatencyHistogram(window=LATENCY_WINDOW)
+        self._timing = threading.local()
+        self.metrics_server = None
 
         logger.info(f"🔧 Initializing {self.system_info['name']} v{self.system_info['version']} (PostgreSQL)")
 
@@ -113,6 +195,7 @@ class DeepHoaxIDPostgreSQLWrapper:
         Initialize sistem dengan PostgreSQL adapter
         Override method untuk menggunakan PostgreSQL
         """
+        init_start = time.time()
         try:
             logger.info("🔧 Initializing system components with PostgreSQL...")
             
@@ -154,8 +237,48 @@ class DeepHoaxIDPostgreSQLWrapper:
             from similarity_engine import SimilarityEngine
             self.similarity_engine = SimilarityEngine()
             
+            # Backend encoder CPU (int8 / ONNX Runtime) menggantikan model PyTorch fp32,
+            # hanya jika embeddings-nya lolos parity check terhadap model fp32
+            if self.encoder_backend != 'torch':
+                try:
+                    base_model = self.similarity_engine.sbert_model
+                    encoder = load_encoder(
+                        self.encoder_backend,
+                        base_model=base_model,
+                        onnx_dir=ENCODER_ONNX_DIR
+                    )
+                    parity = parity_check(base_model, encoder, PARITY_TEXTS)
+                    self.system_info['components']['encoder_parity'] = parity
+                    if not parity['passed']:
+                        raise ValueError(
+                            f"parity check gagal (cosine mean {parity['cosine_mean']:.4f} < {PARITY_THRESHOLD})"
+                        )
+                    self.similarity_engine.sbert_model = encoder
+                    logger.info(f"✅ Encoder backend: {self.encoder_backend} (cosine mean {parity['cosine_mean']:.4f})")
+                except Exception as e:
+                    logger.warning(f"⚠️ Encoder backend {self.encoder_backend} tidak dipakai ({e}), pakai PyTorch")
+                    self.encoder_backend = 'torch'
+            self.system_info['components']['encoder_backend'] = self.encoder_backend
+            
+            self.index_maintenance = IndexMaintenanceService(
+                self.similarity_engine,
+                self.db_manager,
+                INDEX_STORE_DIR,
+                text_fn=self._index_text,
+                batch_size=EMBEDDING_BATCH_SIZE,
+                lock=self.index_lock,
+                index_type=self.index_type,
+                index_params=self.index_params,
+                chunking=CHUNKED_EMBEDDINGS,
+                chunk_params=CHUNK_PARAMS
+            )
+            
             # Load atau create embeddings
-            if self.similarity_engine.index_exists():
+            if self.index_maintenance.load():
+                stats = self.similarity_engine.get_index_stats()
+                self.system_info['components']['similarity_engine'] = f"✅ Loaded incremental store v{self.index_maintenance.version} ({stats['total_embeddings']} embeddings)"
+                logger.info(f"✅ Similarity Engine loaded from incremental store: {stats['total_embeddings']} embeddings")
+            elif self.similarity_engine.index_exists():
                 logger.info("📂 Loading existing embeddings...")
                 success = self.similarity_engine.load_index()
                 if success:
@@ -184,8 +307,47 @@ class DeepHoaxIDPostgreSQLWrapper:
                     logger.error("❌ Failed to build similarity index")
                     return False
             
+            # 6. Sinkronkan index dengan artikel terbaru (hanya artikel baru/berubah yang di-encode)
+            sync_result = self.index_maintenance.sync()
+            logger.info(f"✅ Index synced: +{sync_result['added']} / ~{sync_result['updated']} / -{sync_result['removed']}")
+            
+            # 7. Embedding Store - lookup embeddings per article id untuk clustering
+            # Miss di-encode dengan teks yang sama seperti index (title + content, preprocess_for_similarity)
+            self.embedding_store = EmbeddingStore(self.similarity_engine, text_fn=self._index_text)
+            
+            # Layout 2D global untuk scatter clustering: artikel baru diletakkan dekat tetangganya,
+            # hitung ulang di background hanya jika layout sudah terlalu basi
+            self.projection_service = ProjectionService(
+                self.embedding_store,
+                INDEX_STORE_DIR,
+                version_fn=lambda: self.index_version,
+                lock=self.index_lock
+            )
+            
+            # Model topik tersimpan: artikel baru di-assign ke centroid, fit pertama / re-fit di background
+            self.topic_model = TopicModelService(
+                self.embedding_store,
+                INDEX_STORE_DIR,
+                version_fn=lambda: self.index_version,
+                lock=self.index_lock,
+                **TOPIC_MODEL_PARAMS
+            )
+            self.topic_model.refit_if_drifted()
+            
+            # 8. Cache embeddings query di depan Sentence-BERT
+            if not isinstance(self.similarity_engine.sbert_model, CachedEncoder):
+                self.similarity_engine.sbert_model = CachedEncoder(
+                    self.similarity_engine.sbert_model,
+                    self.embedding_cache,
+                    on_encode=self._record_encode_time
+                )
+            
+            if METRICS_PORT:
+                self.start_metrics_server(METRICS_PORT)
+            
             self.system_info['initialized'] = True
-            logger.info("🎉 System initialization completed successfully!")
+            self.system_info['startup'] = dict(time_to_ready_s=time.time() - init_start, **process_memory_mb())
+            logger.info(f"🎉 System initialization completed successfully in {self.system_info['startup']['time_to_ready_s']:.2f}s!")
             return True
             
         except Exception as e:
@@ -194,6 +356,110 @@ class DeepHoaxIDPostgreSQLWrapper:
             logger.error(traceback.format_exc())
             return False
     
+    def _index_text(self, article: Dict) -> str:
+        """Teks artikel yang di-encode ke index, diproses sama seperti teks query"""
+        text = article.get('text')
+        if not text:
+            # Baris DataFrame dashboard tanpa kolom text: bentuk seperti load_hoax_articles
+            text = f"{article.get('title') or ''} {article.get('content') or ''}"
+        text = str(text).strip()
+        if self.preprocessor is not None:
+            return self.preprocessor.preprocess_for_similarity(text) or text
+        return text
+    
+    def refresh_index(self) -> Dict[str, any]:
+        """
+        Update similarity index secara incremental dari database
+        
+        Returns:
+            Dict: Ringkasan sync (added, updated, removed, version, duration)
+        """
+        if not self.system_info['initialized'] or self.index_maintenance is None:
+            raise Exception("System not initialized. Call initialize() first.")
+        
+        result = self.index_maintenance.sync()
+        if result['added'] or result['updated'] or result['removed']:
+            self.embedding_store.refresh()
+            stats = self.similarity_engine.get_index_stats()
+            self.system_info['components']['similarity_engine'] = f"✅ Synced v{result['version']} ({stats['total_embeddings']} embeddings)"
+            if self.topic_model is not None:
+                self.topic_model.refit_if_drifted()
+        return result
+    
+    def refresh_index_if_stale(self, max_age: float = INDEX_REFRESH_INTERVAL) -> bool:
+        """
+        Jalankan refresh_index di background thread jika sync terakhir lebih tua dari max_age detik
+        
+        Returns:
+            bool: True jika refresh baru dijalankan
+        """
+        if not self.system_info['initialized'] or self.index_maintenance is None or max_age <= 0:
+            return False
+        
+        def _run():
+            try:
+                self.refresh_index()
+            except Exception as e:
+                logger.error(f"❌ Index refresh failed: {e}")
+        
+        # Wrapper dibagi antar sesi: cek + start thread atomik agar hanya ada satu refresh
+        with self._refresh_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return False
+            last_sync = self.index_maintenance.last_sync or 0
+            if time.time() - last_sync < max_age:
+                return False
+            self._refresh_thread = threading.Thread(target=_run, name="index-refresh", daemon=True)
+            self._refresh_thread.start()
+        return True
+    
+    @property
+    def index_version(self) -> int:
+        """Versi similarity index (naik setiap sync yang mengubah index)"""
+        return self.index_maintenance.version if self.index_maintenance else 0
+    
+    def _update_cache_stats(self) -> None:
+        self.system_info['stats']['result_cache'] = self.result_cache.stats()
+        self.system_info['stats']['embedding_cache'] = self.embedding_cache.stats()
+    
+    def _record_encode_time(self, seconds: float) -> None:
+        """Callback CachedEncoder: catat waktu encode ke timer analyze_message yang aktif"""
+        timer = getattr(self._timing, 'timer', None)
+        if timer is not None:
+            timer.add('encode', seconds)
+    
+    def _finish_timing(self, timer: StageTimer) -> Dict[str, float]:
+        self._timing.timer = None
+        spans = timer.finish()
+        self.latency.observe(spans)
+        self.system_info['latency'] = self.latency.summary()
+        return {stage: round(seconds * 1000, 3) for stage, seconds in spans.items()}
+    
+    def find_best_chunks(self, text: str, top_k: int = DEFAULT_TOP_K) -> List[Dict]:
+        """
+        Cari artikel berdasarkan chunk yang paling mirip dengan teks (butuh CHUNKED_EMBEDDINGS)
+        
+        Args:
+            text: Teks query (sudah di-preprocess)
+            top_k: Jumlah artikel
+            
+        Returns:
+            List[Dict]: Metadata artikel + similarity dan chunk_offset (kata awal chunk)
+        """
+        chunk_store = self.index_maintenance.chunk_store if self.index_maintenance else None
+        if chunk_store is None or not len(chunk_store):
+            return []
+        
+        query = self.similarity_engine.sbert_model.encode([text], convert_to_numpy=True)
+        with self.index_lock:
+            metadata = get_engine_metadata(self.similarity_engine)
+            matches = []
+            for match in chunk_store.search(query[0], top_k=top_k):
+                item = metadata[match['position']] if match['position'] < len(metadata) else None
+                if item is not None:
+                    matches.append(dict(item, similarity=match['similarity'], chunk_offset=match['chunk_offset']))
+        return matches
+    
     def analyze_message(self, message_text: str, sender_info: Dict = None) -> Dict[str, any]:
         """
         Analyze single message untuk hoax detection
@@ -206,6 +472,8 @@ class DeepHoaxIDPostgreSQLWrapper:
             Dict: Complete analysis result
         """
         start_time = time.time()
+        timer = StageTimer()
+        self._timing.timer = timer
         
         try:
             if not self.system_info['initialized']:
@@ -214,7 +482,8 @@ class DeepHoaxIDPostgreSQLWrapper:
             logger.info(f"🔍 Analyzing message: {message_text[:50]}...")
             
             # 1. Chat Filter - Should we analyze?
-            filter_result = self.chat_filter.should_analyze_message(message_text, sender_info)
+            with timer.span('filter'):
+                filter_result = self.chat_filter.should_analyze_message(message_text, sender_info)
             
             if not filter_result['should_analyze']:
                 # Skip analysis
@@ -228,6 +497,7 @@ class DeepHoaxIDPostgreSQLWrapper:
                         'confidence': 0.0
                     },
                     'processing_time': time.time() - start_time,
+                    'timings_ms': self._finish_timing(timer),
                     'timestamp': datetime.now().isoformat()
                 }
                 
@@ -235,18 +505,38 @@ class DeepHoaxIDPostgreSQLWrapper:
                 return result
             
             # 2. Preprocessing
-            processed_text = self.preprocessor.preprocess_for_similarity(message_text)
+            with timer.span('preprocess'):
+                processed_text = self.preprocessor.preprocess_for_similarity(message_text)
             if not processed_text:
                 raise Exception("Preprocessed text is empty")
             
-            # 3. Similarity Analysis
-            similarity_result = self.similarity_engine.find_similar_articles(
-                processed_text, 
-                top_k=DEFAULT_TOP_K
-            )
+            # Result cache: teks sama (setelah preprocess) + versi index sama -> hasil sama
+            index_version = self.index_version
+            if self._result_cache_version != index_version:
+                self.result_cache.clear()
+                self._result_cache_version = index_version
+            cache_key = text_cache_key(processed_text)
+            cached = self.result_cache.get(cache_key)
             
-            # 4. Generate Response
-            response = self.response_generator.generate_response(similarity_result)
+            if cached is not None:
+                similarity_result, response = cached
+            else:
+                # 3. Similarity Analysis (lock agar tidak bentrok dengan update index)
+                #    Waktu encode dicatat lewat CachedEncoder; sisanya adalah waktu search
+                with self.index_lock:
+                    search_start = time.perf_counter()
+                    similarity_result = self.similarity_engine.find_similar_articles(
+                        processed_text, 
+                        top_k=DEFAULT_TOP_K
+                    )
+                    if self.index_maintenance is not None and self.index_maintenance.chunk_store is not None:
+                        similarity_result['best_chunks'] = self.find_best_chunks(processed_text, top_k=DEFAULT_TOP_K)
+                    timer.add('search', time.perf_counter() - search_start - timer.spans.get('encode', 0.0))
+                
+                # 4. Generate Response
+                with timer.span('response'):
+                    response = self.response_generator.generate_response(similarity_result)
+                self.result_cache.set(cache_key, (similarity_result, response))
             
             # 5. Compile results
             result = {
@@ -255,7 +545,9 @@ class DeepHoaxIDPostgreSQLWrapper:
                 'processed_text': processed_text[:200] + '...' if len(processed_text) > 200 else processed_text,
                 'analysis_result': similarity_result,
                 'response': response,
+                'cache_hit': cached is not None,
                 'processing_time': time.time() - start_time,
+                'timings_ms': self._finish_timing(timer),
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -265,6 +557,7 @@ class DeepHoaxIDPostgreSQLWrapper:
                 self.system_info['stats']['hoax_detected'] += 1
             else:
                 self.system_info['stats']['clean_detected'] += 1
+            self._update_cache_stats()
             
             logger.info(f"✅ Analysis completed: {similarity_result['category']} ({similarity_result['confidence']:.2f}) in {result['processing_time']:.2f}s")
             return result
@@ -286,6 +579,7 @@ class DeepHoaxIDPostgreSQLWrapper:
                     'category': 'ERROR'
                 },
                 'processing_time': time.time() - start_time,
+                'timings_ms': self._finish_timing(timer),
                 'timestamp': datetime.now().isoformat(),
                 'error': str(e)
             }
@@ -340,6 +634,20 @@ class DeepHoaxIDPostgreSQLWrapper:
                 engine_stats = self.similarity_engine.get_index_stats()
                 status['components_status']['similarity_engine'] = engine_stats
             
+            # Incremental index store status
+            if self.index_maintenance:
+                status['components_status']['index_store'] = {
+                    'version': self.index_maintenance.version,
+                    'index_type': self.index_type,
+                    'encoder_backend': self.encoder_backend,
+                    'last_sync': datetime.fromtimestamp(self.index_maintenance.last_sync).isoformat() if self.index_maintenance.last_sync else None,
+                    'store_dir': str(self.index_maintenance.store_dir)
+                }
+            
+            # Model topik (versi, drift terakhir)
+            if self.topic_model:
+                status['components_status']['topic_model'] = self.topic_model.stats()
+            
             # Filter stats
             if self.chat_filter:
                 filter_stats = self.chat_filter.get_filter_stats()
@@ -350,5 +658,31 @@ class DeepHoaxIDPostgreSQLWrapper:
                 resp_stats = self.response_generator.get_response_stats()
                 status['components_status']['response_generator'] = resp_stats
         
+        # Latency per tahap (ms): p50/p95/p99 dari window rolling
+        status['performance']['latency'] = self.latency.summary()
+        
         return status
+    
+    def get_prometheus_metrics(self) -> str:
+        """Metrics latency + counter dalam format teks Prometheus"""
+        lines = [self.latency.prometheus_text().rstrip('\n')]
+        for name in ('messages_processed', 'hoax_detected', 'clean_detected', 'errors'):
+            lines.append(f"# TYPE deephoaxid_{name}_total counter")
+            lines.append(f"deephoaxid_{name}_total {self.system_info['stats'][name]}")
+        for cache_name, cache in (('result', self.result_cache), ('embedding', self.embedding_cache)):
+            cache_stats = cache.stats()
+            lines.append(f"# TYPE deephoaxid_{cache_name}_cache_hit_rate gauge")
+            lines.append(f"deephoaxid_{cache_name}_cache_hit_rate {cache_stats['hit_rate']:.6f}")
+        return "\n".join(lines) + "\n"
+    
+    def start_metrics_server(self, port: int = 9108, host: str = '127.0.0.1') -> bool:
+        """
+        Jalankan endpoint lokal http://host:port/metrics untuk scrape Prometheus
+        
+        Returns:
+            bool: True jika server berjalan
+        """
+        if self.metrics_server is None:
+            self.metrics_server = start_metrics_server(self.get_prometheus_metrics, host=host, port=port)
+        return self.metrics_server is not None
 
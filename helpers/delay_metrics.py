@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Delay Metrics Helper
+Selisih hari antara tanggal relevan hoax (relevant_date) dan tanggal publish
+artikel (published_at). Delay dihitung sekali saat enrichment sebagai kolom
+int32 delay_days; statistik (rata-rata, median, maksimum) dan histogram untuk
+baris terpilih dihitung dengan NumPy langsung dari array tersebut.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Nilai delay_days untuk artikel tanpa pasangan tanggal yang valid
+# (salah satu tanggal kosong, atau relevant_date tidak sebelum published_at)
+DELAY_MISSING = np.iinfo(np.int32).min
+DELAY_HISTOGRAM_BINS = 30
+
+
+def compute_delay_days(relevant_dates: pd.Series, published_dates: pd.Series) -> np.ndarray:
+    """
+    delay_days per baris: published_at - relevant_date dalam hari (dibulatkan ke bawah),
+    hanya jika relevant_date < published_at, selain itu DELAY_MISSING
+    """
+    relevant_dates = pd.to_datetime(relevant_dates, errors='coerce')
+    published_dates = pd.to_datetime(published_dates, errors='coerce')
+    valid = (relevant_dates < published_dates).to_numpy()
+    delays = np.full(len(valid), DELAY_MISSING, dtype=np.int32)
+    delays[valid] = (published_dates[valid] - relevant_dates[valid]).dt.days.to_numpy(dtype=np.int32)
+    return delays
+
+
+def delay_summary(delays: np.ndarray, bins: int = DELAY_HISTOGRAM_BINS) -> Optional[Dict]:
+    """
+    Statistik dan histogram delay
+
+    Args:
+        delays: delay_days baris terpilih (DELAY_MISSING diabaikan)
+        bins: Jumlah bin histogram
+
+    Returns:
+        Dict count, mean, median, max, dan histogram siap plot (edges, counts,
+        centers, widths), atau None jika tidak ada delay
+    """
+    delays = np.asarray(delays)
+    delays = delays[delays != DELAY_MISSING]
+    if len(delays) == 0:
+        return None
+
+    counts, edges = np.histogram(delays, bins=bins)
+    return {
+        'count': int(len(delays)),
+        'mean': float(delays.mean(dtype=np.float64)),
+        'median': float(np.median(delays)),
+        'max': int(delays.max()),
+        'histogram': {
+            'edges': edges,
+            'counts': counts,
+            'centers': (edges[:-1] + edges[1:]) / 2,
+            'widths': np.diff(edges)
+        }
+    }
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Embedding Batcher Helper
+Encode batch teks dengan bucketing berdasarkan panjang token: teks dipotong murah
+sebelum tokenisasi, diurutkan per estimasi panjang (jumlah kata, tanpa
+tokenisasi tambahan) agar padding per batch minimal, lalu embeddings
+dikembalikan ke urutan asal
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from helpers.result_cache import CachedEncoder
+
+logger = logging.getLogger(__name__)
+
+# Batas atas karakter per token untuk pre-truncation (subword multilingual ~4-5
+# karakter per token untuk teks Indonesia); dibuat longgar agar tidak memotong
+# teks yang sebenarnya masih muat di max_seq_length
+CHARS_PER_TOKEN = 8
+DEFAULT_MAX_SEQ_LENGTH = 128
+
+
+def pre_truncate(texts: Sequence[str], max_seq_length: int, chars_per_token: int = CHARS_PER_TOKEN) -> List[str]:
+    """Potong teks ke max_seq_length * chars_per_token karakter sebelum tokenisasi"""
+    max_chars = max_seq_length * chars_per_token
+    return [str(t)[:max_chars] for t in texts]
+
+
+def token_lengths(texts: Sequence[str], tokenizer=None, max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH) -> np.ndarray:
+    """
+    Panjang token per teks (terpotong di max_seq_length). Tanpa tokenizer,
+    panjang diestimasi dari jumlah kata (~1.3 subword per kata); estimasi ini
+    yang dipakai untuk bucketing karena tokenisasi penuh akan diulang oleh
+    encoder.encode.
+    """
+    if tokenizer is not None:
+        encoded = tokenizer(
+            list(texts),
+            add_special_tokens=True,
+            truncation=True,
+            max_length=max_seq_length,
+            return_attention_mask=False,
+            return_token_type_ids=False
+        )
+        lengths = np.fromiter((len(ids) for ids in encoded['input_ids']), dtype=np.int64, count=len(texts))
+    else:
+        words = np.fromiter((len(t.split()) for t in texts), dtype=np.float64, count=len(texts))
+        lengths = np.ceil(words * 1.3).astype(np.int64) + 2
+    return np.minimum(lengths, max_seq_length)
+
+
+def length_batches(lengths: np.ndarray, batch_size: int, max_tokens_per_batch: Optional[int] = None) -> List[np.ndarray]:
+    """
+    Kelompokkan indeks teks (urut panjang) menjadi batch
+
+    Args:
+        lengths: Panjang token per teks
+        batch_size: Jumlah teks maksimum per batch
+        max_tokens_per_batch: Batas token ter-padding per batch (batch pendek bisa lebih besar)
+
+    Returns:
+        List array indeks teks per batch
+    """
+    order = np.argsort(lengths, kind='stable')
+    if not max_tokens_per_batch:
+        return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+    batches = []
+    start = 0
+    while start < len(order):
+        end = start + 1
+        # Urut naik: teks terakhir di batch menentukan panjang padding
+        while end < len(order) and (end - start + 1) * lengths[order[end]] <= max_tokens_per_batch:
+            end += 1
+        batches.append(order[start:end])
+        start = end
+    return batches
+
+
+def padding_stats(lengths: np.ndarray, batches: Sequence[np.ndarray]) -> Tuple[int, int]:
+    """(token asli, token setelah padding) untuk susunan batch tertentu"""
+    real = int(lengths.sum())
+    padded = int(sum(len(b) * int(lengths[b].max()) for b in batches if len(b)))
+    return real, padded
+
+
+def bucketed_encode(
+    encoder,
+    texts: Sequence[str],
+    batch_size: int = 32,
+    max_seq_length: Optional[int] = None,
+    max_tokens_per_batch: Optional[int] = None,
+    **encode_kwargs
+) -> Tuple[np.ndarray, Dict[str, float]]:
+    """
+    Encode teks dengan bucketing panjang token
+
+    Args:
+        encoder: Model dengan encode() (SentenceTransformer / encoder backend)
+        texts: Teks yang di-encode
+        batch_size: Jumlah teks per batch
+        max_seq_length: Panjang token maksimum (default: max_seq_length encoder)
+        max_tokens_per_batch: Batas token ter-padding per batch (opsional)
+        **encode_kwargs: Diteruskan ke encoder.encode (mis. normalize_embeddings)
+
+    Returns:
+        Tuple (embeddings urut sesuai input, report) dengan report berisi
+        tokens, padded_tokens, padding_waste, baseline_padding_waste,
+        tokens_per_s dan duration_s (jumlah token berupa estimasi)
+    """
+    if len(texts) == 0:
+        return np.empty((0, 0), dtype=np.float32), {'texts': 0}
+
+    if isinstance(encoder, CachedEncoder):
+        # Encode artikel tidak perlu masuk cache embeddings query
+        encoder = encoder.model
+    max_seq_length = max_seq_length or getattr(encoder, 'max_seq_length', None) or DEFAULT_MAX_SEQ_LENGTH
+    start_time = time.perf_counter()
+
+    truncated = pre_truncate(texts, max_seq_length)
+    # Estimasi dari jumlah kata: teks hanya ditokenisasi sekali, di dalam encode()
+    lengths = token_lengths(truncated, max_seq_length=max_seq_length)
+    batches = length_batches(lengths, batch_size, max_tokens_per_batch)
+
+    embeddings = None
+    for batch in batches:
+        vectors = np.asarray(
+            encoder.encode(
+                [truncated[i] for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                **encode_kwargs
+            ),
+            dtype=np.float32
+        )
+        if embeddings is None:
+            embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        embeddings[batch] = vectors
+
+    duration = time.perf_counter() - start_time
+    real, padded = padding_stats(lengths, batches)
+    baseline_batches = [np.arange(i, min(i + batch_size, len(texts))) for i in range(0, len(texts), batch_size)]
+    _, baseline_padded = padding_stats(lengths, baseline_batches)
+
+    report = {
+        'texts': len(texts),
+        'batches': len(batches),
+        'tokens': real,
+        'padded_tokens': padded,
+        'padding_waste': 1 - real / padded if padded else 0.0,
+        'baseline_padding_waste': 1 - real / baseline_padded if baseline_padded else 0.0,
+        'tokens_per_s': real / duration if duration > 0 else 0.0,
+        'duration_s': duration
+    }
+    logger.info(
+        f"Bucketed encode: {len(texts)} teks, {report['tokens_per_s']:.0f} token/s, "
+        f"padding waste {report['padding_waste']:.1%} (tanpa bucketing {report['baseline_padding_waste']:.1%})"
+    )
+    return embeddings, report
+
+
+if __name__ == "__main__":
+    import argparse
+    from helpers.encoder_backends import ENCODER_BACKENDS, load_benchmark_texts, load_encoder
+
+    parser = argparse.ArgumentParser(description="Bandingkan encode urutan asli vs bucketing panjang token")
+    parser.add_argument("--texts", default=None, help="File teks (satu per baris); default ambil content artikel dari DB")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--backend", default='torch', choices=ENCODER_BACKENDS)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-tokens-per-batch", type=int, default=None)
+    args = parser.parse_args()
+
+    bench_texts = load_benchmark_texts(args.texts, args.limit)
+    encoder = load_encoder(args.backend)
+
+    start = time.perf_counter()
+    baseline = np.asarray(encoder.encode(bench_texts, batch_size=args.batch_size, convert_to_numpy=True))
+    baseline_s = time.perf_counter() - start
+
+    bucketed, bench_report = bucketed_encode(
+        encoder, bench_texts, batch_size=args.batch_size, max_tokens_per_batch=args.max_tokens_per_batch
+    )
+    cosine = np.sum(baseline * bucketed, axis=1) / (
+        np.linalg.norm(baseline, axis=1) * np.linalg.norm(bucketed, axis=1) + 1e-12
+    )
+    print(f"{len(bench_texts)} teks, backend {args.backend}, batch {args.batch_size}")
+    print(f"  - urutan asli : {baseline_s:7.2f}s | {bench_report['tokens'] / baseline_s:8.0f} token/s | "
+          f"padding waste {bench_report['baseline_padding_waste']:.1%}")
+    print(f"  - bucketing   : {bench_report['duration_s']:7.2f}s | {bench_report['tokens_per_s']:8.0f} token/s | "
+          f"padding waste {bench_report['padding_waste']:.1%}")
+    print(f"  - cosine vs urutan asli: mean {cosine.mean():.5f} | min {cosine.min():.5f}")
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Embedding Store Helper
+Mengambil embeddings artikel yang sudah tersimpan di similarity index DeepHoaxID
+berdasarkan article id, sehingga hanya artikel yang belum ter-index yang di-encode ulang
+"""
+
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from helpers.embedding_batcher import bucketed_encode
+
+logger = logging.getLogger(__name__)
+
+# Nama atribut SimilarityEngine DeepHoaxID (berbeda antar versi engine)
+INDEX_ATTRS = ('faiss_index', 'index')
+METADATA_ATTRS = ('article_metadata', 'metadata', 'articles_metadata', 'articles')
+EMBEDDING_ATTRS = ('embeddings', 'article_embeddings')
+
+
+def _engine_attr(obj, names: Sequence[str], required: bool = True) -> Optional[str]:
+    """
+    Nama atribut engine yang benar-benar ada (hasattr, urut preferensi names),
+    meskipun nilainya masih None pada engine yang baru dibuat
+
+    Raises:
+        AttributeError: Jika required dan tidak ada satu pun nama yang cocok
+    """
+    for name in names:
+        if hasattr(obj, name):
+            return name
+    if required:
+        raise AttributeError(f"{type(obj).__name__} tidak punya atribut {' / '.join(names)}")
+    return None
+
+
+def get_engine_index(similarity_engine):
+    """Ambil FAISS index dari similarity engine (None jika belum dibangun)"""
+    return getattr(similarity_engine, _engine_attr(similarity_engine, INDEX_ATTRS))
+
+
+def set_engine_index(similarity_engine, index) -> None:
+    """Ganti FAISS index di similarity engine, pada atribut yang memang dimiliki engine"""
+    setattr(similarity_engine, _engine_attr(similarity_engine, INDEX_ATTRS), index)
+
+
+def get_engine_metadata(similarity_engine):
+    """Ambil metadata artikel (urut sesuai posisi di index) dari similarity engine"""
+    return getattr(similarity_engine, _engine_attr(similarity_engine, METADATA_ATTRS))
+
+
+def set_engine_metadata(similarity_engine, metadata) -> None:
+    """Ganti metadata artikel di similarity engine"""
+    setattr(similarity_engine, _engine_attr(similarity_engine, METADATA_ATTRS), metadata)
+
+
+def get_engine_embeddings(similarity_engine) -> Optional[np.ndarray]:
+    """Ambil matriks embeddings yang di-cache engine (opsional, None jika engine tidak menyimpannya)"""
+    name = _engine_attr(similarity_engine, EMBEDDING_ATTRS, required=False)
+    return getattr(similarity_engine, name) if name else None
+
+
+def normalize_article_id(article_id):
+    """Samakan tipe article id (int dari DB, str/float dari metadata/pickle)"""
+    if article_id is None:
+        return None
+    try:
+        return int(article_id)
+    except (TypeError, ValueError):
+        return str(article_id)
+
+
+class EmbeddingStore:
+    """
+    Lookup embeddings per article id dari similarity index, dengan fallback
+    encode Sentence-BERT hanya untuk artikel yang tidak ditemukan (miss)
+
+    Args:
+        similarity_engine: SimilarityEngine dari DeepHoaxID
+        id_key: Key article id di metadata index
+        text_fn: Pembentuk teks artikel (dict -> str) yang sama dengan saat index
+            dibangun, agar vektor miss sebanding dengan vektor di index
+    """
+
+    def __init__(self, similarity_engine, id_key: str = 'id', text_fn: Optional[Callable[[Dict], str]] = None):
+        self.similarity_engine = similarity_engine
+        self.id_key = id_key
+        self.text_fn = text_fn
+        self._positions = None
+        self._normalized = None
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def refresh(self) -> None:
+        """Reset mapping id -> posisi (panggil setelah index berubah)"""
+        self._positions = None
+        self._normalized = None
+
+    @property
+    def positions(self) -> Dict[object, int]:
+        """Mapping article id -> posisi vektor di index"""
+        if self._positions is None:
+            self._positions = self._build_positions()
+        return self._positions
+
+    def _build_positions(self) -> Dict[object, int]:
+        metadata = get_engine_metadata(self.similarity_engine)
+        positions = {}
+        if metadata is None:
+            logger.warning("Similarity engine tidak punya metadata artikel, semua embeddings akan di-encode")
+            return positions
+
+        if hasattr(metadata, 'positions_by_id'):
+            # ColumnarMetadata: mapping langsung dari kolom id tanpa membangun dict per baris
+            positions = metadata.positions_by_id()
+            logger.info(f"Embedding store: {len(positions)} artikel ter-index")
+            return positions
+
+        for pos in range(len(metadata)):
+            item = metadata[pos]
+            if not isinstance(item, dict):
+                continue
+            article_id = normalize_article_id(item.get(self.id_key))
+            if article_id is not None:
+                positions[article_id] = pos
+
+        logger.info(f"Embedding store: {len(positions)} artikel ter-index")
+        return positions
+
+    def vectors_at(self, positions: np.ndarray) -> np.ndarray:
+        """Ambil vektor di posisi tertentu dari matriks embeddings atau FAISS index"""
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(positions) == 0:
+            return np.empty((0, 0), dtype=np.float32)
+
+        embeddings = get_engine_embeddings(self.similarity_engine)
+        if embeddings is not None and len(embeddings) > positions.max():
+            return np.asarray(embeddings[positions], dtype=np.float32)
+
+        index = get_engine_index(self.similarity_engine)
+        if index is None:
+            raise ValueError("Similarity engine tidak punya embeddings maupun FAISS index")
+        return np.vstack([index.reconstruct(int(p)) for p in positions]).astype(np.float32)
+
+    def _index_is_normalized(self) -> bool:
+        """Cek apakah vektor di index sudah L2-normalized (untuk menyamakan hasil encode miss)"""
+        if self._normalized is None:
+            sample = list(self.positions.values())[:32]
+            if not sample:
+                self._normalized = False
+            else:
+                norms = np.linalg.norm(self.vectors_at(np.array(sample)), axis=1)
+                self._normalized = bool(np.allclose(norms, 1.0, atol=1e-3))
+        return self._normalized
+
+    def lookup(self, article_ids: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cari posisi index untuk setiap article id
+
+        Returns:
+            Tuple (positions, found_mask); posisi -1 untuk artikel yang tidak ditemukan
+        """
+        positions_map = self.positions
+        positions = np.fromiter(
+            (positions_map.get(normalize_article_id(a), -1) for a in article_ids),
+            dtype=np.int64,
+            count=len(article_ids)
+        )
+        return positions, positions >= 0
+
+    def encode(self, texts: List[str], batch_size: int = 32, encoder=None) -> np.ndarray:
+        """
+        Encode teks menggunakan Sentence-BERT milik similarity engine, atau encoder
+        pengganti (mis. backend ONNX/int8 dari helpers.encoder_backends)
+        """
+        encoder = encoder if encoder is not None else self.similarity_engine.sbert_model
+        embeddings, report = bucketed_encode(encoder, texts, batch_size=batch_size)
+        self.stats['batcher'] = report
+        return embeddings
+
+    def article_texts(self, articles, rows: Optional[Sequence[int]] = None) -> List[str]:
+        """
+        Teks artikel untuk di-encode, dibentuk dengan text_fn index
+
+        Args:
+            articles: DataFrame atau list dict artikel (kolom title, content, ...)
+            rows: Posisi baris yang diambil (semua baris jika None)
+        """
+        if self.text_fn is None:
+            raise ValueError("EmbeddingStore tidak punya text_fn")
+        if rows is None:
+            rows = range(len(articles))
+        if hasattr(articles, 'iloc'):
+            records = articles.iloc[list(rows)].to_dict('records')
+        else:
+            records = [articles[i] for i in rows]
+        return [self.text_fn(record) for record in records]
+
+    def get_embeddings(
+        self,
+        article_ids: Sequence,
+        texts: Optional[Sequence[str]] = None,
+        batch_size: int = 32,
+        encoder=None,
+        articles=None
+    ) -> np.ndarray:
+        """
+        Mendapatkan embeddings untuk daftar artikel, ambil dari index jika ada
+        dan encode hanya artikel yang belum ter-index
+
+        Args:
+            article_ids: Daftar article id
+            texts: Teks artikel (dipakai hanya untuk miss jika articles/text_fn tidak ada),
+                sejajar dengan article_ids
+            batch_size: Ukuran batch untuk encoding miss
+            encoder: Encoder pengganti sbert_model untuk miss (opsional)
+            articles: DataFrame / list dict artikel sejajar dengan article_ids; jika
+                text_fn ada, teks miss dibentuk dari sini persis seperti teks index
+
+        Returns:
+            numpy array (n_artikel, dim)
+        """
+        positions, found = self.lookup(article_ids)
+        if len(positions) == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        n_found = int(found.sum())
+        n_missing = len(positions) - n_found
+        self.stats['hits'] += n_found
+        self.stats['misses'] += n_missing
+
+        cached = self.vectors_at(positions[found]) if n_found else None
+        encoded = None
+        if n_missing:
+            missing_rows = np.flatnonzero(~found)
+            if articles is not None and self.text_fn is not None:
+                missing_texts = self.article_texts(articles, missing_rows)
+            elif texts is not None:
+                missing_texts = [str(texts[i]) for i in missing_rows]
+            else:
+                raise ValueError("Teks artikel dibutuhkan untuk encode miss (texts atau articles + text_fn)")
+            encoded = np.asarray(self.encode(missing_texts, batch_size=batch_size, encoder=encoder), dtype=np.float32)
+            if n_found and self._index_is_normalized():
+                norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+                encoded = encoded / np.clip(norms, 1e-12, None)
+
+        dim = cached.shape[1] if cached is not None else encoded.shape[1]
+        embeddings = np.empty((len(positions), dim), dtype=np.float32)
+        if cached is not None:
+            embeddings[found] = cached
+        if encoded is not None:
+            embeddings[~found] = encoded
+
+        logger.info(f"Embeddings: {n_found} dari index, {n_missing} di-encode ulang")
+        return embeddings
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""
+Encoder Backends Helper
+Backend inferensi CPU untuk encoder Sentence-BERT: PyTorch full precision,
+PyTorch dynamic int8, dan ONNX Runtime (fp32 / int8), plus parity check
+cosine similarity dan benchmark latency/throughput
+"""
+
+import copy
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENCODER_BACKENDS = ('torch', 'torch_int8', 'onnx', 'onnx_int8')
+DEFAULT_MODEL_NAME = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+ONNX_MODEL_FILE = 'model.onnx'
+ONNX_INT8_MODEL_FILE = 'model.int8.onnx'
+PARITY_THRESHOLD = 0.99
+# Teks contoh untuk parity check saat startup (backend non-torch vs PyTorch fp32)
+PARITY_TEXTS = (
+    'Vaksin COVID-19 mengandung microchip untuk melacak warga',
+    'Pemerintah akan membagikan bantuan tunai Rp 5 juta lewat link pendaftaran ini',
+    'Air kelapa dicampur garam bisa menyembuhkan demam berdarah dalam sehari',
+    'Beredar video banjir bandang di Jakarta, ternyata rekaman tahun 2013',
+    'Foto presiden bersama tokoh asing hasil suntingan, bukan kejadian asli',
+    'Pesan berantai: nomor tidak dikenal yang menelepon akan menguras saldo rekening',
+    'BMKG memprediksi gempa besar besok pagi, warga diminta mengungsi',
+    'Minum air hangat setiap 15 menit membunuh virus di tenggorokan',
+    'KPU mengumumkan pemilu diundur, informasi ini tidak benar',
+    'Lowongan kerja BUMN tanpa tes, cukup transfer biaya administrasi'
+)
+
+
+def _mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Mean pooling token embeddings dengan attention mask (pooling model paraphrase-MiniLM)"""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+class OnnxSentenceEncoder:
+    """
+    Encoder ONNX Runtime dengan interface encode() seperti SentenceTransformer
+
+    Args:
+        model_dir: Direktori berisi model ONNX + file tokenizer (hasil export_onnx)
+        model_file: Nama file ONNX (fp32 atau int8)
+        max_seq_length: Panjang token maksimum
+        num_threads: Jumlah thread intra-op ONNX Runtime (None = default ORT)
+    """
+
+    def __init__(
+        self,
+        model_dir: Union[str, Path],
+        model_file: str = ONNX_MODEL_FILE,
+        max_seq_length: int = 128,
+        num_threads: Optional[int] = None
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_dir = Path(model_dir)
+        self.model_file = model_file
+        self.max_seq_length = max_seq_length
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            str(self.model_dir / model_file),
+            sess_options=options,
+            providers=['CPUExecutionProvider']
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self._dim = None
+
+    def get_sentence_embedding_dimension(self) -> Optional[int]:
+        if self._dim is None:
+            self._dim = int(self.encode(['a']).shape[1])
+        return self._dim
+
+    def encode(
+        self,
+        sentences: Union[str, Sequence[str]],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        convert_to_tensor: bool = False,
+        normalize_embeddings: bool = False,
+        **kwargs
+    ):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else [str(t) for t in sentences]
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            features = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors='np'
+            )
+            inputs = {name: features[name].astype(np.int64) for name in self._input_names if name in features}
+            token_embeddings = self.session.run(None, inputs)[0]
+            batches.append(_mean_pool(token_embeddings, features['attention_mask']))
+
+        embeddings = np.vstack(batches).astype(np.float32) if batches else np.empty((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(embeddings):
+            embeddings = _l2_normalize(embeddings)
+
+        if convert_to_tensor:
+            import torch
+            embeddings = torch.from_numpy(embeddings)
+        return embeddings[0] if single else embeddings
+
+
+def _transformer_parts(base_model):
+    """Transformer HuggingFace + tokenizer dari SentenceTransformer yang sudah di-load"""
+    first_module = base_model[0] if hasattr(base_model, '__getitem__') else None
+    transformer = getattr(first_module, 'auto_model', None)
+    tokenizer = getattr(base_model, 'tokenizer', None) or getattr(first_module, 'tokenizer', None)
+    if transformer is None or tokenizer is None:
+        raise ValueError(f"Tidak bisa mengambil transformer/tokenizer dari {type(base_model).__name__}")
+    return transformer, tokenizer
+
+
+def export_onnx(
+    model_name: str = DEFAULT_MODEL_NAME,
+    output_dir: Union[str, Path] = 'models/onnx',
+    quantize: bool = True,
+    opset: int = 14,
+    base_model=None
+) -> Path:
+    """
+    Export transformer Sentence-BERT ke ONNX (+ versi int8 dynamic quantization)
+
+    Pooling dilakukan di sisi numpy (mean pooling), sehingga graph hanya berisi
+    transformer dan output-nya token embeddings.
+
+    Args:
+        model_name: Nama model HuggingFace (di-load hanya jika base_model None)
+        output_dir: Direktori output model ONNX + tokenizer
+        quantize: Buat juga versi int8
+        opset: Versi opset ONNX
+        base_model: SentenceTransformer yang sudah di-load; bobot yang di-export
+            sama persis dengan model yang dipakai engine, tanpa download ulang
+
+    Returns:
+        Path direktori model ONNX
+    """
+    import torch
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if base_model is not None:
+        model, tokenizer = _transformer_parts(base_model)
+        # Salinan: export tidak boleh mengubah device/mode encoder yang sedang dipakai
+        model = copy.deepcopy(model).cpu()
+    else:
+        from transformers import AutoModel, AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name)
+    model.eval()
+    tokenizer.save_pretrained(str(output_dir))
+
+    dummy = tokenizer(['contoh kalimat untuk export'], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in dummy]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['token_embeddings'] = {0: 'batch', 1: 'sequence'}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            str(output_dir / ONNX_MODEL_FILE),
+            input_names=input_names,
+            output_names=['token_embeddings'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True
+        )
+    logger.info(f"✅ ONNX export: {output_dir / ONNX_MODEL_FILE}")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(
+            str(output_dir / ONNX_MODEL_FILE),
+            str(output_dir / ONNX_INT8_MODEL_FILE),
+            weight_type=QuantType.QInt8
+        )
+        logger.info(f"✅ ONNX int8: {output_dir / ONNX_INT8_MODEL_FILE}")
+
+    return output_dir
+
+
+def quantize_torch_model(model):
+    """Dynamic int8 quantization untuk layer Linear SentenceTransformer (CPU)"""
+    import torch
+
+    quantized = torch.quantization.quantize_dynamic(
+        copy.deepcopy(model).cpu(),
+        {torch.nn.Linear},
+        dtype=torch.qint8
+    )
+    quantized.eval()
+    return quantized
+
+
+def load_encoder(
+    backend: str = 'torch',
+    base_model=None,
+    model_name: str = DEFAULT_MODEL_NAME,
+    onnx_dir: Union[str, Path] = 'models/onnx',
+    num_threads: Optional[int] = None
+):
+    """
+    Buat encoder untuk backend tertentu
+
+    Args:
+        backend: 'torch', 'torch_int8', 'onnx' atau 'onnx_int8'
+        base_model: SentenceTransformer yang sudah di-load (dipakai untuk torch/torch_int8)
+        model_name: Nama model HuggingFace (untuk load/export jika base_model None)
+        onnx_dir: Direktori model ONNX (di-export otomatis dari base_model jika belum ada)
+        num_threads: Jumlah thread inferensi ONNX Runtime
+
+    Returns:
+        Objek dengan method encode() kompatibel SentenceTransformer
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Encoder backend tidak dikenal: {backend} (pilihan: {', '.join(ENCODER_BACKENDS)})")
+
+    if backend in ('torch', 'torch_int8'):
+        if base_model is None:
+            from sentence_transformers import SentenceTransformer
+            base_model = SentenceTransformer(model_name, device='cpu')
+        return quantize_torch_model(base_model) if backend == 'torch_int8' else base_model
+
+    onnx_dir = Path(onnx_dir)
+    model_file = ONNX_INT8_MODEL_FILE if backend == 'onnx_int8' else ONNX_MODEL_FILE
+    if not (onnx_dir / model_file).exists():
+        source = type(base_model).__name__ if base_model is not None else model_name
+        logger.info(f"📦 Model ONNX belum ada di {onnx_dir}, export dari {source}...")
+        export_onnx(model_name, onnx_dir, quantize=backend == 'onnx_int8', base_model=base_model)
+
+    max_seq_length = getattr(base_model, 'max_seq_length', None) or 128
+    return OnnxSentenceEncoder(onnx_dir, model_file=model_file, max_seq_length=max_seq_length, num_threads=num_threads)
+
+
+def parity_check(
+    reference,
+    candidate,
+    texts: Sequence[str],
+    batch_size: int = 32,
+    threshold: float = PARITY_THRESHOLD
+) -> Dict[str, float]:
+    """
+    Bandingkan embeddings candidate dengan reference (PyTorch fp32) per teks;
+    passed jika rata-rata cosine similarity >= threshold
+
+    Returns:
+        Dict: mean/min/p01 cosine similarity antar embeddings teks yang sama,
+        top1_agreement (tetangga terdekat sama di antara texts) dan passed
+    """
+    ref = _l2_normalize(np.asarray(reference.encode(list(texts), batch_size=batch_size, convert_to_numpy=True), dtype=np.float32))
+    cand = _l2_normalize(np.asarray(candidate.encode(list(texts), batch_size=batch_size, convert_to_numpy=True), dtype=np.float32))
+    cosine = np.sum(ref * cand, axis=1)
+
+    ref_sim = ref @ ref.T
+    cand_sim = cand @ cand.T
+    np.fill_diagonal(ref_sim, -np.inf)
+    np.fill_diagonal(cand_sim, -np.inf)
+    top1_agreement = float(np.mean(ref_sim.argmax(axis=1) == cand_sim.argmax(axis=1))) if len(texts) > 1 else 1.0
+
+    return {
+        'n_texts': len(texts),
+        'cosine_mean': float(cosine.mean()),
+        'cosine_min': float(cosine.min()),
+        'cosine_p01': float(np.percentile(cosine, 1)),
+        'top1_agreement': top1_agreement,
+        'passed': bool(cosine.mean() >= threshold)
+    }
+
+
+def benchmark_encoder(encoder, texts: Sequence[str], batch_size: int = 32, n_queries: int = 100) -> Dict[str, float]:
+    """
+    Benchmark CPU: latency single query (detector) dan throughput batch (clustering)
+
+    Returns:
+        Dict: latency_p50_ms, latency_p95_ms, throughput_texts_per_s
+    """
+    texts = list(texts)
+    encoder.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+
+    latencies = np.empty(min(n_queries, len(texts)))
+    for i in range(len(latencies)):
+        start = time.perf_counter()
+        encoder.encode([texts[i]], batch_size=1)
+        latencies[i] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    encoder.encode(texts, batch_size=batch_size)
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    return {
+        'latency_p50_ms': float(np.percentile(latencies, 50)),
+        'latency_p95_ms': float(np.percentile(latencies, 95)),
+        'throughput_texts_per_s': float(throughput)
+    }
+
+
+def load_benchmark_texts(path: Optional[str], limit: int) -> List[str]:
+    """Teks benchmark dari file (satu per baris) atau content artikel di DB"""
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        from loaders.article_loader import load_articles_df
+        texts = load_articles_df()['content'].fillna('').astype(str).tolist()
+    return texts[:limit]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parity check + benchmark CPU encoder backend Sentence-BERT")
+    parser.add_argument("--texts", default=None, help="File teks (satu per baris); default ambil content artikel dari DB")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--backends", default=",".join(ENCODER_BACKENDS))
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--onnx-dir", default="models/onnx")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    bench_texts = load_benchmark_texts(args.texts, args.limit)
+    reference_model = load_encoder('torch', model_name=args.model)
+    print(f"Benchmark {len(bench_texts)} teks, model {args.model}, batch {args.batch_size}")
+    for backend_name in args.backends.split(","):
+        encoder = load_encoder(backend_name, base_model=reference_model, model_name=args.model,
+                               onnx_dir=args.onnx_dir, num_threads=args.threads)
+        parity = parity_check(reference_model, encoder, bench_texts, batch_size=args.batch_size)
+        bench = benchmark_encoder(encoder, bench_texts, batch_size=args.batch_size)
+        print(
+            f"  - {backend_name:<10} p50 {bench['latency_p50_ms']:7.2f} ms | p95 {bench['latency_p95_ms']:7.2f} ms | "
+            f"{bench['throughput_texts_per_s']:7.1f} teks/s | cos mean {parity['cosine_mean']:.4f} "
+            f"min {parity['cosine_min']:.4f} | top1 {parity['top1_agreement']:.3f} | "
+            f"{'OK' if parity['passed'] else 'GAGAL'}"
+        )
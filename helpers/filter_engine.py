@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+Filter Engine Helper
+Cross-filter dashboard dengan state filter kanonik: setiap kombinasi (rentang
+tanggal, kategori, klasifikasi, lokasi, platform, topik, kategori analisis)
+dipetakan ke satu key, dan bitmap baris hasil filter beserta agregat turunannya
+(value_counts, KPI) disimpan di LRU bersama antar sesi.
+
+Setiap dimensi punya inverted index nilai -> bitmap (NumPy packbits): filter
+gabungan = OR bitmap nilai terpilih per dimensi lalu AND antar dimensi, dan
+jumlah per nilai = popcount(bitmap nilai AND bitmap filter).
+
+Deret waktu (harian / bulanan / hari dalam minggu) diambil dari time series
+cube yang dibangun sekali dari kode dimensi yang sama (helpers.timeseries_cube).
+"""
+
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from helpers.delay_metrics import delay_summary
+from helpers.result_cache import TTLLRUCache
+from helpers.timeseries_cube import TimeSeriesCube
+
+logger = logging.getLogger(__name__)
+
+FILTER_CACHE_SIZE = 128
+# Dimensi multi-pilihan di active_filters -> kolom DataFrame
+FILTER_DIMENSIONS = {
+    'categories': 'categories',
+    'classifications': 'classifications',
+    'locations': 'relevant_province',
+    'platforms': 'platform',
+    'topics': 'topic_cluster'
+}
+# Kategori hasil analisis DeepHoaxID -> truth_category di database
+HOAX_CATEGORY_MAPPING = {
+    'HOAX': ['HOAX', 'FALSE', 'MISLEADING'],
+    'SUSPICIOUS': ['SUSPICIOUS', 'UNVERIFIED'],
+    'CLEAN': ['TRUE', 'VERIFIED', 'CLEAN'],
+    'UNKNOWN': ['UNKNOWN']
+}
+
+
+def _canonical_values(values: Optional[Iterable]) -> Tuple:
+    return tuple(sorted({str(v) for v in values})) if values else ()
+
+
+def _canonical_date(value) -> Optional[str]:
+    return pd.Timestamp(value).isoformat() if value is not None else None
+
+
+def date_filter_key(start_ts, end_ts) -> Tuple:
+    """Key kanonik untuk rentang tanggal"""
+    return ('date', _canonical_date(start_ts), _canonical_date(end_ts))
+
+
+def filter_state_key(date_key: Tuple, active_filters: Dict) -> Tuple:
+    """
+    Key kanonik state filter: urutan pilihan dan duplikat tidak berpengaruh,
+    dimensi kosong sama dengan tidak difilter
+    """
+    return date_key + tuple(
+        (name, _canonical_values(active_filters.get(name))) for name in FILTER_DIMENSIONS
+    ) + (('hoax_category', active_filters.get('hoax_category') or None),)
+
+
+def column_selections(active_filters: Dict) -> Dict[str, list]:
+    """Filter aktif -> kolom DataFrame -> nilai terpilih (hanya dimensi yang difilter)"""
+    selections = {}
+    hoax_category = active_filters.get('hoax_category')
+    if hoax_category:
+        selections['truth_category'] = HOAX_CATEGORY_MAPPING.get(hoax_category, [hoax_category])
+    for name, column in FILTER_DIMENSIONS.items():
+        selected = active_filters.get(name)
+        if selected:
+            selections[column] = list(selected)
+    return selections
+
+
+def pack_mask(mask: np.ndarray) -> np.ndarray:
+    """Bitmap baris (1 bit per baris)"""
+    return np.packbits(mask)
+
+
+def unpack_mask(bitmap: np.ndarray, n_rows: int) -> np.ndarray:
+    return np.unpackbits(bitmap, count=n_rows).view(bool)
+
+
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+# Di atas jumlah nilai ini, hitung per nilai lewat bincount (O(n)) alih-alih
+# popcount per bitmap (O(n_nilai * n / 8))
+POPCOUNT_MAX_VALUES = 64
+
+
+def popcount(bitmap: np.ndarray) -> int:
+    """Jumlah bit 1 di bitmap packbits"""
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(bitmap).sum(dtype=np.int64))
+    return int(_POPCOUNT_TABLE[bitmap].sum(dtype=np.int64))
+
+
+class BitmapIndex:
+    """
+    Inverted index satu dimensi: nilai -> bitmap baris (packbits)
+
+    Args:
+        values: Nilai per baris (None/NaN = tidak punya nilai, tidak pernah cocok)
+    """
+
+    def __init__(self, values: np.ndarray):
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        self.codes = codes.astype(np.int32)
+        self.values = np.asarray(uniques, dtype=object)
+        self.n_rows = len(codes)
+        self._value_to_code = {v: i for i, v in enumerate(self.values.tolist())}
+        self._bitmaps: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def bitmap(self, code: int) -> np.ndarray:
+        bitmap = self._bitmaps.get(code)
+        if bitmap is None:
+            bitmap = pack_mask(self.codes == code)
+            self._bitmaps[code] = bitmap
+        return bitmap
+
+    def union(self, selected: Iterable) -> np.ndarray:
+        """OR bitmap semua nilai terpilih (nilai yang tidak ada diabaikan)"""
+        result = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for value in selected:
+            code = self._value_to_code.get(value)
+            if code is not None:
+                result |= self.bitmap(code)
+        return result
+
+    def counts(self, bitmap: np.ndarray) -> np.ndarray:
+        """Jumlah baris per nilai (urut self.values) di dalam bitmap"""
+        if len(self.values) <= POPCOUNT_MAX_VALUES:
+            return np.fromiter(
+                (popcount(self.bitmap(code) & bitmap) for code in range(len(self.values))),
+                dtype=np.int64,
+                count=len(self.values)
+            )
+        codes = self.codes[unpack_mask(bitmap, self.n_rows)]
+        return np.bincount(codes[codes >= 0], minlength=len(self.values))
+
+
+class FilterEngine:
+    """
+    Filter + agregat ter-cache untuk satu DataFrame (data dashboard yang sudah di-load)
+
+    Args:
+        df: DataFrame lengkap (tidak diubah)
+        maxsize: Jumlah state filter di LRU
+        max_allowed_ts: Batas atas relevant_date (tanggal masa depan dibuang)
+    """
+
+    def __init__(self, df: pd.DataFrame, maxsize: int = FILTER_CACHE_SIZE, max_allowed_ts=None):
+        self.df = df
+        self.n_rows = len(df)
+        self.max_allowed_ts = pd.Timestamp(max_allowed_ts) if max_allowed_ts is not None else None
+        self.cache = TTLLRUCache(maxsize=maxsize)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._indexes: Dict[str, BitmapIndex] = {}
+        self._cube: Optional[TimeSeriesCube] = None
+        self._delay_rows: Optional[np.ndarray] = None
+        self._dates = pd.to_datetime(df["relevant_date"]) if "relevant_date" in df.columns else None
+
+    def _column(self, name: str) -> Optional[np.ndarray]:
+        """Kolom filter yang sudah dinormalisasi (fillna / label), dihitung sekali"""
+        values = self._columns.get(name)
+        if values is not None:
+            return values
+
+        df = self.df
+        if name in ('categories', 'classifications'):
+            values = df[name].fillna("(unknown)") if name in df.columns else None
+        elif name == 'relevant_province':
+            if name in df.columns:
+                values = df[name]
+            elif "relevant_location" in df.columns:
+                values = df["relevant_location"]
+        elif name == 'platform':
+            # Diklasifikasikan saat load (loaders.article_loader.enrich_with_platform)
+            values = df[name] if name in df.columns else None
+        elif name == 'topic_cluster':
+            if name in df.columns:
+                from helpers.topic_model import topic_label
+                values = df[name].map(topic_label)
+        elif name == 'truth_category':
+            values = df[name].fillna("UNKNOWN") if name in df.columns else None
+
+        if values is None:
+            return None
+        values = values.astype(object).to_numpy()
+        self._columns[name] = values
+        return values
+
+    def index(self, name: str) -> Optional[BitmapIndex]:
+        """Inverted index bitmap untuk kolom filter (dibangun sekali)"""
+        index = self._indexes.get(name)
+        if index is None:
+            values = self._column(name)
+            if values is None:
+                return None
+            start = time.perf_counter()
+            index = BitmapIndex(values)
+            self._indexes[name] = index
+            logger.info(f"Bitmap index {name}: {len(index)} nilai ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return index
+
+    def _date_masks(self, start_ts, end_ts) -> Tuple[np.ndarray, np.ndarray]:
+        if self._dates is None:
+            return np.zeros(self.n_rows, dtype=bool), np.ones(self.n_rows, dtype=bool)
+        with_date = self._dates.between(start_ts, end_ts)
+        if self.max_allowed_ts is not None:
+            with_date &= self._dates <= self.max_allowed_ts
+        return with_date.to_numpy(), self._dates.isna().to_numpy()
+
+    def select_dates(self, start_ts, end_ts) -> Dict:
+        """
+        Baris dalam rentang tanggal (plus artikel tanpa tanggal)
+
+        Returns:
+            Entry cache: key, with_date / no_date (bitmap), aggregates
+        """
+        key = date_filter_key(start_ts, end_ts)
+        entry = self.cache.get(key)
+        if entry is None:
+            with_date, no_date = self._date_masks(start_ts, end_ts)
+            entry = {
+                'key': key,
+                'start': start_ts,
+                'end': end_ts,
+                'with_date': pack_mask(with_date),
+                'no_date': pack_mask(no_date),
+                'aggregates': {}
+            }
+            self.cache.set(key, entry)
+        return entry
+
+    def select(self, date_entry: Dict, active_filters: Dict) -> Dict:
+        """
+        Baris hasil semua filter aktif di dalam rentang tanggal date_entry
+
+        Args:
+            date_entry: Hasil select_dates
+            active_filters: st.session_state.active_filters
+
+        Returns:
+            Entry cache: key, bitmap (filter non-tanggal), aggregates
+        """
+        key = filter_state_key(date_entry['key'], active_filters)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+
+        start = time.perf_counter()
+        selections = column_selections(active_filters)
+        bitmap = pack_mask(np.ones(self.n_rows, dtype=bool))
+        for column, selected in selections.items():
+            index = self.index(column)
+            if index is not None:
+                bitmap &= index.union(selected)
+
+        entry = {'key': key, 'selections': selections, 'bitmap': bitmap, 'aggregates': {}}
+        self.cache.set(key, entry)
+        logger.debug(f"Filter state baru dihitung dalam {(time.perf_counter() - start) * 1000:.1f} ms")
+        return entry
+
+    def selection_bitmap(self, date_entry: Dict, entry: Optional[Dict] = None) -> np.ndarray:
+        """Bitmap semua baris terpilih (rentang tanggal + artikel tanpa tanggal, AND filter)"""
+        bitmap = date_entry['with_date'] | date_entry['no_date']
+        return bitmap & entry['bitmap'] if entry is not None else bitmap
+
+    def count(self, date_entry: Dict, entry: Optional[Dict] = None) -> int:
+        return popcount(self.selection_bitmap(date_entry, entry))
+
+    def value_counts(
+        self,
+        date_entry: Dict,
+        entry: Optional[Dict],
+        column: str,
+        label: str
+    ) -> pd.DataFrame:
+        """
+        Jumlah baris terpilih per nilai kolom (setara value_counts().reset_index()),
+        dihitung dari bitmap index tanpa membentuk DataFrame terfilter
+        """
+        index = self.index(column)
+        if index is None:
+            return pd.DataFrame({label: pd.Series(dtype=object), 'count': pd.Series(dtype=np.int64)})
+        counts = index.counts(self.selection_bitmap(date_entry, entry))
+        order = np.flatnonzero(counts)
+        order = order[np.argsort(-counts[order], kind='stable')]
+        return pd.DataFrame({label: index.values[order], 'count': counts[order]})
+
+    def rows(self, date_entry: Dict, entry: Optional[Dict] = None) -> np.ndarray:
+        """
+        Posisi baris terpilih: artikel bertanggal dulu, lalu artikel tanpa tanggal
+        (urutan sama dengan concat lama)
+        """
+        with_date = unpack_mask(date_entry['with_date'], self.n_rows)
+        no_date = unpack_mask(date_entry['no_date'], self.n_rows)
+        if entry is not None:
+            mask = unpack_mask(entry['bitmap'], self.n_rows)
+            with_date = with_date & mask
+            no_date = no_date & mask
+        return np.concatenate([np.flatnonzero(with_date), np.flatnonzero(no_date)])
+
+    def frame(self, date_entry: Dict, entry: Optional[Dict] = None) -> pd.DataFrame:
+        """DataFrame baris terpilih (index di-reset)"""
+        return self.df.take(self.rows(date_entry, entry)).reset_index(drop=True)
+
+    def timeseries(self) -> Optional[TimeSeriesCube]:
+        """Time series cube (relevant_date x published_at x dimensi filter), dibangun sekali"""
+        if self._cube is None and self._dates is not None:
+            dimensions = {}
+            for column in list(FILTER_DIMENSIONS.values()) + ['truth_category']:
+                index = self.index(column)
+                if index is not None:
+                    dimensions[column] = (index.codes, index.values)
+            published = self.df["published_at"] if "published_at" in self.df.columns else None
+            self._cube = TimeSeriesCube.build(self._dates, published, dimensions, self.max_allowed_ts)
+        return self._cube
+
+    def timeline_cells(self, date_entry: Dict, entry: Optional[Dict] = None) -> Optional[np.ndarray]:
+        """Mask sel cube untuk state filter (rentang tanggal + filter), di-cache per state"""
+        cube = self.timeseries()
+        if cube is None:
+            return None
+        return self.aggregate(
+            entry if entry is not None else date_entry,
+            'timeline_cells',
+            lambda: cube.cell_mask(date_entry['start'], date_entry['end'], entry['selections'] if entry else None)
+        )
+
+    def delay_rows(self) -> Optional[np.ndarray]:
+        """Baris dengan delay_days valid dan published_at tidak melewati max_allowed_ts"""
+        if self._delay_rows is None and "delay_days" in self.df.columns:
+            rows = np.ones(self.n_rows, dtype=bool)
+            if self.max_allowed_ts is not None and "published_at" in self.df.columns:
+                rows = (self.df["published_at"] <= self.max_allowed_ts).to_numpy()
+            self._delay_rows = rows
+        return self._delay_rows
+
+    def delay_metrics(self, date_entry: Dict, entry: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Statistik + histogram delay publish (helpers.delay_metrics.delay_summary)
+        untuk baris terpilih, di-cache per state filter
+        """
+        delay_rows = self.delay_rows()
+        if delay_rows is None:
+            return None
+
+        def compute():
+            mask = unpack_mask(self.selection_bitmap(date_entry, entry), self.n_rows) & delay_rows
+            return delay_summary(self.df["delay_days"].to_numpy()[mask])
+
+        return self.aggregate(entry if entry is not None else date_entry, 'delay_metrics', compute)
+
+    @staticmethod
+    def aggregate(entry: Dict, name: str, compute: Callable[[], object]):
+        """Agregat turunan (value_counts, KPI) yang dihitung sekali per state filter"""
+        aggregates = entry['aggregates']
+        if name not in aggregates:
+            aggregates[name] = compute()
+        return aggregates[name]
+
+    def stats(self) -> Dict[str, float]:
+        return self.cache.stats()
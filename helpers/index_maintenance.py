@@ -0,0 +1,598 @@
+# -*- coding: utf-8 -*-
+"""
+Index Maintenance Service
+Update FAISS similarity index secara incremental: hanya artikel baru/berubah
+yang di-encode, artikel yang dihapus/berubah dikeluarkan dari ID-mapped index
+"""
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import logging
+
+import numpy as np
+
+from helpers.ann_index import (
+    DEFAULT_NPROBE,
+    DEFAULT_EF_SEARCH,
+    build_ann_index,
+    configure_search,
+    detect_index_type,
+    export_vectors,
+    read_index,
+    remove_ids,
+    resolve_index_type,
+    supports_ids
+)
+from helpers.columnar_metadata import ColumnarMetadata, write_columnar_metadata
+from helpers.embedding_batcher import bucketed_encode
+from helpers.chunked_embeddings import DEFAULT_OVERLAP_WORDS, ChunkStore, encode_chunked, validate_chunk_params
+from helpers.embedding_store import (
+    get_engine_index,
+    set_engine_index,
+    get_engine_metadata,
+    set_engine_metadata,
+    normalize_article_id
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+LOCK_FILE = '.lock'
+SNIPPET_LENGTH = 200
+# Key manifest yang menunjuk file/direktori per versi
+VERSION_FILE_KEYS = ('index_file', 'metadata_file', 'metadata_dir', 'chunks_dir')
+
+
+def article_fingerprint(article: Dict) -> str:
+    """Hash teks artikel untuk mendeteksi artikel yang berubah sejak build terakhir"""
+    text = str(article.get('text') or '')
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def article_metadata_entry(article: Dict) -> Dict:
+    """Metadata artikel yang disimpan sejajar dengan posisi vektor di index"""
+    content = str(article.get('content') or '')
+    return {
+        'id': article.get('id'),
+        'title': article.get('title', ''),
+        'truth_category': article.get('truth_category', 'UNKNOWN'),
+        'categories': article.get('categories', ''),
+        'classifications': article.get('classifications', ''),
+        'url': article.get('url') or article.get('source_url', ''),
+        'date': article.get('date'),
+        'content_snippet': content[:SNIPPET_LENGTH] + ('...' if len(content) > SNIPPET_LENGTH else '')
+    }
+
+
+def process_memory_mb() -> Dict[str, float]:
+    """
+    Pemakaian memori proses (Linux /proc): rss_mb total, private_mb (RssAnon,
+    milik proses sendiri) dan shared_file_mb (RssFile, page cache yang bisa dibagi)
+    """
+    memory = {}
+    keys = {'VmRSS': 'rss_mb', 'RssAnon': 'private_mb', 'RssFile': 'shared_file_mb'}
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                key = line.split(':', 1)[0]
+                if key in keys:
+                    memory[keys[key]] = int(line.split()[1]) / 1024
+    except OSError:
+        import resource
+        memory['rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return memory
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Tulis file lewat file sementara + os.replace agar pembaca tidak pernah melihat file setengah jadi"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def store_file_lock(store_dir: Path):
+    """
+    Lock eksklusif antar proses (fcntl.flock pada store_dir/.lock) untuk sync + persist;
+    tanpa fcntl (non-POSIX) hanya lock per proses yang berlaku
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    with open(store_dir / LOCK_FILE, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class IndexMaintenanceService:
+    """
+    Menjaga similarity index tetap sinkron dengan tabel articles tanpa full rebuild.
+
+    Index memakai id = posisi metadata (IndexIDMap2 untuk Flat/HNSW, id native
+    untuk IVF), sehingga lookup metadata[idx] di SimilarityEngine tetap berlaku.
+    Artikel yang dihapus ditandai None di metadata (tombstone) dan dikeluarkan
+    dari index. Tipe index (flat, ivf_flat, hnsw, ivf_pq) dipilih lewat index_type;
+    index yang tipenya berbeda dibangun ulang sekali dari vektor yang sudah ada.
+
+    File di store_dir ditulis per versi lalu manifest.json diganti secara atomik
+    sebagai commit point. Sync + persist berjalan di bawah file lock antar proses
+    dan diawali dengan load ulang store jika manifest di disk lebih baru (ditulis
+    proses lain). File versi sebelumnya tetap disimpan untuk worker yang masih
+    membacanya; yang dihapus hanya versi dua langkah ke belakang.
+    Index dan metadata kolom di-load dengan memory-mapping (mmap=True) sehingga
+    beberapa worker berbagi page cache yang sama; index disalin ke memori dari
+    index yang sudah ter-load ketika sync perlu mengubahnya.
+
+    Dengan chunking=True artikel panjang di-encode per window overlap dan vektor
+    artikel adalah hasil pooling chunk; vektor per chunk disimpan di ChunkStore
+    (store_chunks=True) untuk pencarian best-matching chunk.
+    """
+
+    def __init__(
+        self,
+        similarity_engine,
+        db_manager,
+        store_dir,
+        text_fn: Optional[Callable[[Dict], str]] = None,
+        batch_size: int = 32,
+        lock: Optional[threading.RLock] = None,
+        index_type: str = 'flat',
+        index_params: Optional[Dict] = None,
+        mmap: bool = True,
+        chunking: bool = False,
+        chunk_params: Optional[Dict] = None,
+        store_chunks: bool = True
+    ):
+        self.similarity_engine = similarity_engine
+        self.db_manager = db_manager
+        self.store_dir = Path(store_dir)
+        self.text_fn = text_fn or (lambda article: str(article.get('text') or ''))
+        self.batch_size = batch_size
+        self.lock = lock or threading.RLock()
+        self.index_type = index_type
+        self.index_params = index_params or {}
+        self.mmap = mmap
+        self.chunking = chunking
+        self.chunk_params = chunk_params or {}
+        if chunking:
+            validate_chunk_params(
+                self.chunk_params.get('window_words'),
+                self.chunk_params.get('overlap_words', DEFAULT_OVERLAP_WORDS)
+            )
+        self.store_chunks = store_chunks
+        self.chunk_store = None
+        self._index_mmapped = False
+        self.manifest = None
+        self.last_sync = None
+        self.last_encode_report = None
+
+    @property
+    def version(self) -> int:
+        """Versi index, naik setiap kali sync mengubah isi index"""
+        return self.manifest['version'] if self.manifest else 0
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.store_dir / MANIFEST_FILE
+
+    def has_store(self) -> bool:
+        return self.manifest_path.exists()
+
+    def load(self) -> bool:
+        """
+        Load index + metadata dari store incremental dan pasang ke similarity engine
+
+        Returns:
+            bool: True jika store ada dan berhasil di-load
+        """
+        if not self.has_store():
+            return False
+
+        try:
+            manifest = self._read_manifest()
+
+            index, mmapped = read_index(
+                self.store_dir / manifest['index_file'],
+                index_type=manifest.get('index_type'),
+                mmap=self.mmap
+            )
+            self._configure_search(index)
+            if 'metadata_dir' in manifest:
+                metadata = ColumnarMetadata(self.store_dir / manifest['metadata_dir'], mmap=self.mmap)
+            else:
+                # Store lama: metadata masih berupa pickle list of dict
+                with open(self.store_dir / manifest['metadata_file'], 'rb') as f:
+                    metadata = pickle.load(f)
+            chunk_store = None
+            if manifest.get('chunks_dir'):
+                chunk_store = ChunkStore.load(self.store_dir / manifest['chunks_dir'], mmap=self.mmap)
+
+            with self.lock:
+                set_engine_index(self.similarity_engine, index)
+                set_engine_metadata(self.similarity_engine, metadata)
+                self.manifest = manifest
+                self.chunk_store = chunk_store
+                self._index_mmapped = mmapped
+
+            logger.info(f"Index store v{manifest['version']} loaded: {index.ntotal} vectors (mmap={mmapped})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Gagal load index store: {e}")
+            return False
+
+    def _read_manifest(self) -> Dict:
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _reload_if_newer(self) -> bool:
+        """
+        Load ulang store jika manifest di disk lebih baru dari self.manifest
+        (sync dari proses / service lain)
+
+        Returns:
+            bool: True jika store di-load ulang
+        """
+        if not self.has_store():
+            return False
+        on_disk = self._read_manifest()
+        if self.manifest is not None and on_disk.get('version', 0) <= self.version:
+            return False
+        logger.info(f"Manifest di disk v{on_disk.get('version', 0)} lebih baru dari v{self.version}, load ulang store")
+        return self.load()
+
+    def _writable_copy(self, index):
+        """Salinan in-memory dari index hasil mmap (read-only) agar bisa diubah"""
+        import faiss
+
+        if detect_index_type(index) in ('ivf_flat', 'ivf_pq'):
+            # Inverted lists on-disk tidak bisa diserialisasi dari memori; file versi
+            # manifest saat ini tidak dihapus selama store terkunci
+            index = read_index(self.store_dir / self.manifest['index_file'], mmap=False)[0]
+        else:
+            index = faiss.deserialize_index(faiss.serialize_index(index))
+        self._configure_search(index)
+        return index
+
+    def _configure_search(self, index) -> None:
+        configure_search(
+            index,
+            nprobe=self.index_params.get('nprobe', DEFAULT_NPROBE),
+            ef_search=self.index_params.get('ef_search', DEFAULT_EF_SEARCH)
+        )
+
+    def _ensure_index_type(self, index, manifest: Dict):
+        """
+        Pastikan index bertipe index_type dan mendukung id artikel; jika tidak,
+        bangun ulang dari vektor yang sudah ada (tanpa encode ulang)
+
+        Returns:
+            Tuple (index, rebuilt)
+        """
+        # Tipe yang akan dibangun untuk jumlah vektor saat ini (ivf_pq kecil = ivf_flat),
+        # sehingga fallback tidak memicu rebuild di setiap sync
+        expected_type = resolve_index_type(self.index_type, index.ntotal)
+        if supports_ids(index) and detect_index_type(index) == expected_type:
+            self._configure_search(index)
+            return index, False
+
+        logger.info(f"Membangun ulang index ke tipe '{expected_type}' untuk update incremental...")
+        if supports_ids(index):
+            known_ids = [entry[0] for entry in manifest['articles'].values()] + manifest.get('orphans', [])
+            ids, vectors = export_vectors(index, known_ids)
+        else:
+            ids, vectors = export_vectors(index)
+
+        rebuilt = build_ann_index(
+            vectors,
+            index_type=self.index_type,
+            ids=ids,
+            metric_type=index.metric_type,
+            **self.index_params
+        )
+        return rebuilt, True
+
+    @staticmethod
+    def _copy_manifest(manifest: Dict) -> Dict:
+        """Salinan manifest yang aman diubah sync (articles / orphans ikut disalin)"""
+        manifest = dict(manifest)
+        manifest['articles'] = dict(manifest['articles'])
+        if 'orphans' in manifest:
+            manifest['orphans'] = list(manifest['orphans'])
+        return manifest
+
+    def _bootstrap_manifest(self, metadata: List, records: Dict) -> Dict:
+        """Buat manifest awal dari metadata index yang sudah ada"""
+        articles = {}
+        orphans = []
+        for pos in range(len(metadata)):
+            item = metadata[pos]
+            article_id = normalize_article_id(item.get('id')) if isinstance(item, dict) else None
+            if article_id is None or str(article_id) in articles:
+                orphans.append(pos)
+                continue
+            record = records.get(article_id)
+            fingerprint = article_fingerprint(record) if record is not None else None
+            articles[str(article_id)] = [pos, fingerprint]
+
+        if orphans:
+            logger.warning(f"{len(orphans)} vektor tanpa article id akan dikeluarkan dari index")
+
+        return {
+            'version': 0,
+            'next_id': len(metadata),
+            'articles': articles,
+            'orphans': orphans
+        }
+
+    def _encode(self, texts: List[str], metric_type):
+        """
+        Encode teks artikel untuk index
+
+        Returns:
+            Tuple (vectors, chunks); chunks None jika chunking tidak aktif
+        """
+        import faiss
+
+        chunks = None
+        if self.chunking:
+            vectors, chunks, report = encode_chunked(self.similarity_engine.sbert_model, texts, **self.chunk_params)
+        else:
+            vectors, report = bucketed_encode(self.similarity_engine.sbert_model, texts, batch_size=self.batch_size)
+        self.last_encode_report = report
+        if metric_type == faiss.METRIC_INNER_PRODUCT:
+            faiss.normalize_L2(vectors)
+        return vectors, chunks
+
+    def sync(self) -> Dict:
+        """
+        Deteksi artikel baru/berubah/terhapus sejak sync terakhir lalu update index
+
+        Returns:
+            Dict: Ringkasan perubahan (added, updated, removed, version, duration)
+        """
+        with store_file_lock(self.store_dir):
+            self._reload_if_newer()
+            return self._sync()
+
+    def _sync(self) -> Dict:
+        start_time = time.time()
+        df = self.db_manager.load_hoax_articles()
+        if df.empty:
+            logger.warning("Tidak ada artikel dari database, sync dilewati")
+            return {'added': 0, 'updated': 0, 'removed': 0, 'version': self.version, 'duration': 0.0}
+
+        records = {normalize_article_id(r['id']): r for r in df.to_dict('records')}
+
+        with self.lock:
+            metadata = get_engine_metadata(self.similarity_engine)
+            if metadata is None:
+                metadata = []
+            # Manifest baru dibangun di salinan; self.manifest baru diganti setelah persist ter-commit
+            manifest = self._copy_manifest(self.manifest) if self.manifest else self._bootstrap_manifest(metadata, records)
+            index, rebuilt = self._ensure_index_type(get_engine_index(self.similarity_engine), manifest)
+            set_engine_index(self.similarity_engine, index)
+
+        known = manifest['articles']
+        # Mode chunking berubah: semua vektor artikel harus di-encode ulang
+        mode_changed = bool(known) and manifest.get('chunking', False) != self.chunking
+        if mode_changed:
+            logger.info(f"Mode chunking berubah ke {self.chunking}, encode ulang {len(known)} artikel...")
+        new_ids, changed_ids = [], []
+        for article_id, record in records.items():
+            entry = known.get(str(article_id))
+            if entry is None:
+                new_ids.append(article_id)
+            elif mode_changed or entry[1] != article_fingerprint(record):
+                changed_ids.append(article_id)
+        removed_ids = [key for key in known if normalize_article_id(key) not in records]
+
+        stale_positions = [known[str(a)][0] for a in changed_ids] + [known[k][0] for k in removed_ids]
+        stale_positions += manifest.pop('orphans', [])
+        upsert_ids = new_ids + changed_ids
+
+        if not upsert_ids and not stale_positions:
+            with self.lock:
+                if rebuilt:
+                    manifest['version'] += 1
+                if rebuilt or manifest['version'] == 0:
+                    self._persist(manifest, index, metadata, self.chunk_store)
+                self.manifest = manifest
+                self.last_sync = time.time()
+            return {'added': 0, 'updated': 0, 'removed': 0, 'version': self.version,
+                    'duration': time.time() - start_time}
+
+        # Encode di luar lock supaya pencarian tetap jalan selama encoding
+        vectors, chunks = None, None
+        if upsert_ids:
+            texts = [self.text_fn(records[a]) for a in upsert_ids]
+            vectors, chunks = self._encode(texts, index.metric_type)
+
+        with self.lock:
+            # Index/metadata hasil mmap read-only: salin ke memori sebelum diubah
+            metadata = list(metadata)
+            if self._index_mmapped and not rebuilt:
+                index = self._writable_copy(index)
+            if stale_positions:
+                index = remove_ids(index, stale_positions, rebuild_params=self.index_params)
+                for pos in stale_positions:
+                    if pos < len(metadata):
+                        metadata[pos] = None
+            # ChunkStore.add/remove_positions mengganti array, salinan dangkal cukup
+            chunk_store = copy.copy(self.chunk_store)
+            if not (self.chunking and self.store_chunks):
+                chunk_store = None
+            elif chunk_store is None or mode_changed:
+                chunk_store = ChunkStore()
+            elif stale_positions:
+                chunk_store.remove_positions(stale_positions)
+            for key in removed_ids:
+                known.pop(key, None)
+
+            if upsert_ids:
+                next_id = manifest['next_id']
+                metadata.extend([None] * (next_id - len(metadata)))
+                positions = np.arange(next_id, next_id + len(upsert_ids), dtype=np.int64)
+                index.add_with_ids(vectors, positions)
+                if chunk_store is not None and chunks is not None:
+                    chunk_store.add(positions[chunks['owner']], chunks['offset'], chunks['vectors'])
+                for article_id, pos in zip(upsert_ids, positions):
+                    record = records[article_id]
+                    metadata.append(article_metadata_entry(record))
+                    known[str(article_id)] = [int(pos), article_fingerprint(record)]
+                manifest['next_id'] = next_id + len(upsert_ids)
+
+            manifest['version'] += 1
+            try:
+                self._persist(manifest, index, metadata, chunk_store)
+            except Exception:
+                # Index non-mmap bisa sudah berubah di tempat: kembali ke versi yang ter-commit
+                if self.has_store():
+                    self.load()
+                raise
+            set_engine_index(self.similarity_engine, index)
+            set_engine_metadata(self.similarity_engine, metadata)
+            self.manifest = manifest
+            self.chunk_store = chunk_store
+            self._index_mmapped = False
+            self.last_sync = time.time()
+
+        result = {
+            'added': len(new_ids),
+            'updated': len(changed_ids),
+            'removed': len(removed_ids),
+            'version': self.version,
+            'duration': time.time() - start_time
+        }
+        logger.info(
+            f"Index sync v{result['version']}: +{result['added']} baru, "
+            f"{result['updated']} berubah, -{result['removed']} dihapus ({result['duration']:.1f}s)"
+        )
+        return result
+
+    def _persist(self, manifest: Dict, index, metadata: List, chunk_store: Optional[ChunkStore]) -> None:
+        """Simpan index + metadata (+ chunk) versi baru, lalu ganti manifest secara atomik"""
+        import faiss
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        previous = self._read_manifest() if self.manifest_path.exists() else None
+
+        version = manifest['version']
+        manifest['index_file'] = f"index.v{version}.faiss"
+        manifest.pop('metadata_file', None)
+        manifest['metadata_dir'] = f"metadata.v{version}"
+        manifest['updated_at'] = datetime.now().isoformat()
+        manifest['index_type'] = detect_index_type(index)
+        manifest['chunking'] = self.chunking
+        manifest.pop('chunks_dir', None)
+        if chunk_store is not None:
+            manifest['chunks_dir'] = f"chunks.v{version}"
+
+        # File versi sebelumnya tetap ada (worker lain bisa masih membacanya),
+        # yang dihapus setelah commit hanya file versi sebelum itu
+        current_files = {manifest[key] for key in VERSION_FILE_KEYS if manifest.get(key)}
+        stale_files = []
+        manifest['previous_files'] = []
+        if previous:
+            previous_files = [previous[key] for key in VERSION_FILE_KEYS if previous.get(key)]
+            manifest['previous_files'] = [f for f in previous_files if f not in current_files]
+            stale_files = [
+                f for f in previous.get('previous_files', [])
+                if f not in current_files and f not in previous_files
+            ]
+
+        atomic_write_bytes(self.store_dir / manifest['index_file'], faiss.serialize_index(index).tobytes())
+        write_columnar_metadata(metadata, self.store_dir / manifest['metadata_dir'])
+        if chunk_store is not None:
+            chunk_store.save(self.store_dir / manifest['chunks_dir'])
+        atomic_write_bytes(self.manifest_path, json.dumps(manifest).encode('utf-8'))
+
+        for old_path in stale_files:
+            old_path = self.store_dir / old_path
+            if old_path.is_dir():
+                shutil.rmtree(old_path, ignore_errors=True)
+            elif old_path.exists():
+                old_path.unlink()
+
+
+def _measure_worker(store_dir: str, mmap: bool, queue) -> None:
+    """Load store di proses terpisah lalu laporkan time-to-ready dan memori"""
+    from types import SimpleNamespace
+
+    start = time.perf_counter()
+    engine = SimpleNamespace(index=None, metadata=None)
+    service = IndexMaintenanceService(engine, None, store_dir, mmap=mmap)
+    if not service.load():
+        raise RuntimeError(f"Gagal load index store {store_dir}")
+    # Sentuh semua metadata + satu pencarian, seperti worker yang siap melayani query
+    metadata = get_engine_metadata(engine)
+    if isinstance(metadata, ColumnarMetadata):
+        metadata.touch()
+    else:
+        sum(1 for item in metadata if item is not None)
+    index = get_engine_index(engine)
+    index.search(np.zeros((1, index.d), dtype=np.float32), 3)
+    queue.put(dict(time_to_ready_s=time.perf_counter() - start, **process_memory_mb()))
+
+
+if __name__ == "__main__":
+    import argparse
+    import multiprocessing
+    import queue as queue_module
+
+    parser = argparse.ArgumentParser(description="Ukur time-to-ready dan RSS per worker saat load index store")
+    parser.add_argument("store_dir", help="Direktori index store (berisi manifest.json)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-mmap", action="store_true", help="Baca index + metadata penuh ke memori")
+    args = parser.parse_args()
+
+    result_queue = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_measure_worker, args=(args.store_dir, not args.no_mmap, result_queue))
+        for _ in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    print(f"Load index store ({'full read' if args.no_mmap else 'mmap'}), {args.workers} worker:")
+    for worker_id in range(args.workers):
+        row = None
+        while row is None:
+            try:
+                row = result_queue.get(timeout=1.0)
+            except queue_module.Empty:
+                # Worker yang crash tidak pernah mengirim hasil: berhenti daripada menunggu selamanya
+                if all(worker.exitcode is not None for worker in workers):
+                    break
+        if row is None:
+            failed = [worker.exitcode for worker in workers if worker.exitcode]
+            print(f"  - {args.workers - worker_id} worker gagal (exit code {failed})")
+            break
+        print(
+            f"  - worker {worker_id}: ready {row['time_to_ready_s'] * 1000:7.1f} ms | "
+            f"RSS {row.get('rss_mb', 0):7.1f} MB | private {row.get('private_mb', 0):7.1f} MB | "
+            f"shared {row.get('shared_file_mb', 0):7.1f} MB"
+        )
+    for worker in workers:
+        worker.join()
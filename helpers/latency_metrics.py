@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Latency Metrics Helper
+Timing per tahap analyze_message (filter, preprocess, encode, search, response),
+histogram rolling p50/p95/p99 dan ekspor format teks Prometheus
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('filter', 'preprocess', 'encode', 'search', 'response', 'total')
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_NAME = 'deephoaxid_stage_latency_seconds'
+
+
+class StageTimer:
+    """Kumpulan span timing (detik) untuk satu panggilan analyze_message"""
+
+    def __init__(self):
+        self.spans: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.spans[stage] = self.spans.get(stage, 0.0) + seconds
+
+    def finish(self) -> Dict[str, float]:
+        """Tutup timer; kembalikan spans termasuk 'total'"""
+        self.spans['total'] = time.perf_counter() - self._start
+        return dict(self.spans)
+
+
+class LatencyHistogram:
+    """
+    Window rolling latency per tahap (N sampel terakhir) plus count/sum kumulatif
+
+    Args:
+        window: Jumlah sampel terakhir per tahap untuk menghitung persentil
+    """
+
+    def __init__(self, window: int = 1000, stages: Iterable[str] = STAGES):
+        self.window = window
+        self._samples = {stage: deque(maxlen=window) for stage in stages}
+        self._count = {stage: 0 for stage in self._samples}
+        self._sum = {stage: 0.0 for stage in self._samples}
+        self._lock = threading.Lock()
+
+    def observe(self, spans: Dict[str, float]) -> None:
+        with self._lock:
+            for stage, seconds in spans.items():
+                if stage not in self._samples:
+                    self._samples[stage] = deque(maxlen=self.window)
+                    self._count[stage] = 0
+                    self._sum[stage] = 0.0
+                self._samples[stage].append(seconds)
+                self._count[stage] += 1
+                self._sum[stage] += seconds
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Persentil per tahap (ms) dari window rolling"""
+        with self._lock:
+            snapshot = {stage: np.fromiter(values, dtype=np.float64) for stage, values in self._samples.items()}
+            counts = dict(self._count)
+
+        summary = {}
+        for stage, values in snapshot.items():
+            if len(values) == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, [q * 100 for q in QUANTILES]) * 1000
+            summary[stage] = {
+                'p50_ms': round(float(p50), 3),
+                'p95_ms': round(float(p95), 3),
+                'p99_ms': round(float(p99), 3),
+                'samples': len(values),
+                'count': counts[stage]
+            }
+        return summary
+
+    def prometheus_text(self) -> str:
+        """Render histogram sebagai metric summary Prometheus (exposition format 0.0.4)"""
+        with self._lock:
+            snapshot = {stage: np.fromiter(values, dtype=np.float64) for stage, values in self._samples.items()}
+            counts = dict(self._count)
+            sums = dict(self._sum)
+
+        lines = [
+            f"# HELP {METRIC_NAME} Latency per tahap analyze_message DeepHoaxID",
+            f"# TYPE {METRIC_NAME} summary"
+        ]
+        for stage, values in snapshot.items():
+            if len(values):
+                for q, value in zip(QUANTILES, np.percentile(values, [q * 100 for q in QUANTILES])):
+                    lines.append(f'{METRIC_NAME}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {sums[stage]:.6f}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {counts[stage]}')
+        return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(render_fn, host: str = '127.0.0.1', port: int = 9108) -> Optional[ThreadingHTTPServer]:
+    """
+    Jalankan endpoint /metrics (teks Prometheus) di daemon thread
+
+    Args:
+        render_fn: Callable tanpa argumen yang mengembalikan teks metrics
+        host: Alamat bind (default hanya lokal)
+        port: Port HTTP
+
+    Returns:
+        Server yang berjalan, atau None jika port tidak bisa dipakai
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render_fn().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Metrics server tidak bisa dijalankan di {host}:{port}: {e}")
+        return None
+
+    thread = threading.Thread(target=server.serve_forever, name='deephoaxid-metrics', daemon=True)
+    thread.start()
+    logger.info(f"📈 Metrics endpoint: http://{host}:{port}/metrics")
+    return server
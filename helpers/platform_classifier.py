@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Platform Classifier Helper
+Klasifikasi platform sumber hoaks (Facebook, Twitter/X, ...) dari source_url:
+host diekstrak dengan operasi string vektor, lalu hanya host unik yang
+dicocokkan ke tabel suffix domain dan kata kunci platform
+"""
+
+import re
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Urutan kategori platform (juga urutan categories pada kolom categorical)
+PLATFORMS = [
+    "Facebook", "Twitter/X", "Instagram", "YouTube", "WhatsApp", "Telegram",
+    "TikTok", "Blog", "Media Indonesia", "Website Lain", "Unknown"
+]
+
+# Lookup host / suffix domain -> platform (dicocokkan dari label domain terpanjang)
+PLATFORM_HOST_SUFFIXES = {
+    "facebook.com": "Facebook",
+    "fb.com": "Facebook",
+    "fb.watch": "Facebook",
+    "fb.me": "Facebook",
+    "twitter.com": "Twitter/X",
+    "x.com": "Twitter/X",
+    "t.co": "Twitter/X",
+    "instagram.com": "Instagram",
+    "instagr.am": "Instagram",
+    "youtube.com": "YouTube",
+    "youtu.be": "YouTube",
+    "whatsapp.com": "WhatsApp",
+    "wa.me": "WhatsApp",
+    "telegram.org": "Telegram",
+    "telegram.me": "Telegram",
+    "t.me": "Telegram",
+    "tiktok.com": "TikTok",
+    "blogspot.com": "Blog",
+    "wordpress.com": "Blog",
+    "medium.com": "Blog",
+}
+
+# Kata kunci nama platform di host yang tidak ada di lookup (mis. facebook.co.id)
+PLATFORM_HOST_KEYWORDS = [
+    ("facebook", "Facebook"),
+    ("twitter", "Twitter/X"),
+    ("instagram", "Instagram"),
+    ("youtube", "YouTube"),
+    ("whatsapp", "WhatsApp"),
+    ("telegram", "Telegram"),
+    ("tiktok", "TikTok"),
+    ("blog", "Blog"),
+]
+
+# Host dari URL: skema dan userinfo opsional, berhenti di port / path / query
+HOST_PATTERN = re.compile(r'^\s*(?:[a-zA-Z][\w+.-]*://)?(?:[^@/?#]*@)?([^/:?#\s]+)')
+
+
+def extract_hosts(urls: pd.Series) -> pd.Series:
+    """Host huruf kecil tanpa 'www.' untuk setiap URL (vektor, NaN jika tidak ada)"""
+    hosts = urls.astype("string").str.extract(HOST_PATTERN, expand=False).str.lower()
+    return hosts.str.replace(r'^www\d*\.', '', regex=True)
+
+
+def classify_host(host: Optional[str]) -> str:
+    """Platform untuk satu host: lookup suffix, kata kunci, lalu domain .id"""
+    if not host:
+        return "Unknown"
+    labels = host.strip('.').split('.')
+    for i in range(len(labels) - 1):
+        platform = PLATFORM_HOST_SUFFIXES.get('.'.join(labels[i:]))
+        if platform:
+            return platform
+    for keyword, platform in PLATFORM_HOST_KEYWORDS:
+        if keyword in host:
+            return platform
+    if host.endswith('.id'):
+        return "Media Indonesia"
+    return "Website Lain"
+
+
+def classify_platforms(urls: pd.Series) -> pd.Categorical:
+    """
+    Platform untuk setiap URL sebagai categorical
+
+    Host diekstrak dengan operasi string vektor, lalu hanya host unik yang
+    diklasifikasikan (jumlahnya jauh lebih kecil dari jumlah artikel)
+    """
+    codes, uniques = pd.factorize(extract_hosts(urls), use_na_sentinel=True)
+    lookup: Dict[str, int] = {p: i for i, p in enumerate(PLATFORMS)}
+    unique_codes = np.fromiter(
+        (lookup[classify_host(h)] for h in uniques),
+        dtype=np.int8,
+        count=len(uniques)
+    )
+    platform_codes = np.full(len(codes), lookup["Unknown"], dtype=np.int8)
+    found = codes >= 0
+    platform_codes[found] = unique_codes[codes[found]]
+    return pd.Categorical.from_codes(platform_codes, categories=PLATFORMS)
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Projection Service Helper
+Layout 2D global (PCA / t-SNE) untuk semua artikel ter-index, disimpan di samping
+index store. Scatter clustering cukup mengambil koordinat artikel terfilter dari
+layout ini.
+
+Layout terakhir tetap dipakai setelah sync index: artikel baru diletakkan dekat
+tetangganya, dan layout dihitung ulang di background hanya jika porsi artikel
+baru / ter-encode ulang sudah melewati batas (mis. setelah full re-embed).
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from helpers.embedding_store import get_engine_index, normalize_article_id
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_METHODS = ('pca', 'tsne')
+# Artikel yang belum ada di layout diletakkan di rata-rata koordinat k tetangga terdekat
+PLACEMENT_NEIGHBORS = 5
+# Porsi artikel ter-index yang baru / di-encode ulang sejak layout dihitung yang memicu hitung ulang
+MAX_STALE_SHARE = 0.25
+
+
+def _tsne_layout(vectors: np.ndarray, random_state: int) -> Tuple[np.ndarray, str]:
+    """
+    t-SNE dengan inisialisasi PCA; pakai openTSNE (FFT + approximate neighbors)
+    atau UMAP jika terpasang, fallback ke sklearn Barnes-Hut
+    """
+    perplexity = min(30, max(len(vectors) - 1, 1) / 3)
+    try:
+        from openTSNE import TSNE as OpenTSNE
+        embedding = OpenTSNE(
+            n_components=2,
+            perplexity=perplexity,
+            initialization='pca',
+            neighbors='auto',
+            negative_gradient_method='fft',
+            n_jobs=-1,
+            random_state=random_state
+        ).fit(vectors)
+        return np.asarray(embedding, dtype=np.float32), 'opentsne'
+    except ImportError:
+        pass
+
+    try:
+        import umap
+        reducer = umap.UMAP(n_components=2, metric='cosine', random_state=random_state)
+        return reducer.fit_transform(vectors).astype(np.float32), 'umap'
+    except ImportError:
+        pass
+
+    from sklearn.manifold import TSNE
+    reducer = TSNE(
+        n_components=2,
+        perplexity=perplexity,
+        init='pca',
+        learning_rate='auto',
+        max_iter=1000,
+        random_state=random_state
+    )
+    return reducer.fit_transform(vectors).astype(np.float32), 'sklearn'
+
+
+def compute_layout(vectors: np.ndarray, method: str = 'pca', random_state: int = 42) -> Tuple[np.ndarray, str]:
+    """
+    Hitung koordinat 2D untuk vectors
+
+    Returns:
+        Tuple (coords (n, 2), backend yang dipakai)
+    """
+    if method == 'pca':
+        from sklearn.decomposition import PCA
+        reducer = PCA(n_components=2, random_state=random_state)
+        return reducer.fit_transform(vectors).astype(np.float32), 'pca'
+    if method == 'tsne':
+        return _tsne_layout(vectors, random_state)
+    raise ValueError(f"Method proyeksi tidak dikenal: {method}")
+
+
+class ProjectionService:
+    """
+    Layout 2D global per method, dipakai lintas versi embeddings
+
+    Artikel yang di-encode ulang mendapat posisi index baru, sehingga porsi
+    artikel yang baru atau posisinya berubah sejak layout dihitung mengukur
+    seberapa basi layout (full re-embed = hampir semua posisi berubah).
+
+    Args:
+        embedding_store: EmbeddingStore (sumber vektor + mapping article id -> posisi)
+        store_dir: Direktori penyimpanan layout (index store)
+        version_fn: Callable yang mengembalikan versi embeddings saat ini
+        lock: Lock index (dipakai saat membaca vektor)
+        max_stale_share: Porsi artikel baru / ter-encode ulang yang memicu hitung ulang di background
+        random_state: Random state layout
+    """
+
+    def __init__(
+        self,
+        embedding_store,
+        store_dir,
+        version_fn: Callable[[], int],
+        lock=None,
+        max_stale_share: float = MAX_STALE_SHARE,
+        random_state: int = 42
+    ):
+        self.embedding_store = embedding_store
+        self.store_dir = Path(store_dir)
+        self.version_fn = version_fn
+        self.lock = lock if lock is not None else threading.RLock()
+        self.max_stale_share = max_stale_share
+        self.random_state = random_state
+        self._layouts: Dict[str, Dict] = {}
+        self._recompute_threads: Dict[str, threading.Thread] = {}
+
+    def layout_path(self, method: str) -> Path:
+        return self.store_dir / f"projection.{method}.npz"
+
+    def _load_or_compute(self, method: str) -> Dict:
+        layout = self._layouts.get(method)
+        if layout is None:
+            path = self.layout_path(method)
+            if path.exists():
+                with np.load(path) as data:
+                    layout = {'version': int(data['version']), 'ids': data['ids'], 'positions': data['positions'],
+                              'coords': data['coords'], 'backend': str(data['backend'])}
+                logger.info(f"Layout {method} v{layout['version']} di-load: {len(layout['ids'])} artikel")
+            else:
+                # Belum ada layout sama sekali: hitung sekali secara sinkron
+                layout = self._compute(method, self.version_fn())
+            self._set_layout(method, layout)
+        self._check_staleness(method, layout)
+        return layout
+
+    def _set_layout(self, method: str, layout: Dict) -> None:
+        layout['id_to_row'] = {article_id: row for row, article_id in enumerate(layout['ids'].tolist())}
+        layout['placement'] = None
+        self._layouts[method] = layout
+
+    def stale_share(self, layout: Dict) -> float:
+        """Porsi artikel ter-index yang belum ada di layout atau posisinya berubah (di-encode ulang)"""
+        positions_map = self.embedding_store.positions
+        if not positions_map:
+            return 0.0
+        ids = np.fromiter(positions_map.keys(), dtype=np.int64, count=len(positions_map))
+        positions = np.fromiter(positions_map.values(), dtype=np.int64, count=len(positions_map))
+        rows = np.fromiter((layout['id_to_row'].get(a, -1) for a in ids.tolist()), dtype=np.int64, count=len(ids))
+        found = rows >= 0
+        stale = ~found
+        stale[found] = layout['positions'][rows[found]] != positions[found]
+        return float(stale.mean())
+
+    def _check_staleness(self, method: str, layout: Dict) -> None:
+        """Sekali per versi embeddings: hitung ulang layout di background jika sudah terlalu basi"""
+        version = self.version_fn()
+        if layout.get('checked_version') == version:
+            return
+        layout['checked_version'] = version
+        if layout['version'] == version:
+            return
+        share = self.stale_share(layout)
+        if share > self.max_stale_share:
+            logger.info(f"Layout {method} v{layout['version']} basi ({share:.0%} artikel baru/berubah), hitung ulang di background")
+            self.recompute_in_background(method)
+
+    def recompute_in_background(self, method: str) -> bool:
+        """
+        Hitung ulang layout di background thread; layout lama tetap dipakai sampai selesai
+
+        Returns:
+            bool: True jika hitung ulang baru dijalankan
+        """
+        thread = self._recompute_threads.get(method)
+        if thread is not None and thread.is_alive():
+            return False
+
+        def _run():
+            try:
+                self._set_layout(method, self._compute(method, self.version_fn()))
+            except Exception as e:
+                logger.error(f"Hitung ulang layout {method} gagal: {e}")
+
+        thread = threading.Thread(target=_run, name=f"projection-{method}", daemon=True)
+        self._recompute_threads[method] = thread
+        thread.start()
+        return True
+
+    def _compute(self, method: str, version: int) -> Dict:
+        start = time.time()
+        with self.lock:
+            positions_map = self.embedding_store.positions
+            ids = np.fromiter(positions_map.keys(), dtype=np.int64, count=len(positions_map))
+            positions = np.fromiter(positions_map.values(), dtype=np.int64, count=len(positions_map))
+            vectors = self.embedding_store.vectors_at(positions)
+        coords, backend = compute_layout(vectors, method=method, random_state=self.random_state)
+
+        layout = {'version': version, 'ids': ids, 'positions': positions, 'coords': coords, 'backend': backend}
+        self._persist(method, layout)
+        logger.info(f"Layout {method} ({backend}) v{version}: {len(ids)} artikel dalam {time.time() - start:.1f}s")
+        return layout
+
+    def _persist(self, method: str, layout: Dict) -> None:
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        path = self.layout_path(method)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, version=np.array(layout['version']), ids=layout['ids'], positions=layout['positions'],
+                 coords=layout['coords'], backend=np.array(layout['backend']))
+        os.replace(tmp_path, path)
+
+    def _placement_rows(self, layout: Dict) -> Dict[int, int]:
+        """Posisi index saat ini -> baris layout, untuk artikel yang vektornya tidak berubah sejak layout dihitung"""
+        version = self.version_fn()
+        placement = layout['placement']
+        if placement is None or placement[0] != version:
+            id_to_row = layout['id_to_row']
+            layout_positions = layout['positions']
+            rows = {}
+            for article_id, pos in self.embedding_store.positions.items():
+                row = id_to_row.get(article_id)
+                if row is not None and layout_positions[row] == pos:
+                    rows[pos] = row
+            placement = (version, rows)
+            layout['placement'] = placement
+        return placement[1]
+
+    def _place_missing(self, layout: Dict, vectors: np.ndarray) -> np.ndarray:
+        """Koordinat artikel di luar layout: rata-rata koordinat tetangga terdekat di index"""
+        coords = np.zeros((len(vectors), 2), dtype=np.float32)
+        with self.lock:
+            index = get_engine_index(self.embedding_store.similarity_engine)
+            if index is None or not len(layout['positions']):
+                return coords
+            position_to_row = self._placement_rows(layout)
+            _, neighbors = index.search(np.ascontiguousarray(vectors, dtype=np.float32), PLACEMENT_NEIGHBORS)
+        for i, row_neighbors in enumerate(neighbors):
+            rows = [position_to_row[p] for p in row_neighbors.tolist() if p in position_to_row]
+            if rows:
+                coords[i] = layout['coords'][rows].mean(axis=0)
+        return coords
+
+    def coordinates(
+        self,
+        article_ids: Sequence,
+        method: str = 'pca',
+        embeddings: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Koordinat 2D untuk daftar artikel (urut sesuai input)
+
+        Args:
+            article_ids: Daftar article id
+            method: 'pca' atau 'tsne'
+            embeddings: Embeddings artikel sejajar article_ids (untuk artikel
+                yang belum ada di layout)
+
+        Returns:
+            numpy array (n, 2)
+        """
+        if method not in PROJECTION_METHODS:
+            raise ValueError(f"Method proyeksi tidak dikenal: {method}")
+        layout = self._load_or_compute(method)
+        id_to_row = layout['id_to_row']
+        rows = np.fromiter(
+            (id_to_row.get(normalize_article_id(a), -1) for a in article_ids),
+            dtype=np.int64,
+            count=len(article_ids)
+        )
+        found = rows >= 0
+        coords = np.zeros((len(rows), 2), dtype=np.float32)
+        coords[found] = layout['coords'][rows[found]]
+
+        if not found.all():
+            missing = np.flatnonzero(~found)
+            if embeddings is not None:
+                coords[missing] = self._place_missing(layout, np.asarray(embeddings)[missing])
+            logger.info(f"{len(missing)} artikel belum ada di layout {method}, diletakkan dekat tetangganya")
+        return coords
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Province GeoJSON Helper
+Batas provinsi Indonesia (34 provinsi) untuk peta choropleth, dibundel di
+static/geo/ dalam beberapa level detail (LOD). Setiap LOD hasil penyederhanaan
+Douglas-Peucker yang menjaga topologi: garis batas yang dipakai bersama dua
+provinsi disederhanakan sekali per arc, sehingga tidak muncul celah atau
+tumpang tindih antar provinsi.
+
+Setiap feature punya `id` = nama provinsi seperti di kolom relevant_province
+(helpers.location_extractor), jadi choropleth memakai featureidkey="id" tanpa
+mapping per rerun. Ring luar mengikuti urutan searah jarum jam (konvensi d3 /
+plotly.js).
+
+Sumber: peta Indonesia dari echarts-countries-js (paket PyPI
+echarts-countries-pypkg, lisensi MIT), koordinat dikuantisasi 1/1024 derajat.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+import numpy as np
+
+GEO_DIR = Path(__file__).resolve().parent.parent / "static" / "geo"
+FEATURE_ID_KEY = "id"
+
+# LOD -> (toleransi Douglas-Peucker dalam derajat, luas minimum pulau dalam derajat^2)
+PROVINCE_GEOJSON_LODS: Dict[int, Tuple[float, float]] = {
+    0: (0.0, 0.0),
+    1: (0.02, 0.0005),
+    2: (0.06, 0.004)
+}
+DEFAULT_LOD = 2
+# Pilihan detail di UI -> LOD
+MAP_DETAIL_LODS = {"Rendah": 2, "Sedang": 1, "Tinggi": 0}
+# URL file LOD lewat static file serving Streamlit (server.enableStaticServing)
+PROVINCE_GEOJSON_URL = "app/static/geo/indonesia_provinces_lod{lod}.geojson"
+
+# Nama provinsi di sumber (bahasa Inggris) -> nama di relevant_province
+SOURCE_NAME_TO_PROVINCE = {
+    "Aceh": "Aceh",
+    "Bali": "Bali",
+    "Bangka-Belitung Islands": "Bangka Belitung",
+    "Banten": "Banten",
+    "Bengkulu": "Bengkulu",
+    "Central Java": "Jawa Tengah",
+    "Central Kalimantan": "Kalimantan Tengah",
+    "Central Sulawesi": "Sulawesi Tengah",
+    "East Java": "Jawa Timur",
+    "East Kalimantan": "Kalimantan Timur",
+    "East Nusa Tenggara": "Nusa Tenggara Timur",
+    "Gorontalo": "Gorontalo",
+    "Jakarta Special Capital Region": "DKI Jakarta",
+    "Jambi": "Jambi",
+    "Lampung": "Lampung",
+    "Maluku": "Maluku",
+    "North Kalimantan": "Kalimantan Utara",
+    "North Maluku": "Maluku Utara",
+    "North Sulawesi": "Sulawesi Utara",
+    "North Sumatra": "Sumatera Utara",
+    "Papua": "Papua",
+    "Riau": "Riau",
+    "Riau Islands": "Kepulauan Riau",
+    "Southeast Sulawesi": "Sulawesi Tenggara",
+    "South Kalimantan": "Kalimantan Selatan",
+    "South Sulawesi": "Sulawesi Selatan",
+    "South Sumatra": "Sumatera Selatan",
+    "Special Region of Yogyakarta": "DI Yogyakarta",
+    "West Java": "Jawa Barat",
+    "West Kalimantan": "Kalimantan Barat",
+    "West Nusa Tenggara": "Nusa Tenggara Barat",
+    "West Papua": "Papua Barat",
+    "West Sulawesi": "Sulawesi Barat",
+    "West Sumatra": "Sumatera Barat"
+}
+
+
+def province_geojson_path(lod: int) -> Path:
+    return GEO_DIR / f"indonesia_provinces_lod{lod}.geojson"
+
+
+def province_geojson_url(lod: int) -> str:
+    return PROVINCE_GEOJSON_URL.format(lod=lod)
+
+
+@lru_cache(maxsize=None)
+def load_province_geojson(lod: int = DEFAULT_LOD) -> Dict:
+    """GeoJSON provinsi untuk satu LOD (dibaca sekali per proses)"""
+    with open(province_geojson_path(lod), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def province_feature_ids(lod: int = DEFAULT_LOD) -> FrozenSet[str]:
+    """Id feature (nama provinsi) yang ada di GeoJSON LOD"""
+    return frozenset(f[FEATURE_ID_KEY] for f in load_province_geojson(lod)["features"])
+
+
+def _douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Mask titik yang dipertahankan (titik awal dan akhir selalu dipertahankan)"""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        segment = end - start
+        inner = points[first + 1:last] - start
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+def _simplify_arc(arc: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Sederhanakan satu arc dengan arah kanonik, supaya arc yang sama dari dua
+    provinsi (dilalui berlawanan arah) menghasilkan titik yang identik
+    """
+    reverse = tuple(arc[-1]) < tuple(arc[0]) or (
+        tuple(arc[-1]) == tuple(arc[0]) and len(arc) > 2 and tuple(arc[-2]) < tuple(arc[1])
+    )
+    oriented = arc[::-1] if reverse else arc
+    simplified = oriented[_douglas_peucker(oriented, tolerance)]
+    return simplified[::-1] if reverse else simplified
+
+
+def _ring_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0], ring[:, 1]
+    return float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) / 2
+
+
+def simplify_provinces(features: Sequence[Dict], tolerance: float, min_area: float = 0.0) -> List[Dict]:
+    """
+    Penyederhanaan yang menjaga topologi untuk daftar feature Polygon/MultiPolygon
+
+    Titik yang dipakai bersama oleh himpunan feature berbeda dengan tetangganya
+    menjadi titik tetap (ujung arc); setiap arc di antara titik tetap
+    disederhanakan secara kanonik. Pulau tanpa batas bersama yang luasnya di
+    bawah min_area dibuang.
+
+    Args:
+        features: Feature GeoJSON (ring tertutup)
+        tolerance: Toleransi Douglas-Peucker (derajat); 0 = tanpa penyederhanaan
+        min_area: Luas minimum ring tanpa batas bersama (derajat^2)
+    """
+    polygons_per_feature = []
+    owners: Dict[Tuple[float, float], set] = {}
+    for i, feature in enumerate(features):
+        geometry = feature["geometry"]
+        polygons = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+        polygons = [[np.asarray(ring, dtype=np.float64) for ring in polygon] for polygon in polygons]
+        polygons_per_feature.append(polygons)
+        for polygon in polygons:
+            for ring in polygon:
+                for point in map(tuple, ring[:-1]):
+                    owners.setdefault(point, set()).add(i)
+
+    simplified_features = []
+    for feature, polygons in zip(features, polygons_per_feature):
+        new_polygons = []
+        for polygon in polygons:
+            new_rings = []
+            for ring in polygon:
+                points = ring[:-1]
+                owner_sets = [frozenset(owners[tuple(p)]) for p in points]
+                shared = any(len(s) > 1 for s in owner_sets)
+                if not shared and min_area and abs(_ring_area(ring)) < min_area:
+                    continue
+                if tolerance <= 0:
+                    new_rings.append(ring)
+                    continue
+
+                n = len(points)
+                fixed = [
+                    j for j in range(n)
+                    if len(owner_sets[j]) > 1 and (
+                        owner_sets[j] != owner_sets[j - 1] or owner_sets[j] != owner_sets[(j + 1) % n]
+                    )
+                ]
+                if len(fixed) < 2:
+                    # Ring tanpa ujung arc: belah di titik pertama dan titik terjauh darinya
+                    start = fixed[0] if fixed else 0
+                    far = (start + int(np.argmax(np.hypot(*(np.roll(points, -start, axis=0) - points[start]).T)))) % n
+                    fixed = sorted({start, far})
+
+                parts = []
+                for k, j in enumerate(fixed):
+                    nxt = fixed[(k + 1) % len(fixed)]
+                    idx = np.arange(j, nxt + 1) if nxt > j else np.r_[np.arange(j, n), np.arange(0, nxt + 1)]
+                    parts.append(_simplify_arc(points[idx], tolerance)[:-1])
+                new_ring = np.vstack(parts + [parts[0][:1]])
+                if len(new_ring) >= 4:
+                    new_rings.append(new_ring)
+            if new_rings:
+                new_polygons.append(new_rings)
+
+        if not new_polygons:
+            continue
+        geometry = (
+            {"type": "Polygon", "coordinates": new_polygons[0]} if len(new_polygons) == 1
+            else {"type": "MultiPolygon", "coordinates": new_polygons}
+        )
+        simplified_features.append(dict(feature, geometry=geometry))
+    return simplified_features
+
+
+def _round_geometry(geometry: Dict, decimals: int) -> Dict:
+    def rnd(rings):
+        return [np.round(np.asarray(r), decimals).tolist() for r in rings]
+    if geometry["type"] == "Polygon":
+        return {"type": "Polygon", "coordinates": rnd(geometry["coordinates"])}
+    return {"type": "MultiPolygon", "coordinates": [rnd(p) for p in geometry["coordinates"]]}
+
+
+def write_province_lods(source: Dict, out_dir: Path = GEO_DIR, name_key: str = "name", decimals: int = 4) -> Dict[int, Dict]:
+    """
+    Tulis file GeoJSON untuk semua LOD dari FeatureCollection sumber
+
+    Args:
+        source: FeatureCollection provinsi (nama di properties[name_key])
+        out_dir: Direktori output
+        name_key: Properti nama provinsi di sumber (dipetakan lewat SOURCE_NAME_TO_PROVINCE)
+        decimals: Pembulatan koordinat
+
+    Returns:
+        LOD -> statistik (jumlah feature, titik, ukuran file)
+    """
+    features = []
+    for feature in source["features"]:
+        name = feature["properties"][name_key]
+        province = SOURCE_NAME_TO_PROVINCE.get(name, name)
+        features.append({"type": "Feature", FEATURE_ID_KEY: province, "properties": {"name": province}, "geometry": feature["geometry"]})
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stats = {}
+    for lod, (tolerance, min_area) in PROVINCE_GEOJSON_LODS.items():
+        lod_features = simplify_provinces(features, tolerance, min_area)
+        for feature in lod_features:
+            feature["geometry"] = _round_geometry(feature["geometry"], decimals)
+        payload = json.dumps({"type": "FeatureCollection", "features": lod_features}, separators=(",", ":"))
+        path = out_dir / f"indonesia_provinces_lod{lod}.geojson"
+        path.write_text(payload, encoding="utf-8")
+        n_points = sum(
+            len(ring)
+            for f in lod_features
+            for polygon in ([f["geometry"]["coordinates"]] if f["geometry"]["type"] == "Polygon" else f["geometry"]["coordinates"])
+            for ring in polygon
+        )
+        stats[lod] = {"features": len(lod_features), "points": n_points, "bytes": len(payload)}
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bangun file GeoJSON provinsi per LOD dari FeatureCollection sumber")
+    parser.add_argument("source", help="GeoJSON sumber (34 provinsi, ring luar searah jarum jam)")
+    parser.add_argument("--name-key", default="name", help="Properti nama provinsi di sumber")
+    parser.add_argument("--out-dir", default=str(GEO_DIR))
+    args = parser.parse_args()
+
+    with open(args.source, encoding="utf-8") as f:
+        source_fc = json.load(f)
+    lod_stats = write_province_lods(source_fc, Path(args.out_dir), name_key=args.name_key)
+    for lod, row in lod_stats.items():
+        tolerance, min_area = PROVINCE_GEOJSON_LODS[lod]
+        print(
+            f"  - LOD {lod} (toleransi {tolerance}, luas min {min_area}): "
+            f"{row['features']} provinsi | {row['points']} titik | {row['bytes'] / 1024:.1f} KB"
+        )
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Province Map Helper
+Peta persebaran hoaks per provinsi. Tabel koordinat provinsi statis (module
+level) sudah di-join dengan warna per provinsi, dan peta bubble dibangun
+sebagai satu trace Scattergeo dengan array lat/lon/size/color per titik
+(bukan satu trace per provinsi), sehingga JSON figure yang dikirim ke browser
+tiap rerun tetap kecil.
+
+Mode choropleth memakai GeoJSON provinsi yang dibundel (helpers.province_geo).
+Jika Streamlit menyajikan static/ (server.enableStaticServing), GeoJSON
+dirujuk lewat URL dan di-cache browser, sehingga tiap rerun hanya mengirim
+nilai per provinsi.
+"""
+
+from typing import Dict, Tuple
+
+import pandas as pd
+from plotly.colors import qualitative
+
+from helpers.province_geo import (
+    DEFAULT_LOD,
+    FEATURE_ID_KEY,
+    load_province_geojson,
+    province_feature_ids,
+    province_geojson_url
+)
+
+# Koordinat provinsi Indonesia (lat, lon untuk bubble map)
+PROVINCE_COORDS: Dict[str, Tuple[float, float]] = {
+    "Aceh": (4.6951, 96.7494),
+    "Sumatera Utara": (2.1157, 99.5451),
+    "Sumatera Barat": (-0.9492, 100.8000),
+    "Riau": (0.2933, 101.7068),
+    "Kepulauan Riau": (0.9167, 104.4500),
+    "Jambi": (-1.6101, 103.6131),
+    "Sumatera Selatan": (-2.9761, 104.7754),
+    "Bangka Belitung": (-2.1333, 106.1333),
+    "Bengkulu": (-3.7928, 102.2603),
+    "Lampung": (-5.4500, 105.2667),
+    "DKI Jakarta": (-6.2088, 106.8456),
+    "Jawa Barat": (-6.9175, 107.6191),
+    "Jawa Tengah": (-7.2050, 110.4100),
+    "DI Yogyakarta": (-7.7956, 110.3695),
+    "Jawa Timur": (-7.2504, 112.7688),
+    "Banten": (-6.4058, 106.0640),
+    "Bali": (-8.4095, 115.1889),
+    "Nusa Tenggara Barat": (-8.5833, 116.1167),
+    "Nusa Tenggara Timur": (-10.1718, 123.6075),
+    "Kalimantan Barat": (0.0236, 109.3414),
+    "Kalimantan Tengah": (-2.2100, 113.9200),
+    "Kalimantan Selatan": (-3.3194, 114.5908),
+    "Kalimantan Timur": (-0.5021, 117.1536),
+    "Kalimantan Utara": (3.3167, 117.6000),
+    "Sulawesi Utara": (1.4748, 124.8421),
+    "Sulawesi Tengah": (-0.9000, 119.8833),
+    "Sulawesi Selatan": (-5.1477, 119.4327),
+    "Sulawesi Tenggara": (-3.9984, 122.5129),
+    "Gorontalo": (0.5333, 123.0667),
+    "Sulawesi Barat": (-2.6688, 118.8622),
+    "Maluku": (-3.6561, 128.1667),
+    "Maluku Utara": (0.7833, 127.3667),
+    "Papua Barat": (-0.8667, 134.0833),
+    "Papua": (-2.5333, 140.7167)
+}
+
+# Warna tetap per provinsi (urutan PROVINCE_COORDS)
+MAP_PALETTE = qualitative.Set3 + qualitative.Pastel + qualitative.Dark2 + qualitative.Set1
+
+# Index provinsi: koordinat + warna, di-join sekali ke hasil value_counts
+PROVINCE_INDEX = pd.DataFrame(
+    [(lat, lon, MAP_PALETTE[i % len(MAP_PALETTE)]) for i, (lat, lon) in enumerate(PROVINCE_COORDS.values())],
+    index=pd.Index(list(PROVINCE_COORDS), name="province"),
+    columns=["lat", "lon", "color"]
+)
+
+# Area peta Indonesia untuk semua mode peta
+INDONESIA_GEO = dict(
+    scope='asia',
+    center=dict(lat=-2.5, lon=118),
+    projection_scale=3.5,
+    lonaxis_range=[95, 141],
+    lataxis_range=[-11, 6],
+    showland=True,
+    landcolor='rgb(217, 217, 217)',
+    showocean=True,
+    oceancolor='rgb(230, 245, 255)',
+    showcountries=True,
+    countrycolor='rgb(102, 102, 102)',
+    bgcolor='white'
+)
+
+# Size bubble = jumlah hoaks * multiplier (sizemode area)
+BUBBLE_SIZE_MULTIPLIER = 15.0
+
+
+def join_province_coords(province_counts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tambahkan lat, lon, color ke hasil value_counts (kolom province, count);
+    provinsi tanpa koordinat dibuang, urutan baris dipertahankan
+    """
+    return province_counts.join(PROVINCE_INDEX, on="province", how="inner")
+
+
+def build_bubble_map(province_counts: pd.DataFrame, multiplier: float = BUBBLE_SIZE_MULTIPLIER):
+    """
+    Peta bubble satu trace Scattergeo
+
+    Args:
+        province_counts: Hasil join_province_coords (province, count, lat, lon, color)
+        multiplier: Pengali ukuran bubble (sizemode area)
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scattergeo(
+        lon=province_counts["lon"].to_numpy(),
+        lat=province_counts["lat"].to_numpy(),
+        text=province_counts["province"].to_numpy(),
+        customdata=province_counts["count"].to_numpy(),
+        marker=dict(
+            size=province_counts["count"].to_numpy() * multiplier,
+            color=province_counts["color"].to_numpy(),
+            line_color='rgb(40,40,40)',
+            line_width=0.5,
+            sizemode='area',
+            opacity=0.7
+        ),
+        hovertemplate='<b>%{text}</b><br>Jumlah Hoaks: %{customdata}<extra></extra>',
+        showlegend=False
+    ))
+    fig.update_layout(
+        title_text='Persebaran Hoaks per Provinsi di Indonesia',
+        height=600,
+        margin=dict(l=0, r=0, t=60, b=0),
+        geo=INDONESIA_GEO
+    )
+    return fig
+
+
+def build_choropleth_map(province_counts: pd.DataFrame, lod: int = DEFAULT_LOD, use_url: bool = False):
+    """
+    Peta choropleth jumlah hoaks per provinsi (provinsi tanpa hoaks bernilai 0)
+
+    Args:
+        province_counts: Hasil value_counts (kolom province, count)
+        lod: Level detail GeoJSON (0 = paling detail)
+        use_url: Rujuk GeoJSON lewat URL static (tidak ikut dikirim tiap rerun)
+    """
+    import plotly.graph_objects as go
+
+    feature_ids = province_feature_ids(lod)
+    locations = [p for p in PROVINCE_COORDS if p in feature_ids]
+    counts = province_counts.set_index("province")["count"].reindex(locations, fill_value=0)
+
+    fig = go.Figure(go.Choropleth(
+        geojson=province_geojson_url(lod) if use_url else load_province_geojson(lod),
+        featureidkey=FEATURE_ID_KEY,
+        locations=locations,
+        z=counts.to_numpy(),
+        colorscale="Reds",
+        marker_line_color="white",
+        marker_line_width=0.5,
+        colorbar_title="Jumlah Hoaks",
+        hovertemplate="<b>%{location}</b><br>Jumlah Hoaks: %{z}<extra></extra>"
+    ))
+    fig.update_layout(
+        title_text='Persebaran Hoaks per Provinsi di Indonesia',
+        height=600,
+        margin=dict(l=0, r=0, t=60, b=0),
+        geo=INDONESIA_GEO
+    )
+    return fig
+
+
+def _build_bubble_map_per_trace(province_counts: pd.DataFrame, multiplier: float = BUBBLE_SIZE_MULTIPLIER):
+    """Versi lama (satu trace per provinsi), hanya untuk benchmark"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for _, row in province_counts.iterrows():
+        fig.add_trace(go.Scattergeo(
+            lon=[row['lon']],
+            lat=[row['lat']],
+            text=[f"{row['province']}<br>Jumlah Hoaks: {row['count']}"],
+            marker=dict(
+                size=[row['count'] * multiplier],
+                color=row['color'],
+                line_color='rgb(40,40,40)',
+                line_width=0.5,
+                sizemode='area',
+                opacity=0.7
+            ),
+            name=row['province'],
+            hovertemplate='<b>%{text}</b><extra></extra>',
+            showlegend=True
+        ))
+    fig.update_layout(height=600, margin=dict(l=0, r=0, t=60, b=0), geo=INDONESIA_GEO)
+    return fig
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import numpy as np
+
+    from helpers.province_geo import PROVINCE_GEOJSON_LODS
+
+    parser = argparse.ArgumentParser(description="Ukur ukuran JSON dan waktu build peta provinsi (per trace vs satu trace)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    counts = pd.DataFrame({"province": list(PROVINCE_COORDS), "count": rng.integers(1, 500, len(PROVINCE_COORDS))})
+    counts = join_province_coords(counts.sort_values("count", ascending=False))
+
+    builders = [("per trace", _build_bubble_map_per_trace), ("satu trace", build_bubble_map)]
+    for lod in sorted(PROVINCE_GEOJSON_LODS):
+        builders.append((f"choropleth LOD {lod}", lambda c, lod=lod: build_choropleth_map(c, lod)))
+    builders.append(("choropleth URL", lambda c: build_choropleth_map(c, DEFAULT_LOD, use_url=True)))
+
+    print(f"Peta {len(counts)} provinsi, {args.repeat} kali build + to_json:")
+    for name, build in builders:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            payload = build(counts).to_json()
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"  - {name:<18}: {elapsed * 1000:7.1f} ms | JSON {len(payload) / 1024:6.1f} KB")
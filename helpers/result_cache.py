@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Result Cache Helper
+Cache LRU dengan TTL opsional untuk hasil analisis DeepHoaxID dan embeddings query
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def text_cache_key(text: str) -> str:
+    """Hash SHA-256 dari teks (teks yang sudah dinormalisasi/preprocess)"""
+    return hashlib.sha256(str(text).encode('utf-8')).hexdigest()
+
+
+class TTLLRUCache:
+    """
+    Cache LRU thread-safe dengan batas ukuran dan TTL opsional
+
+    Args:
+        maxsize: Jumlah entry maksimum (entry paling lama tidak dipakai dibuang)
+        ttl: Umur maksimum entry dalam detik (None = tanpa batas)
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and (entry[1] is None or entry[1] > time.monotonic())
+
+    def stats(self) -> Dict[str, float]:
+        """Statistik cache: size, hits, misses, hit_rate"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+class CachedEncoder:
+    """
+    Pembungkus model Sentence-BERT yang meng-cache embeddings per teks.
+
+    Hanya panggilan encode kecil (query detector) yang di-cache; batch besar
+    (mis. encode artikel untuk clustering) diteruskan langsung agar tidak
+    mengusir embeddings query dari cache. Atribut lain diteruskan ke model asli.
+    on_encode (opsional) dipanggil dengan durasi (detik) setiap panggilan encode.
+    """
+
+    def __init__(self, model, cache: TTLLRUCache, max_batch_to_cache: int = 16,
+                 on_encode: Optional[Callable[[float], None]] = None):
+        self.model = model
+        self.cache = cache
+        self.max_batch_to_cache = max_batch_to_cache
+        self.on_encode = on_encode
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def encode(self, sentences: Union[str, List[str]], **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._encode(sentences, **kwargs)
+        finally:
+            if self.on_encode is not None:
+                self.on_encode(time.perf_counter() - start)
+
+    def _encode(self, sentences: Union[str, List[str]], **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        if kwargs.get('convert_to_tensor') or len(texts) > self.max_batch_to_cache:
+            return self.model.encode(sentences, **kwargs)
+
+        normalize = bool(kwargs.get('normalize_embeddings', False))
+        keys = [(text_cache_key(t), normalize) for t in texts]
+        vectors = [self.cache.get(k) for k in keys]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+
+        if missing:
+            encode_kwargs = dict(kwargs, convert_to_numpy=True)
+            encoded = np.asarray(self.model.encode([texts[i] for i in missing], **encode_kwargs))
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+                self.cache.set(keys[i], vector)
+
+        embeddings = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
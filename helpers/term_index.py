@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Term Index Helper
+Matriks sparse artikel x term (jumlah kemunculan) yang dibangun sekali dari
+kolom teks, lalu dipakai ulang untuk kata kunci cluster (c-TF-IDF) dan word
+cloud dengan operasi matriks, tanpa menggabungkan dan membersihkan ulang teks
+setiap rerun
+"""
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from helpers.embedding_store import normalize_article_id
+from helpers.text_normalizer import STOPWORDS, build_analyzer, has_vowel, normalize_series
+
+logger = logging.getLogger(__name__)
+
+
+class TermDocumentIndex:
+    """
+    Matriks CSR (n_artikel, n_term) berisi jumlah kemunculan term per artikel
+
+    Args:
+        matrix: scipy.sparse.csr_matrix jumlah term
+        vocabulary: Array term (kolom matrix)
+        ids: Article id per baris (opsional, untuk lookup baris dari id)
+    """
+
+    def __init__(self, matrix: sparse.csr_matrix, vocabulary: np.ndarray, ids: Optional[Sequence] = None):
+        self.matrix = matrix.tocsr()
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self.ids = list(ids) if ids is not None else None
+        self._id_to_row = None
+
+    @classmethod
+    def build(
+        cls,
+        df: pd.DataFrame,
+        text_column: Union[str, Sequence[str]] = 'content',
+        id_column: str = 'id',
+        stopwords: Iterable[str] = STOPWORDS,
+        min_df: int = 2,
+        stem: bool = False,
+        term_filter: Optional[Callable[[str], bool]] = has_vowel
+    ) -> 'TermDocumentIndex':
+        """
+        Tokenisasi semua artikel sekali dan bangun matriks term
+
+        Args:
+            df: DataFrame artikel
+            text_column: Kolom teks, atau beberapa kolom yang digabung dengan spasi
+            id_column: Kolom article id (baris dicari lewat id)
+            stopwords: Kata yang dibuang (diterapkan sekali saat build)
+            min_df: Term yang muncul di kurang dari min_df artikel dibuang
+            stem: Stem token (helpers.text_normalizer, butuh Sastrawi)
+            term_filter: Term yang tidak lolos filter dibuang dari vocabulary
+        """
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        start = time.time()
+        columns = [text_column] if isinstance(text_column, str) else list(text_column)
+        columns = [c for c in columns if c in df.columns]
+        texts = df[columns[0]].fillna("").astype(str) if columns else pd.Series([""] * len(df))
+        for column in columns[1:]:
+            texts = texts + " " + df[column].fillna("").astype(str)
+        # Normalisasi vektor sekali, lalu tokenizer bersama (text_normalizer)
+        texts = normalize_series(texts)
+        vectorizer = CountVectorizer(
+            analyzer=build_analyzer(stopwords, stem=stem, normalized=True),
+            min_df=min_df if len(texts) >= min_df else 1,
+            dtype=np.int32
+        )
+        try:
+            matrix = vectorizer.fit_transform(texts)
+            vocabulary = vectorizer.get_feature_names_out()
+        except ValueError:
+            # Semua teks kosong / hanya stopwords
+            matrix = sparse.csr_matrix((len(texts), 0), dtype=np.int32)
+            vocabulary = np.array([], dtype=object)
+
+        if term_filter is not None and len(vocabulary):
+            keep = np.fromiter((term_filter(t) for t in vocabulary), dtype=bool, count=len(vocabulary))
+            matrix = matrix[:, keep]
+            vocabulary = vocabulary[keep]
+
+        ids = df[id_column].tolist() if id_column in df.columns else None
+        logger.info(f"Term index: {matrix.shape[0]} artikel x {matrix.shape[1]} term, {matrix.nnz} nnz ({time.time() - start:.1f}s)")
+        return cls(matrix, vocabulary, ids)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def rows_for(self, article_ids: Sequence) -> np.ndarray:
+        """Baris matriks untuk daftar article id (-1 jika tidak ada)"""
+        if self.ids is None:
+            raise ValueError("Term index dibangun tanpa kolom id")
+        if self._id_to_row is None:
+            self._id_to_row = {normalize_article_id(a): row for row, a in enumerate(self.ids)}
+        return np.fromiter(
+            (self._id_to_row.get(normalize_article_id(a), -1) for a in article_ids),
+            dtype=np.int64,
+            count=len(article_ids)
+        )
+
+    def term_frequencies(self, rows: Optional[np.ndarray] = None, top_n: Optional[int] = None) -> Dict[str, int]:
+        """
+        Frekuensi term untuk baris terpilih (jumlah kolom matriks sparse),
+        urut dari yang paling sering
+
+        Args:
+            rows: Baris matriks (mis. hasil rows_for); None = semua artikel
+            top_n: Ambil hanya top_n term
+        """
+        if rows is None:
+            counts = np.asarray(self.matrix.sum(axis=0)).ravel()
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            rows = rows[rows >= 0]
+            if len(rows) == 0 or self.matrix.shape[1] == 0:
+                return {}
+            counts = np.asarray(self.matrix[rows].sum(axis=0)).ravel()
+
+        nonzero = np.flatnonzero(counts)
+        if top_n is not None and len(nonzero) > top_n:
+            nonzero = nonzero[np.argpartition(-counts[nonzero], top_n - 1)[:top_n]]
+        nonzero = nonzero[np.argsort(-counts[nonzero], kind='stable')]
+        return {self.vocabulary[t]: int(counts[t]) for t in nonzero}
+
+    def cluster_term_counts(self, rows: np.ndarray, labels: np.ndarray) -> Tuple[np.ndarray, sparse.csr_matrix]:
+        """
+        Jumlah term per cluster: one-hot(label)^T @ matrix[rows]
+
+        Returns:
+            Tuple (cluster_ids terurut, matrix sparse (n_cluster, n_term))
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        labels = np.asarray(labels)
+        valid = rows >= 0
+        cluster_ids, codes = np.unique(labels, return_inverse=True)
+        n_valid = int(valid.sum())
+        membership = sparse.csr_matrix(
+            (np.ones(n_valid, dtype=np.int32), (codes[valid], np.arange(n_valid))),
+            shape=(len(cluster_ids), n_valid)
+        )
+        return cluster_ids, membership @ self.matrix[rows[valid]]
+
+    def cluster_keywords(self, rows: np.ndarray, labels: np.ndarray, top_n: int = 10) -> Dict[int, List[str]]:
+        """
+        Kata kunci per cluster dengan c-TF-IDF (class-based TF-IDF)
+
+        tf(t, c) = count(t, c) / total_term(c)
+        idf(t)   = log(1 + rata2 term per cluster / count(t, semua cluster))
+        """
+        cluster_ids, counts = self.cluster_term_counts(rows, labels)
+        if counts.shape[1] == 0:
+            return {int(c): [] for c in cluster_ids}
+
+        counts = counts.toarray().astype(np.float64)
+        cluster_totals = counts.sum(axis=1, keepdims=True)
+        term_totals = counts.sum(axis=0)
+        tf = counts / np.clip(cluster_totals, 1, None)
+        idf = np.log1p(cluster_totals.mean() / np.clip(term_totals, 1, None))
+        scores = tf * idf
+        scores[counts == 0] = -np.inf
+
+        keywords = {}
+        n = min(top_n, scores.shape[1])
+        for i, cluster_id in enumerate(cluster_ids):
+            top = np.argpartition(-scores[i], n - 1)[:n]
+            top = top[np.argsort(-scores[i, top], kind='stable')]
+            keywords[int(cluster_id)] = [self.vocabulary[t] for t in top if np.isfinite(scores[i, t])]
+        return keywords
+
+
+def build_wordcloud_index(df: pd.DataFrame, id_column: str = 'id') -> TermDocumentIndex:
+    """Term index untuk word cloud: title + content, semua term (min_df=1)"""
+    return TermDocumentIndex.build(df, text_column=('title', 'content'), id_column=id_column, min_df=1)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Text Normalizer Helper
+Normalisasi dan tokenisasi teks Indonesia bersama untuk semua fitur teks
+(word cloud, kata kunci cluster, TF-IDF): URL, email dan angka dibuang dalam
+satu regex terkompilasi, stopwords berupa frozenset, stemming opsional dengan
+memoisasi, dan versi vektor untuk pandas Series
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Iterable, List
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MIN_TOKEN_LENGTH = 4
+TOKEN_PATTERN = r'(?u)\b\w{%d,}\b' % MIN_TOKEN_LENGTH
+
+# Satu pass untuk URL, email dan angka; tanda baca diganti spasi
+_NOISE = re.compile(r'http\S+|www\S+|\S+@\S+|\d+')
+_PUNCT = re.compile(r'[^\w\s]')
+_TOKEN = re.compile(TOKEN_PATTERN)
+_VOWEL = re.compile(r'[aeiou]')
+STEM_CACHE_SIZE = 200_000
+
+STOPWORDS = frozenset({
+    # Kata depan dan kata sambung
+    'yang', 'di', 'ke', 'dari', 'dan', 'atau', 'untuk', 'pada', 'dengan', 'dalam',
+    'adalah', 'ini', 'itu', 'tidak', 'akan', 'sudah', 'telah', 'juga', 'dapat', 'bisa',
+    'ada', 'nya', 'oleh', 'kepada', 'terhadap', 'antara', 'karena', 'jika',
+    'sebagai', 'seperti', 'bahwa', 'serta', 'namun', 'tetapi',
+    'apabila', 'ketika', 'saat', 'setelah', 'sebelum', 'selama', 'hingga',
+    'sampai', 'sementara', 'meskipun', 'walaupun', 'sebab',
+    'maka', 'sehingga', 'agar', 'supaya', 'guna', 'demi',
+    'menuju', 'tentang', 'mengenai', 'atas', 'bawah', 'depan', 'belakang', 'samping',
+    # Kata kerja umum
+    'merupakan', 'menjadi', 'terdapat', 'terdiri',
+    'mengatakan', 'menyatakan', 'menjelaskan', 'menyebutkan', 'mengungkapkan',
+    'menunjukkan', 'mengindikasikan', 'menandakan', 'menyiratkan',
+    # Kata benda umum
+    'hal', 'halnya', 'masalah', 'permasalahan', 'keadaan', 'kondisi', 'situasi',
+    'tempat', 'waktu', 'tanggal', 'hari', 'bulan', 'tahun', 'jam', 'menit',
+    'orang', 'seseorang', 'mereka', 'kami', 'kita', 'kamu', 'anda',
+    'saya', 'dia', 'ia', 'beliau',
+    # Kata sifat / keterangan umum
+    'sangat', 'amat', 'sekali', 'terlalu', 'cukup', 'agak', 'sedikit', 'banyak',
+    'semua', 'seluruh', 'setiap', 'masing', 'beberapa', 'sebagian',
+    'baru', 'lama', 'sebelumnya', 'kemudian', 'selanjutnya',
+    'pertama', 'kedua', 'ketiga', 'terakhir', 'akhirnya',
+    'mampu', 'mungkin', 'kemungkinan', 'boleh', 'perlu',
+    'harus', 'wajib', 'sebaiknya', 'seharusnya', 'sepatutnya',
+    'tersebut', 'tadi', 'demikian', 'begitu', 'begini', 'sama', 'serupa',
+    'lain', 'lainnya', 'saja', 'sahaja', 'hanya', 'cuma', 'semata',
+    'pula', 'lagi', 'kembali', 'pernah', 'belum', 'mau', 'ingin',
+    'bukan', 'tak', 'tiada', 'tanpa',
+    # Kata pengisi
+    'nah', 'oh', 'eh', 'ah', 'wah', 'aduh', 'astaga',
+    'ya', 'iya', 'yap', 'ok', 'oke', 'baik', 'benar',
+    'sih', 'dong', 'deh', 'nih', 'tuh', 'kok', 'kan', 'dah', 'udah',
+    # Kata teknis / media sosial
+    'link', 'url', 'http', 'https', 'www', 'com', 'id', 'co',
+    'click', 'klik', 'share', 'bagikan', 'like', 'suka',
+    'comment', 'komentar', 'reply', 'balas', 'post', 'posting',
+    'foto', 'gambar', 'video', 'audio', 'file', 'dokumen',
+    'sumber', 'referensi', 'tautan',
+    'lihat', 'baca', 'tonton', 'dengar', 'simak', 'perhatikan',
+    'kirim', 'send', 'upload',
+    # Kata tempat / waktu / jumlah / tanya / ganti yang terlalu umum
+    'disini', 'disana', 'disitu', 'dimana', 'kemana', 'darimana',
+    'sekarang', 'nanti', 'besok', 'kemarin', 'lusa', 'minggu', 'detik',
+    'satu', 'dua', 'tiga', 'empat', 'lima', 'enam', 'tujuh', 'delapan', 'sembilan', 'sepuluh',
+    'keempat', 'kelima',
+    'apa', 'siapa', 'kapan', 'kenapa', 'mengapa', 'bagaimana',
+    'aku', 'gue', 'gw', 'kalian', 'ku', 'mu',
+})
+
+
+def normalize_text(text) -> str:
+    """Huruf kecil, buang URL/email/angka, ganti tanda baca dengan spasi"""
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return ""
+    return _PUNCT.sub(' ', _NOISE.sub('', str(text).lower()))
+
+
+def normalize_series(texts: pd.Series) -> pd.Series:
+    """normalize_text untuk seluruh Series (operasi string pandas, tanpa loop Python)"""
+    return (
+        texts.fillna("").astype(str).str.lower()
+        .str.replace(_NOISE, '', regex=True)
+        .str.replace(_PUNCT, ' ', regex=True)
+    )
+
+
+def has_vowel(term: str) -> bool:
+    """Term bermakna minimal mengandung satu huruf vokal (membuang kode/singkatan)"""
+    return _VOWEL.search(term) is not None
+
+
+@lru_cache(maxsize=1)
+def get_stemmer():
+    """Stemmer Sastrawi (opsional); None jika library tidak terpasang"""
+    try:
+        from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+        return StemmerFactory().create_stemmer()
+    except ImportError:
+        logger.warning("Sastrawi tidak terpasang, stemming dilewati (pip install PySastrawi)")
+        return None
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem_word(word: str) -> str:
+    """Stem satu kata dengan memoisasi (kosakata korpus jauh lebih kecil dari jumlah token)"""
+    stemmer = get_stemmer()
+    return stemmer.stem(word) if stemmer is not None else word
+
+
+def tokenize(
+    text: str,
+    stopwords: Iterable[str] = STOPWORDS,
+    stem: bool = False,
+    normalized: bool = False
+) -> List[str]:
+    """
+    Token bermakna dari teks
+
+    Args:
+        text: Teks mentah (atau sudah dinormalisasi jika normalized=True)
+        stopwords: Kata yang dibuang (frozenset untuk lookup O(1))
+        stem: Stem token dengan stemmer Indonesia (dicek ulang terhadap stopwords)
+        normalized: Lewati normalize_text (mis. setelah normalize_series)
+    """
+    if not isinstance(stopwords, frozenset):
+        stopwords = frozenset(stopwords)
+    tokens = _TOKEN.findall(text if normalized else normalize_text(text))
+    tokens = [t for t in tokens if t not in stopwords]
+    if stem:
+        tokens = [s for s in map(stem_word, tokens) if len(s) >= MIN_TOKEN_LENGTH and s not in stopwords]
+    return tokens
+
+
+def build_analyzer(
+    stopwords: Iterable[str] = STOPWORDS,
+    stem: bool = False,
+    normalized: bool = True
+) -> Callable[[str], List[str]]:
+    """Analyzer untuk CountVectorizer/TfidfVectorizer yang memakai tokenize yang sama"""
+    stopwords = frozenset(stopwords)
+
+    def analyzer(text: str) -> List[str]:
+        return tokenize(text, stopwords=stopwords, stem=stem, normalized=normalized)
+    return analyzer
+
+
+def tokenize_series(
+    texts: pd.Series,
+    stopwords: Iterable[str] = STOPWORDS,
+    stem: bool = False
+) -> pd.Series:
+    """Token per baris Series: normalisasi vektor lalu tokenisasi"""
+    analyzer = build_analyzer(stopwords, stem=stem, normalized=True)
+    return normalize_series(texts).map(analyzer)
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Time Series Cube Helper
+Jumlah artikel per (hari relevant_date x hari published_at x dimensi filter)
+yang dibangun sekali saat load. Cube disimpan sparse: hanya sel yang berisi
+artikel, sebagai kolom array integer kecil (offset hari, kode dimensi, jumlah).
+
+Deret harian / bulanan / hari-dalam-minggu untuk kombinasi filter apa pun =
+mask sel (rentang hari + isin kode per dimensi) lalu bincount berbobot jumlah,
+tanpa to_datetime / groupby per rerun.
+"""
+
+import time
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+# Sumbu waktu cube
+RELEVANT_AXIS = 'relevant'
+PUBLISHED_AXIS = 'published'
+
+
+def _day_offsets(dates: pd.Series, origin: np.datetime64) -> np.ndarray:
+    days = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    return (days - origin).astype(np.int64)
+
+
+class TimeSeriesCube:
+    """
+    Cube sparse jumlah artikel per sel
+
+    Args:
+        origin: Hari pertama (datetime64[D]) untuk offset hari
+        relevant: Offset hari relevant_date per sel
+        published: Offset hari published_at per sel (-1 = tidak tersedia)
+        comparable: relevant_date < published_at per sel
+        codes: Kolom dimensi -> kode nilai per sel (-1 = tanpa nilai)
+        values: Kolom dimensi -> nilai per kode
+        counts: Jumlah artikel per sel
+    """
+
+    def __init__(
+        self,
+        origin: np.datetime64,
+        relevant: np.ndarray,
+        published: np.ndarray,
+        comparable: np.ndarray,
+        codes: Dict[str, np.ndarray],
+        values: Dict[str, np.ndarray],
+        counts: np.ndarray
+    ):
+        self.origin = np.datetime64(origin, 'D')
+        self.relevant = relevant
+        self.published = published
+        self.comparable = comparable
+        self.codes = codes
+        self.values = values
+        self.counts = counts
+        self.n_days = int(max(relevant.max(initial=-1), published.max(initial=-1))) + 1
+        self._value_to_code = {
+            column: {v: i for i, v in enumerate(vals.tolist())} for column, vals in values.items()
+        }
+
+    @classmethod
+    def build(
+        cls,
+        relevant_dates: pd.Series,
+        published_dates: Optional[pd.Series],
+        dimensions: Dict[str, Tuple[np.ndarray, np.ndarray]],
+        max_allowed_ts=None
+    ) -> 'TimeSeriesCube':
+        """
+        Agregasi semua artikel bertanggal ke sel cube (sekali per data)
+
+        Args:
+            relevant_dates: relevant_date per baris (datetime64, NaT = tanpa tanggal)
+            published_dates: published_at per baris (None = kolom tidak ada)
+            dimensions: Kolom -> (kode per baris, nilai per kode), mis. dari BitmapIndex
+            max_allowed_ts: Tanggal setelah batas ini dibuang (sama dengan filter engine)
+        """
+        start = time.perf_counter()
+        relevant_dates = pd.to_datetime(relevant_dates).reset_index(drop=True)
+        keep = relevant_dates.notna()
+        if max_allowed_ts is not None:
+            keep &= relevant_dates <= pd.Timestamp(max_allowed_ts)
+        keep = keep.to_numpy()
+
+        if published_dates is not None:
+            published_dates = pd.to_datetime(published_dates).reset_index(drop=True)
+            has_published = published_dates.notna()
+            if max_allowed_ts is not None:
+                has_published &= published_dates <= pd.Timestamp(max_allowed_ts)
+            comparable = (has_published & (relevant_dates < published_dates)).to_numpy()
+            has_published = has_published.to_numpy()
+        else:
+            has_published = comparable = np.zeros(len(relevant_dates), dtype=bool)
+
+        origin = relevant_dates[keep].min() if keep.any() else pd.Timestamp(0)
+        origin = np.datetime64(origin.normalize().to_datetime64(), 'D')
+        published = np.full(int(keep.sum()), -1, dtype=np.int64)
+        if published_dates is not None:
+            kept_published = has_published[keep]
+            published[kept_published] = _day_offsets(published_dates[keep][kept_published], origin)
+        columns = {
+            'relevant': _day_offsets(relevant_dates[keep], origin),
+            'published': published,
+            'comparable': comparable[keep]
+        }
+        for column, (codes, _) in dimensions.items():
+            columns[column] = np.asarray(codes)[keep]
+
+        cells = pd.DataFrame(columns).groupby(list(columns), sort=False).size()
+        index = cells.index
+        cube = cls(
+            origin,
+            relevant=index.get_level_values('relevant').to_numpy(dtype=np.int32),
+            published=index.get_level_values('published').to_numpy(dtype=np.int32),
+            comparable=index.get_level_values('comparable').to_numpy(dtype=bool),
+            codes={c: index.get_level_values(c).to_numpy(dtype=np.int32) for c in dimensions},
+            values={c: np.asarray(vals, dtype=object) for c, (_, vals) in dimensions.items()},
+            counts=cells.to_numpy(dtype=np.int32)
+        )
+        logger.info(
+            f"Time series cube: {len(cube)} sel dari {int(keep.sum())} artikel, "
+            f"{cube.n_days} hari ({(time.perf_counter() - start) * 1000:.0f} ms)"
+        )
+        return cube
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def _day(self, ts) -> int:
+        return int((np.datetime64(pd.Timestamp(ts).floor('D').to_datetime64(), 'D') - self.origin).astype(np.int64))
+
+    def cell_mask(self, start_ts=None, end_ts=None, selections: Optional[Dict[str, Iterable]] = None) -> np.ndarray:
+        """
+        Sel yang masuk rentang relevant_date (per hari) dan semua pilihan dimensi
+
+        Args:
+            start_ts, end_ts: Rentang relevant_date (inklusif, dibulatkan ke hari)
+            selections: Kolom dimensi -> nilai terpilih (kosong = tidak difilter)
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if start_ts is not None:
+            mask &= self.relevant >= self._day(start_ts)
+        if end_ts is not None:
+            mask &= self.relevant <= self._day(end_ts)
+        for column, selected in (selections or {}).items():
+            if column not in self.codes:
+                continue
+            lookup = self._value_to_code[column]
+            codes = [lookup[v] for v in selected if v in lookup]
+            mask &= np.isin(self.codes[column], codes)
+        return mask
+
+    def _axis_days(self, cells: np.ndarray, axis: str, comparable: bool) -> Tuple[np.ndarray, np.ndarray]:
+        if axis == PUBLISHED_AXIS:
+            comparable = True
+        if comparable:
+            cells = cells & self.comparable
+        days = self.published if axis == PUBLISHED_AXIS else self.relevant
+        return days[cells], self.counts[cells]
+
+    def day_counts(self, cells: np.ndarray, axis: str = RELEVANT_AXIS, comparable: bool = False) -> np.ndarray:
+        """Jumlah artikel per offset hari (panjang n_days)"""
+        days, counts = self._axis_days(cells, axis, comparable)
+        return np.bincount(days, weights=counts, minlength=self.n_days).astype(np.int64)
+
+    def total(self, cells: np.ndarray, comparable: bool = False, published: bool = False) -> int:
+        """
+        Jumlah artikel di sel terpilih
+
+        Args:
+            comparable: Hanya artikel dengan relevant_date < published_at
+            published: Hanya artikel yang punya published_at
+        """
+        if comparable:
+            cells = cells & self.comparable
+        elif published:
+            cells = cells & (self.published >= 0)
+        return int(self.counts[cells].sum(dtype=np.int64))
+
+    def daily(self, cells: np.ndarray, axis: str = RELEVANT_AXIS, comparable: bool = False) -> pd.DataFrame:
+        """Deret harian (kolom date, count), hanya hari yang berisi artikel"""
+        counts = self.day_counts(cells, axis, comparable)
+        days = np.flatnonzero(counts)
+        return pd.DataFrame({'date': self.origin + days, 'count': counts[days]})
+
+    def monthly(self, cells: np.ndarray, axis: str = RELEVANT_AXIS, comparable: bool = False) -> pd.DataFrame:
+        """Deret bulanan (kolom month 'YYYY-MM', count), hanya bulan yang berisi artikel"""
+        counts = self.day_counts(cells, axis, comparable)
+        months = (self.origin + np.arange(self.n_days)).astype('datetime64[M]')
+        first = months[0] if self.n_days else np.datetime64('1970-01', 'M')
+        month_index = (months - first).astype(np.int64)
+        month_counts = np.bincount(month_index, weights=counts, minlength=1).astype(np.int64)
+        found = np.flatnonzero(month_counts)
+        return pd.DataFrame({
+            'month': (first + found).astype(str),
+            'count': month_counts[found]
+        })
+
+    def weekday(self, cells: np.ndarray, axis: str = RELEVANT_AXIS, comparable: bool = False) -> pd.DataFrame:
+        """Jumlah per hari dalam minggu (kolom day, count), urut Senin..Minggu"""
+        counts = self.day_counts(cells, axis, comparable)
+        # 1970-01-01 adalah hari Kamis (indeks 3 jika Senin = 0)
+        weekdays = ((self.origin + np.arange(self.n_days)).astype(np.int64) + 3) % 7
+        day_counts = np.bincount(weekdays, weights=counts, minlength=7).astype(np.int64)
+        return pd.DataFrame({'day': DAY_ORDER, 'count': day_counts})
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+Topic Model Helper
+Model clustering topik yang disimpan (centroid + scaler hasil perform_clustering)
+sehingga artikel baru cukup di-assign ke centroid terdekat (O(k*d) per artikel),
+ID cluster stabil antar re-fit, dan re-fit hanya dijalankan di background saat
+distribusi artikel baru sudah bergeser (drift)
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from helpers.embedding_store import normalize_article_id
+
+logger = logging.getLogger(__name__)
+
+TOPIC_MODEL_FILE = 'topic_model.npz'
+UNASSIGNED = -1
+
+
+def topic_label(cluster_id) -> str:
+    """Label tampilan untuk ID cluster topik"""
+    if cluster_id is None or int(cluster_id) < 0:
+        return "Belum ter-assign"
+    return f"Topik {int(cluster_id) + 1}"
+
+
+class TopicModel:
+    """
+    Centroid k-means di ruang ter-standardisasi plus parameter StandardScaler
+
+    Args:
+        centroids: Array (k, d) centroid di ruang ter-scale
+        mean: Mean scaler (d,)
+        scale: Skala scaler (d,)
+        fitted_ids: Article id yang dipakai saat fit
+        baseline_distance: Rata-rata jarak artikel fit ke centroid-nya
+        version: Versi model (naik setiap re-fit)
+        embedding_version: Versi embeddings saat fit
+        fitted_at: Timestamp fit
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        mean: np.ndarray,
+        scale: np.ndarray,
+        fitted_ids: np.ndarray,
+        baseline_distance: float,
+        version: int = 1,
+        embedding_version: int = 0,
+        fitted_at: float = 0.0
+    ):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.fitted_ids = np.asarray(fitted_ids)
+        self.baseline_distance = float(baseline_distance)
+        self.version = int(version)
+        self.embedding_version = int(embedding_version)
+        self.fitted_at = float(fitted_at)
+        self._centroid_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+
+    @property
+    def n_clusters(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def fit(
+        cls,
+        embeddings: np.ndarray,
+        article_ids: Sequence,
+        n_clusters: int = 12,
+        method: str = 'auto',
+        random_state: int = 42,
+        previous: Optional['TopicModel'] = None,
+        embedding_version: int = 0
+    ) -> 'TopicModel':
+        """
+        Fit model baru lewat perform_clustering; jika ada model sebelumnya, ID
+        cluster dicocokkan ke centroid lama agar label tidak teracak
+        """
+        from helpers.content_clustering import perform_clustering
+
+        n_clusters = max(1, min(n_clusters, len(embeddings)))
+        _, kmeans = perform_clustering(embeddings, n_clusters=n_clusters, random_state=random_state, method=method)
+        scaler = kmeans.scaler_
+        model = cls(
+            kmeans.cluster_centers_,
+            scaler.mean_,
+            scaler.scale_,
+            np.asarray(article_ids, dtype=np.int64),
+            0.0,
+            version=(previous.version + 1) if previous is not None else 1,
+            embedding_version=embedding_version,
+            fitted_at=time.time()
+        )
+        if previous is not None:
+            model._align_to(previous)
+        _, distances = model.assign(embeddings)
+        model.baseline_distance = float(distances.mean()) if len(distances) else 0.0
+        return model
+
+    def _align_to(self, previous: 'TopicModel') -> None:
+        """Urutkan ulang centroid agar tiap cluster memakai ID centroid lama terdekat (Hungarian)"""
+        from scipy.optimize import linear_sum_assignment
+
+        # Bandingkan di ruang embeddings asli karena scaler tiap fit berbeda
+        current = self.centroids * self.scale + self.mean
+        old = previous.centroids * previous.scale + previous.mean
+        cost = ((current[:, None, :] - old[None, :, :]) ** 2).sum(axis=2)
+        rows, cols = linear_sum_assignment(cost)
+
+        # Cluster baru memakai ID centroid lama pasangannya; cluster tanpa
+        # pasangan (k bertambah) mendapat ID baru setelah ID lama
+        new_ids = np.empty(len(current), dtype=np.int64)
+        new_ids[rows] = cols
+        unmatched = np.setdiff1d(np.arange(len(current)), rows)
+        new_ids[unmatched] = len(old) + np.arange(len(unmatched))
+        self.centroids = np.ascontiguousarray(self.centroids[np.argsort(new_ids, kind='stable')])
+        self._centroid_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+
+    def assign(self, embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Centroid terdekat untuk setiap embedding
+
+        Returns:
+            Tuple (labels int16, jarak euclidean ke centroid float32)
+        """
+        if len(embeddings) == 0:
+            return np.empty(0, dtype=np.int16), np.empty(0, dtype=np.float32)
+        X = (np.asarray(embeddings, dtype=np.float32) - self.mean) / self.scale
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, cukup satu matmul (n, d) x (d, k)
+        sq = self._centroid_norms[None, :] - 2.0 * (X @ self.centroids.T)
+        labels = np.argmin(sq, axis=1)
+        nearest = sq[np.arange(len(X)), labels] + np.einsum('ij,ij->i', X, X)
+        return labels.astype(np.int16), np.sqrt(np.clip(nearest, 0, None)).astype(np.float32)
+
+    def save(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp.npz")
+        np.savez(
+            tmp_path,
+            centroids=self.centroids,
+            mean=self.mean,
+            scale=self.scale,
+            fitted_ids=self.fitted_ids,
+            baseline_distance=np.float64(self.baseline_distance),
+            version=np.int64(self.version),
+            embedding_version=np.int64(self.embedding_version),
+            fitted_at=np.float64(self.fitted_at)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path) -> Optional['TopicModel']:
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data['centroids'],
+                data['mean'],
+                data['scale'],
+                data['fitted_ids'],
+                float(data['baseline_distance']),
+                version=int(data['version']),
+                embedding_version=int(data['embedding_version']),
+                fitted_at=float(data['fitted_at'])
+            )
+
+
+class TopicModelService:
+    """
+    Assignment cluster topik untuk semua artikel ter-index plus deteksi drift
+
+    Assignment dihitung sekali per (versi model, versi embeddings); re-fit
+    dijalankan di background thread jika artikel baru sejak fit sudah terlalu
+    banyak atau rata-rata jaraknya ke centroid jauh di atas baseline.
+
+    Args:
+        embedding_store: EmbeddingStore (sumber vektor + mapping article id -> posisi)
+        store_dir: Direktori penyimpanan model (index store)
+        version_fn: Callable yang mengembalikan versi embeddings saat ini
+        lock: Lock index (dipakai saat membaca vektor)
+        n_clusters: Jumlah cluster topik
+        method: Method perform_clustering
+        drift_threshold: Rasio jarak artikel baru / baseline yang memicu re-fit
+        max_new_share: Porsi artikel baru (terhadap artikel fit) yang memicu re-fit
+        min_new: Minimum artikel baru sebelum rasio jarak dievaluasi
+        random_state: Random state fit
+    """
+
+    def __init__(
+        self,
+        embedding_store,
+        store_dir,
+        version_fn: Callable[[], int],
+        lock=None,
+        n_clusters: int = 12,
+        method: str = 'auto',
+        drift_threshold: float = 1.2,
+        max_new_share: float = 0.25,
+        min_new: int = 50,
+        random_state: int = 42
+    ):
+        self.embedding_store = embedding_store
+        self.store_dir = Path(store_dir)
+        self.version_fn = version_fn
+        self.lock = lock if lock is not None else threading.RLock()
+        self.n_clusters = n_clusters
+        self.method = method
+        self.drift_threshold = drift_threshold
+        self.max_new_share = max_new_share
+        self.min_new = min_new
+        self.random_state = random_state
+        self.model = TopicModel.load(self.model_path)
+        self.last_drift: Dict = {}
+        self._assignments = None
+        self._refit_thread = None
+        if self.model is not None:
+            logger.info(f"Topic model v{self.model.version} di-load: {self.model.n_clusters} cluster")
+
+    @property
+    def model_path(self) -> Path:
+        return self.store_dir / TOPIC_MODEL_FILE
+
+    @property
+    def assignment_version(self) -> Tuple:
+        """(versi model, versi embeddings): berubah setiap assignment bisa berubah"""
+        return (self.model.version if self.model is not None else None, self.version_fn())
+
+    def _indexed_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        with self.lock:
+            positions_map = self.embedding_store.positions
+            ids = np.fromiter(positions_map.keys(), dtype=np.int64, count=len(positions_map))
+            positions = np.fromiter(positions_map.values(), dtype=np.int64, count=len(positions_map))
+            return ids, self.embedding_store.vectors_at(positions)
+
+    def fit(self) -> Optional[TopicModel]:
+        """Fit (ulang) model pada semua artikel ter-index dan simpan ke store"""
+        start = time.time()
+        version = self.version_fn()
+        ids, vectors = self._indexed_vectors()
+        if len(ids) == 0:
+            logger.warning("Topic model: belum ada artikel ter-index")
+            return None
+        model = TopicModel.fit(
+            vectors,
+            ids,
+            n_clusters=self.n_clusters,
+            method=self.method,
+            random_state=self.random_state,
+            previous=self.model,
+            embedding_version=version
+        )
+        model.save(self.model_path)
+        self.model = model
+        self._assignments = None
+        logger.info(f"Topic model v{model.version}: {model.n_clusters} cluster, {len(ids)} artikel ({time.time() - start:.1f}s)")
+        return model
+
+    def _current_assignments(self) -> Optional[Dict]:
+        model = self.model
+        if model is None:
+            return None
+        version = self.version_fn()
+        cached = self._assignments
+        if cached is not None and cached['model_version'] == model.version and cached['embedding_version'] == version:
+            return cached
+
+        ids, vectors = self._indexed_vectors()
+        labels, distances = model.assign(vectors)
+        cached = {
+            'model_version': model.version,
+            'embedding_version': version,
+            'ids': ids,
+            'labels': labels,
+            'distances': distances,
+            'id_to_row': {article_id: row for row, article_id in enumerate(ids.tolist())}
+        }
+        self._assignments = cached
+        return cached
+
+    def assign_ids(self, article_ids: Sequence) -> np.ndarray:
+        """
+        Cluster topik untuk daftar artikel (urut sesuai input); UNASSIGNED untuk
+        artikel yang belum ter-index atau jika model belum ada
+        """
+        labels = np.full(len(article_ids), UNASSIGNED, dtype=np.int16)
+        assignments = self._current_assignments()
+        if assignments is None:
+            return labels
+        id_to_row = assignments['id_to_row']
+        rows = np.fromiter(
+            (id_to_row.get(normalize_article_id(a), -1) for a in article_ids),
+            dtype=np.int64,
+            count=len(article_ids)
+        )
+        found = rows >= 0
+        labels[found] = assignments['labels'][rows[found]]
+        return labels
+
+    def drift_report(self) -> Dict:
+        """Bandingkan artikel baru sejak fit terakhir dengan baseline model"""
+        assignments = self._current_assignments()
+        if assignments is None:
+            return {'drifted': True, 'reason': 'no_model'}
+        model = self.model
+        is_new = ~np.isin(assignments['ids'], model.fitted_ids)
+        n_new = int(is_new.sum())
+        new_share = n_new / max(len(model.fitted_ids), 1)
+        ratio = float(assignments['distances'][is_new].mean()) / model.baseline_distance if n_new and model.baseline_distance > 0 else 1.0
+
+        reason = None
+        if new_share > self.max_new_share:
+            reason = 'new_share'
+        elif n_new >= self.min_new and ratio > self.drift_threshold:
+            reason = 'distance'
+        report = {
+            'drifted': reason is not None,
+            'reason': reason,
+            'model_version': model.version,
+            'new_articles': n_new,
+            'new_share': new_share,
+            'distance_ratio': ratio
+        }
+        self.last_drift = report
+        return report
+
+    def refit_if_drifted(self) -> bool:
+        """
+        Jalankan re-fit di background thread jika model belum ada atau drift
+
+        Returns:
+            bool: True jika re-fit baru dijalankan
+        """
+        if self._refit_thread is not None and self._refit_thread.is_alive():
+            return False
+        report = self.drift_report()
+        if not report['drifted']:
+            return False
+        logger.info(f"Topic model drift ({report['reason']}), re-fit di background")
+
+        def _run():
+            try:
+                self.fit()
+            except Exception as e:
+                logger.error(f"Topic model re-fit gagal: {e}")
+
+        self._refit_thread = threading.Thread(target=_run, name="topic-refit", daemon=True)
+        self._refit_thread.start()
+        return True
+
+    def stats(self) -> Dict:
+        model = self.model
+        return {
+            'model_version': model.version if model else None,
+            'n_clusters': model.n_clusters if model else 0,
+            'fitted_articles': len(model.fitted_ids) if model else 0,
+            'embedding_version': model.embedding_version if model else None,
+            'refitting': self._refit_thread is not None and self._refit_thread.is_alive(),
+            'drift': self.last_drift
+        }
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Word Cloud Cache Helper
+Cache PNG word cloud dengan key hash (frekuensi top-N + parameter ukuran), LRU
+di memori dan persistensi disk opsional. Gambar dirender langsung lewat
+WordCloud.to_image() tanpa matplotlib, dan hanya saat key belum pernah dirender.
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+from helpers.result_cache import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+WORDCLOUD_PARAMS = {
+    'width': 800,
+    'height': 400,
+    'background_color': 'white',
+    'max_words': 100,
+    'colormap': 'viridis',
+    'relative_scaling': 0.5,
+    'min_font_size': 10,
+    # Layout tetap untuk frekuensi yang sama (cache memori dan disk konsisten)
+    'random_state': 42
+}
+
+
+def wordcloud_cache_key(frequencies: Dict[str, int], params: Dict) -> str:
+    """SHA-1 dari frekuensi (terurut) dan parameter render"""
+    payload = json.dumps(
+        {'freq': sorted((str(k), int(v)) for k, v in frequencies.items()), 'params': params},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def render_wordcloud_png(frequencies: Dict[str, int], **params) -> bytes:
+    """Render word cloud ke PNG (PIL) tanpa matplotlib"""
+    from wordcloud import WordCloud
+
+    image = WordCloud(**params).generate_from_frequencies(frequencies).to_image()
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+class WordCloudRenderCache:
+    """
+    Cache PNG word cloud
+
+    Args:
+        maxsize: Jumlah gambar di memori (LRU)
+        cache_dir: Direktori persistensi PNG (None = hanya memori)
+        max_files: Jumlah file maksimum di cache_dir (file terlama dihapus)
+    """
+
+    def __init__(self, maxsize: int = 64, cache_dir=None, max_files: int = 512):
+        self.memory = TTLLRUCache(maxsize=maxsize)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_files = max_files
+        self.renders = 0
+        self.disk_hits = 0
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.cache_dir / f"{key}.png" if self.cache_dir else None
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, png: bytes) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(png)
+            os.replace(tmp_path, path)
+            files = sorted(self.cache_dir.glob("*.png"), key=lambda p: p.stat().st_mtime)
+            for old_path in files[:max(len(files) - self.max_files, 0)]:
+                old_path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Word cloud cache disk gagal ditulis: {e}")
+
+    def get_png(self, frequencies: Dict[str, int], **params) -> bytes:
+        """
+        PNG word cloud untuk frekuensi tertentu (render hanya jika belum ada di cache)
+
+        Args:
+            frequencies: Dict kata -> frekuensi (mis. top-100)
+            **params: Parameter WordCloud (default WORDCLOUD_PARAMS)
+        """
+        params = dict(WORDCLOUD_PARAMS, **params)
+        key = wordcloud_cache_key(frequencies, params)
+        png = self.memory.get(key)
+        if png is not None:
+            return png
+
+        png = self._read_disk(key)
+        if png is not None:
+            self.disk_hits += 1
+        else:
+            png = render_wordcloud_png(frequencies, **params)
+            self.renders += 1
+            self._write_disk(key, png)
+        self.memory.set(key, png)
+        return png
+
+    def stats(self) -> Dict[str, float]:
+        return dict(self.memory.stats(), renders=self.renders, disk_hits=self.disk_hits)
@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
 from sqlalchemy.orm import joinedload
 from helpers.date_extractor import extract_all_dates, extract_relevant_date
 from helpers.location_extractor import extract_all_locations, extract_relevant_location, extract_relevant_province
+from helpers.platform_classifier import classify_platforms
+from helpers.delay_metrics import DELAY_MISSING, compute_delay_days
 import swifter
 
 from db.connection import SessionLocal
@@ -44,3 +47,15 @@ def enrich_with_locations(df):
     df["relevant_location"] = df["content"].swifter.apply(extract_relevant_location)
     df["relevant_province"] = df["content"].swifter.apply(extract_relevant_province)
     return df
+
+def enrich_with_platform(df):
+    urls = df["source_url"] if "source_url" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    df["platform"] = classify_platforms(urls)
+    return df
+
+def enrich_with_delay(df):
+    if "relevant_date" in df.columns and "published_at" in df.columns:
+        df["delay_days"] = compute_delay_days(df["relevant_date"], df["published_at"])
+    else:
+        df["delay_days"] = np.full(len(df), DELAY_MISSING, dtype=np.int32)
+    return df
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Parity test encoder backend (int8 / ONNX Runtime) terhadap Sentence-BERT PyTorch fp32.
+Dilewati jika torch / onnxruntime / sentence-transformers tidak terpasang atau
+model tidak bisa di-load.
+"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("transformers")
+sentence_transformers = pytest.importorskip("sentence_transformers")
+
+from helpers.encoder_backends import (  # noqa: E402
+    DEFAULT_MODEL_NAME,
+    PARITY_TEXTS,
+    PARITY_THRESHOLD,
+    load_encoder,
+    parity_check
+)
+
+
+@pytest.fixture(scope="module")
+def reference_model():
+    try:
+        return sentence_transformers.SentenceTransformer(DEFAULT_MODEL_NAME, device="cpu")
+    except Exception as e:
+        pytest.skip(f"Model {DEFAULT_MODEL_NAME} tidak bisa di-load: {e}")
+
+
+@pytest.fixture(scope="module")
+def onnx_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("onnx")
+
+
+@pytest.mark.parametrize("backend", ["torch_int8", "onnx", "onnx_int8"])
+def test_backend_parity_with_fp32(reference_model, onnx_dir, backend):
+    encoder = load_encoder(backend, base_model=reference_model, onnx_dir=onnx_dir)
+    parity = parity_check(reference_model, encoder, PARITY_TEXTS)
+
+    assert parity["cosine_mean"] >= PARITY_THRESHOLD
+    assert parity["passed"]
+
+
+def test_onnx_export_uses_loaded_model(reference_model, onnx_dir):
+    # Export dari model yang sudah di-load: fp32 ONNX harus hampir identik dengan PyTorch
+    encoder = load_encoder("onnx", base_model=reference_model, onnx_dir=onnx_dir)
+    parity = parity_check(reference_model, encoder, PARITY_TEXTS)
+
+    assert parity["cosine_min"] >= 0.999
+    assert parity["top1_agreement"] == 1.0